@@ -8,6 +8,2544 @@ from pathlib import Path
 import tempfile
 import queue
 import time
+import hashlib
+import shutil
+import json
+import codecs
+import signal
+import re
+import mmap
+import difflib
+import statistics
+import math
+import shlex
+import functools
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+LEX_CODE = 'code'
+LEX_BLOCK_COMMENT = 'comment'
+LEX_LINE_COMMENT = 'line_comment'
+LEX_PREPROCESSOR = 'preprocessor'
+LEX_RAW_STRING = 'raw:'
+
+RAW_STRING_PREFIXES = {'R', 'LR', 'uR', 'UR', 'u8R'}
+STRING_PREFIXES = {'L', 'u', 'U', 'u8'}
+HIGHLIGHT_TAGS = ("keyword", "string", "comment", "preprocessor", "number")
+
+APP_DIR = Path.home() / '.cppide'
+COMPILE_CACHE_LIMIT_MB = 512
+PCH_LIMIT = 4
+OUTPUT_PUMP_MS = 16
+OUTPUT_PUMP_MAX_CHARS = 1024 * 1024
+SCROLLBACK_LINES = 10000
+SCROLLBACK_SLACK = 0.1
+READ_CHUNK_BYTES = 64 * 1024
+LOAD_CHUNK_BYTES = 512 * 1024
+SAVE_CHUNK_LINES = 5000
+TEST_TIMEOUT = 10
+COMPILE_TIMEOUT = 30
+BENCHMARK_RUNS = 10
+BENCHMARK_WARMUP = 1
+BENCHMARK_HISTORY = 20
+SYNTAX_CHECK_DELAY_MS = 700
+SYNTAX_CHECK_TIMEOUT = 20
+PERF_BUCKETS_PER_OCTAVE = 4
+PERF_REFRESH_MS = 1000
+ASSEMBLY_CACHE_ENTRIES = 16
+PROFILE_RUN_TIMEOUT = 120
+HEAT_LEVELS = ('#3a2a1a', '#55301a', '#70341a', '#8c361a', '#a8361a')
+JOURNAL_FSYNC_MS = 200
+JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024
+JOURNAL_KEEP_EDITS = 5000
+JOURNAL_RECOVER_UNDO = 1000
+SYMBOL_INDEX_DELAY_MS = 300
+COMPLETION_LIMIT = 20
+COMPILE_PROFILE_HISTORY = 5
+COMPILE_PROFILE_ROWS = 300
+DIAGNOSTIC_SLICE = 200
+DIAGNOSTIC_OUTPUT_LINES = 20
+CPP_STANDARDS = ["c++11", "c++14", "c++17", "c++20", "c++23", "c++26"]
+COMPILER_NAME = re.compile(r'^(g\+\+|clang\+\+|c\+\+)(-\d+(\.\d+)*)?(\.exe)?$', re.IGNORECASE)
+
+class PerfTimers:
+    # In-memory latency histograms for the IDE's own hot paths. Buckets are
+    # logarithmic (a quarter octave of microseconds each), so memory stays constant
+    # however long the session runs. When disabled, a timed call costs one
+    # attribute check.
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def timed(self, name):
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds):
+        if not self.enabled:
+            return
+        bucket = int(math.log2(max(seconds * 1e6, 1.0)) * PERF_BUCKETS_PER_OCTAVE)
+        with self.lock:
+            histogram = self.histograms.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0, 'buckets': {}})
+            histogram['count'] += 1
+            histogram['total'] += seconds
+            histogram['max'] = max(histogram['max'], seconds)
+            histogram['buckets'][bucket] = histogram['buckets'].get(bucket, 0) + 1
+
+    def percentile(self, histogram, fraction):
+        # Upper edge of the bucket holding the requested rank.
+        rank = fraction * histogram['count']
+        seen = 0
+        for bucket in sorted(histogram['buckets']):
+            seen += histogram['buckets'][bucket]
+            if seen >= rank:
+                return min(2 ** ((bucket + 1) / PERF_BUCKETS_PER_OCTAVE) / 1e6, histogram['max'])
+        return histogram['max']
+
+    def snapshot(self):
+        with self.lock:
+            histograms = {name: dict(histogram, buckets=dict(histogram['buckets']))
+                          for name, histogram in self.histograms.items()}
+        return {name: {'count': histogram['count'], 'total': histogram['total'], 'max': histogram['max'],
+                       'p50': self.percentile(histogram, 0.5), 'p99': self.percentile(histogram, 0.99),
+                       'buckets_us': {f"{2 ** (bucket / PERF_BUCKETS_PER_OCTAVE):.0f}": count
+                                      for bucket, count in sorted(histogram['buckets'].items())}}
+                for name, histogram in histograms.items()}
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+
+perf_timers = PerfTimers()
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+def lex_cpp_line(line, state, keywords):
+    # Returns the (tag, start, end) tokens of one line and the lexer state at its end,
+    # so multi-line constructs can be resumed from the previous line's state.
+    tokens = []
+    n = len(line)
+    i = 0
+
+    if state == LEX_BLOCK_COMMENT:
+        end = line.find('*/')
+        if end == -1:
+            tokens.append(("comment", 0, n))
+            return tokens, LEX_BLOCK_COMMENT
+        tokens.append(("comment", 0, end + 2))
+        i = end + 2
+    elif state.startswith(LEX_RAW_STRING):
+        terminator = ')' + state[len(LEX_RAW_STRING):] + '"'
+        end = line.find(terminator)
+        if end == -1:
+            tokens.append(("string", 0, n))
+            return tokens, state
+        i = end + len(terminator)
+        tokens.append(("string", 0, i))
+    elif state == LEX_LINE_COMMENT:
+        tokens.append(("comment", 0, n))
+        return tokens, LEX_LINE_COMMENT if line.endswith('\\') else LEX_CODE
+
+    directive = state == LEX_PREPROCESSOR or (i == 0 and line.lstrip().startswith('#'))
+    directive_start = 0 if state == LEX_PREPROCESSOR else n - len(line.lstrip())
+    directive_end = n
+
+    while i < n:
+        c = line[i]
+        nxt = line[i + 1] if i + 1 < n else ''
+
+        if c == '/' and nxt == '/':
+            tokens.append(("comment", i, n))
+            directive_end = min(directive_end, i)
+            if line.endswith('\\'):
+                return tokens, LEX_LINE_COMMENT
+            break
+
+        if c == '/' and nxt == '*':
+            directive_end = min(directive_end, i)
+            end = line.find('*/', i + 2)
+            if end == -1:
+                tokens.append(("comment", i, n))
+                return tokens, LEX_BLOCK_COMMENT
+            tokens.append(("comment", i, end + 2))
+            i = end + 2
+            continue
+
+        if directive:
+            i += 1
+            continue
+
+        if c == '"' or c == "'":
+            j = i + 1
+            while j < n and line[j] != c:
+                j += 2 if line[j] == '\\' else 1
+            tokens.append(("string", i, min(j + 1, n)))
+            i = j + 1
+            continue
+
+        if c.isdigit() or (c == '.' and nxt.isdigit()):
+            exponents = 'pP' if line[i:i + 2].lower() == '0x' else 'eE'
+            j = i + 1
+            while j < n:
+                ch = line[j]
+                if ch.isalnum() or ch in "_.'" or (ch in '+-' and line[j - 1] in exponents):
+                    j += 1
+                else:
+                    break
+            tokens.append(("number", i, j))
+            i = j
+            continue
+
+        if c.isalpha() or c == '_':
+            j = i + 1
+            while j < n and (line[j].isalnum() or line[j] == '_'):
+                j += 1
+            word = line[i:j]
+            if word in RAW_STRING_PREFIXES and j < n and line[j] == '"':
+                paren = line.find('(', j + 1)
+                if paren != -1:
+                    delimiter = line[j + 1:paren]
+                    terminator = ')' + delimiter + '"'
+                    end = line.find(terminator, paren + 1)
+                    if end == -1:
+                        tokens.append(("string", i, n))
+                        return tokens, LEX_RAW_STRING + delimiter
+                    tokens.append(("string", i, end + len(terminator)))
+                    i = end + len(terminator)
+                    continue
+            if word in STRING_PREFIXES and j < n and line[j] in '"\'':
+                i = j
+                continue
+            if word in keywords:
+                tokens.append(("keyword", i, j))
+            i = j
+            continue
+
+        i += 1
+
+    if directive:
+        if directive_end > directive_start:
+            tokens.append(("preprocessor", directive_start, directive_end))
+        if line.endswith('\\') and directive_end == n:
+            return tokens, LEX_PREPROCESSOR
+
+    return tokens, LEX_CODE
+
+class SyntaxHighlighter:
+    # Keeps the lexer state at the end of every line so an edit only needs to
+    # re-lex from the first dirty line until the state matches the cached one again.
+    # Dirty lines are kept as sorted [first, last] ranges; highlight_dirty can be given
+    # a line budget so huge documents are finished in slices.
+    MIN_CHUNK_LINES = 16
+    MAX_CHUNK_LINES = 4096
+    SLICE_LINES = 1500
+    VIEWPORT_MARGIN_LINES = 100
+    VIEWPORT_BLOCK_LINES = 128
+
+    def __init__(self, text, keywords):
+        self.text = text
+        self.keywords = keywords
+        self.line_states = [None]
+        self.dirty_ranges = [[1, 1]]
+        self.provisional_blocks = set()
+
+    def line_count(self):
+        return int(self.text.index('end-1c').split('.')[0])
+
+    def pending(self):
+        return bool(self.dirty_ranges)
+
+    def is_clean(self, line):
+        for first, last in self.dirty_ranges:
+            if first > line:
+                return True
+            if line <= last:
+                return False
+        return True
+
+    def lines_changed(self, first, old_last, new_last):
+        delta = new_last - old_last
+        self.line_states[first - 1:old_last] = [None] * (new_last - first + 1)
+        self.provisional_blocks.clear()
+
+        merged = [first, new_last]
+        before, after = [], []
+        for range_first, range_last in self.dirty_ranges:
+            if range_last < first:
+                before.append([range_first, range_last])
+            elif range_first > old_last:
+                after.append([range_first + delta, range_last + delta])
+            else:
+                merged[0] = min(merged[0], range_first)
+                merged[1] = max(merged[1], range_last + delta if range_last > old_last else new_last)
+        self.dirty_ranges = before + [merged] + after
+
+    def invalidate(self):
+        self.line_states = [None] * self.line_count()
+        self.dirty_ranges = [[1, len(self.line_states)]]
+        self.provisional_blocks.clear()
+
+    def highlight_dirty(self, limit=None):
+        last_line = self.line_count()
+        if len(self.line_states) != last_line:
+            del self.line_states[last_line:]
+            self.line_states.extend([None] * (last_line - len(self.line_states)))
+        self.dirty_ranges = [[first, min(last, last_line)]
+                             for first, last in self.dirty_ranges if first <= last_line]
+
+        relexed = 0
+        while self.dirty_ranges and (limit is None or relexed < limit):
+            relexed += self.relex_first_range(last_line, None if limit is None else limit - relexed)
+        return relexed
+
+    def relex_first_range(self, last_line, limit):
+        line, dirty_to = self.dirty_ranges[0]
+        state = self.line_states[line - 2] if line > 1 else LEX_CODE
+        if state is None:
+            state = LEX_CODE
+
+        relexed = 0
+        chunk = max(self.MIN_CHUNK_LINES, dirty_to - line + 1)
+        converged = False
+
+        while line <= last_line and not converged and (limit is None or relexed < limit):
+            chunk = min(chunk, self.MAX_CHUNK_LINES)
+            if limit is not None:
+                chunk = min(chunk, limit - relexed)
+            chunk_end = min(last_line, line + chunk - 1)
+            lines = self.text.get(f"{line}.0", f"{chunk_end}.end").split('\n')
+            ranges = {tag: [] for tag in HIGHLIGHT_TAGS}
+            done = line - 1
+
+            for offset, content in enumerate(lines):
+                line_num = line + offset
+                if len(self.dirty_ranges) > 1 and self.dirty_ranges[1][0] <= line_num:
+                    dirty_to = max(dirty_to, self.dirty_ranges.pop(1)[1])
+
+                tokens, end_state = lex_cpp_line(content, state, self.keywords)
+                for tag, start, end in tokens:
+                    ranges[tag].append(f"{line_num}.{start}")
+                    ranges[tag].append(f"{line_num}.{end}")
+
+                converged = line_num >= dirty_to and self.line_states[line_num - 1] == end_state
+                self.line_states[line_num - 1] = end_state
+                state = end_state
+                done = line_num
+                if converged:
+                    break
+
+            self.apply_tags(line, done, ranges)
+            relexed += done - line + 1
+            line = done + 1
+            chunk *= 2
+
+        if converged or line > last_line:
+            self.dirty_ranges.pop(0)
+        else:
+            self.dirty_ranges[0] = [line, max(dirty_to, line)]
+        return relexed
+
+    def apply_tags(self, first, last, ranges):
+        for tag in HIGHLIGHT_TAGS:
+            self.text.tag_remove(tag, f"{first}.0", f"{last}.end")
+            if ranges[tag]:
+                self.text.tag_add(tag, *ranges[tag])
+
+    def highlight_visible(self, first, last):
+        # Tags lines that are still waiting for the sequential pass, starting from the
+        # best known state. Only dirty lines are touched: the result is provisional and
+        # highlight_dirty retags them with the exact state once it reaches them, while
+        # clean lines already carry exact tags that nothing would revisit.
+        last_line = self.line_count()
+        first = max(1, first - self.VIEWPORT_MARGIN_LINES)
+        last = min(last_line, last + self.VIEWPORT_MARGIN_LINES)
+        if first > last:
+            return 0
+        blocks = set(range((first - 1) // self.VIEWPORT_BLOCK_LINES,
+                           (last - 1) // self.VIEWPORT_BLOCK_LINES + 1))
+        if blocks <= self.provisional_blocks:
+            return 0
+        self.provisional_blocks |= blocks
+
+        state = LEX_CODE
+        if first > 1 and self.line_states[first - 2] is not None:
+            state = self.line_states[first - 2]
+        lines = self.text.get(f"{first}.0", f"{last}.end").split('\n')
+        ranges = {tag: [] for tag in HIGHLIGHT_TAGS}
+        run_first = None
+        tagged = 0
+        for offset, content in enumerate(lines):
+            line_num = first + offset
+            if self.is_clean(line_num):
+                if run_first is not None:
+                    self.apply_tags(run_first, line_num - 1, ranges)
+                    ranges = {tag: [] for tag in HIGHLIGHT_TAGS}
+                    run_first = None
+                if self.line_states[line_num - 1] is not None:
+                    state = self.line_states[line_num - 1]
+                continue
+            if run_first is None:
+                run_first = line_num
+            tokens, state = lex_cpp_line(content, state, self.keywords)
+            for tag, start, end in tokens:
+                ranges[tag].append(f"{line_num}.{start}")
+                ranges[tag].append(f"{line_num}.{end}")
+            tagged += 1
+
+        if run_first is not None:
+            self.apply_tags(run_first, last, ranges)
+        return tagged
+
+class CompileCache:
+    # Content-addressed store of built executables. Entries are named after the hash
+    # of everything that affects the build; the file mtime doubles as the LRU clock.
+    # The diagnostics of a build sit next to its entry in a KEY.diag.json sidecar.
+    DIAGNOSTICS_SUFFIX = '.diag.json'
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.compiler_versions = {}
+
+    def compiler_identity(self, compiler):
+        path = shutil.which(compiler)
+        if not path:
+            return None
+        mtime = os.stat(path).st_mtime_ns
+        cached = self.compiler_versions.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        result = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=10)
+        identity = f"{path}\n{mtime}\n{result.stdout}{result.stderr}"
+        self.compiler_versions[path] = (mtime, identity)
+        return identity
+
+    def key(self, code, compiler, std, flags, extra=()):
+        identity = self.compiler_identity(compiler)
+        if identity is None:
+            return None
+        digest = hashlib.sha256()
+        for part in (identity, std, ' '.join(flags), sys.platform) + tuple(extra):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(code.encode('utf-8'))
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        suffix = '.exe' if sys.platform == "win32" else ''
+        return self.directory / (key + suffix)
+
+    def lookup(self, key):
+        path = self.entry_path(key)
+        with self.lock:
+            if path.exists():
+                os.utime(path)
+                self.hits += 1
+                return str(path)
+            self.misses += 1
+            return None
+
+    def diagnostics_path(self, key):
+        return self.directory / (key + self.DIAGNOSTICS_SUFFIX)
+
+    def store(self, key, built_path, diagnostics=None):
+        path = self.entry_path(key)
+        with self.lock:
+            if diagnostics is not None:
+                sidecar = self.diagnostics_path(key)
+                temp_path = sidecar.with_suffix('.tmp')
+                with open(temp_path, 'w', encoding='utf-8') as file:
+                    json.dump(diagnostics, file)
+                os.replace(temp_path, sidecar)
+            os.replace(built_path, path)
+            self.evict(keep=path)
+        return str(path)
+
+    def cached_diagnostics(self, key):
+        try:
+            with open(self.diagnostics_path(key), encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def evict(self, keep=None):
+        # A sidecar counts towards the size of its entry and goes away with it.
+        entries = []
+        sidecars = {}
+        total = 0
+        for entry in self.directory.iterdir():
+            if entry.is_file():
+                stat = entry.stat()
+                total += stat.st_size
+                if entry.name.endswith(self.DIAGNOSTICS_SUFFIX):
+                    sidecars[entry.name[:-len(self.DIAGNOSTICS_SUFFIX)]] = (stat.st_size, entry)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry))
+
+        entries.sort()
+        for mtime, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            try:
+                entry.unlink()
+                total -= size
+            except OSError:
+                continue
+            sidecar_size, sidecar = sidecars.get(entry.stem, (0, None))
+            if sidecar:
+                try:
+                    sidecar.unlink()
+                    total -= sidecar_size
+                except OSError:
+                    pass
+
+    def clear(self):
+        removed = 0
+        with self.lock:
+            for entry in self.directory.iterdir():
+                if entry.is_file():
+                    try:
+                        entry.unlink()
+                        if not entry.name.endswith(self.DIAGNOSTICS_SUFFIX):
+                            removed += 1
+                    except OSError:
+                        pass
+        return removed
+
+class PrecompiledHeaders:
+    # Builds a precompiled header for the leading block of <...> includes of a source.
+    # Each entry lives in its own directory keyed by compiler, -std, flags and the
+    # include lines, together with the cold compile time used to report savings.
+    MIN_INCLUDES = 3
+    HEAVY_HEADERS = {'bits/stdc++.h'}
+
+    def __init__(self, directory, limit):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.building = set()
+
+    def claim(self, key):
+        # Only one build per key at a time; the rest keep compiling without a PCH.
+        with self.lock:
+            if key in self.building:
+                return False
+            self.building.add(key)
+            return True
+
+    def release(self, key):
+        with self.lock:
+            self.building.discard(key)
+
+    def detect_prefix(self, code):
+        includes = []
+        in_comment = False
+        for line in code.splitlines():
+            stripped = line.strip()
+            if in_comment:
+                in_comment = '*/' not in stripped
+                continue
+            if not stripped or stripped.startswith('//'):
+                continue
+            if stripped.startswith('/*'):
+                in_comment = '*/' not in stripped
+                continue
+            if stripped.startswith('#') and stripped[1:].lstrip().startswith('include'):
+                target = stripped[1:].lstrip()[len('include'):].strip()
+                if target.startswith('<') and target.endswith('>'):
+                    includes.append(target)
+                    continue
+            break
+
+        heavy = any(target[1:-1].strip() in self.HEAVY_HEADERS for target in includes)
+        if heavy or len(includes) >= self.MIN_INCLUDES:
+            return includes
+        return None
+
+    def compiler_kind(self, identity):
+        text = identity.lower()
+        if 'clang' in text:
+            return 'clang'
+        if 'free software foundation' in text or 'gcc' in text or 'g++' in text:
+            return 'gcc'
+        return None
+
+    def key(self, identity, std, flags, includes):
+        digest = hashlib.sha256()
+        for part in [identity, std, ' '.join(flags)] + includes:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()[:32]
+
+    def paths(self, key, kind):
+        entry = self.directory / key
+        header = entry / 'prefix.h'
+        binary = entry / ('prefix.h.pch' if kind == 'clang' else 'prefix.h.gch')
+        return entry, header, binary
+
+    def compile_args(self, key, kind):
+        entry, header, binary = self.paths(key, kind)
+        if not binary.exists():
+            return None
+        os.utime(entry)
+        if kind == 'clang':
+            return ['-include-pch', str(binary)]
+        return ['-Winvalid-pch', '-include', str(header)]
+
+    def build(self, job, key, kind, compiler, std, flags, includes):
+        # The header and the binary are written to unique temporary names first, so
+        # concurrent builds (another IDE or a batch run) never share a partial file.
+        entry, header, binary = self.paths(key, kind)
+        entry.mkdir(parents=True, exist_ok=True)
+        fd, partial_header = tempfile.mkstemp(dir=entry, prefix='prefix.', suffix='.h.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            file.write(''.join(f"#include {target}\n" for target in includes))
+        os.chmod(partial_header, 0o644)
+        os.replace(partial_header, header)
+        fd, partial = tempfile.mkstemp(dir=entry, prefix=binary.name + '.', suffix='.tmp')
+        os.close(fd)
+
+        try:
+            start = time.perf_counter()
+            result = job.run([compiler, std] + flags + ['-x', 'c++-header', str(header), '-o', partial],
+                             timeout=120)
+            elapsed = time.perf_counter() - start
+            if result.returncode != 0:
+                (entry / 'failed').touch()
+                return None
+            os.chmod(partial, 0o644)
+            os.replace(partial, binary)
+        finally:
+            if os.path.exists(partial):
+                os.unlink(partial)
+
+        self.evict(keep=entry)
+        return elapsed
+
+    def build_failed(self, key):
+        return (self.directory / key / 'failed').exists()
+
+    def record_cold_time(self, key, seconds):
+        entry = self.directory / key
+        entry.mkdir(parents=True, exist_ok=True)
+        (entry / 'timing.json').write_text(json.dumps({'cold_seconds': seconds}), encoding='utf-8')
+
+    def cold_time(self, key):
+        try:
+            return json.loads((self.directory / key / 'timing.json').read_text(encoding='utf-8'))['cold_seconds']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def evict(self, keep=None):
+        with self.lock:
+            entries = sorted((entry.stat().st_mtime, entry) for entry in self.directory.iterdir()
+                             if entry.is_dir() and entry != keep)
+            for mtime, entry in entries[:max(0, len(entries) - self.limit + 1)]:
+                shutil.rmtree(entry, ignore_errors=True)
+
+class JobCancelled(Exception):
+    pass
+
+class ProfilerUnavailable(Exception):
+    pass
+
+class BuildJob:
+    # A cancellable unit of background work. Every subprocess started through run()
+    # is killed as soon as cancel() is called, so a superseded build stops at once.
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.processes = set()
+        self.lock = threading.Lock()
+        self.future = None
+
+    def cancel(self):
+        self.cancelled.set()
+        with self.lock:
+            for process in self.processes:
+                try:
+                    process.kill()
+                except OSError:
+                    pass
+
+    def check(self):
+        if self.cancelled.is_set():
+            raise JobCancelled()
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def start(self, cmd, **kwargs):
+        self.check()
+        process = subprocess.Popen(cmd, **kwargs)
+        with self.lock:
+            self.processes.add(process)
+            if self.cancelled.is_set():
+                process.kill()
+        return process
+
+    def release(self, process):
+        with self.lock:
+            self.processes.discard(process)
+
+    def run(self, cmd, timeout=None, text=True, **kwargs):
+        process = self.start(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=text, **kwargs)
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+        finally:
+            self.release(process)
+        self.check()
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+class ScrollbackBuffer:
+    # Display bookkeeping for one output widget. The widget acts as a ring buffer of
+    # at most `limit` lines that is trimmed in bulk once it overflows by the slack,
+    # while the complete stream is appended to a log file on disk.
+    def __init__(self, log_path, limit=SCROLLBACK_LINES):
+        self.log_path = Path(log_path)
+        self.limit = limit
+        self.log = None
+        self.shown = 0
+        self.dropped = 0
+        self.logged = 0
+        self.log_failed = False
+        self.log_error = None
+
+    def write(self, text):
+        # Returns (replace, display_text, trim): whether the widget must be emptied
+        # first, the tail of text worth inserting, and how many leading lines to delete.
+        # If the log cannot be written (disk full, temp dir gone) spilling stops and
+        # log_error holds the reason until the caller has reported it.
+        lines = text.count('\n')
+        if not self.log_failed:
+            try:
+                if self.log is None:
+                    self.log = open(self.log_path, 'a', encoding='utf-8', errors='replace')
+                self.log.write(text)
+                self.log.flush()
+                self.logged += lines
+            except OSError as e:
+                self.log_failed = True
+                self.log_error = e
+                try:
+                    self.close()
+                except OSError:
+                    self.log = None
+
+        if lines >= self.limit:
+            cut = len(text)
+            for _ in range(self.limit + 1):
+                cut = text.rfind('\n', 0, cut)
+                if cut == -1:
+                    break
+            self.dropped += self.shown + lines - self.limit
+            self.shown = self.limit
+            return True, text[cut + 1:], 0
+
+        self.shown += lines
+        trim = 0
+        if self.shown > self.limit * (1 + SCROLLBACK_SLACK):
+            trim = self.shown - self.limit
+            self.shown = self.limit
+            self.dropped += trim
+        return False, text, trim
+
+    def clear(self):
+        self.dropped += self.shown
+        self.shown = 0
+
+    def close(self):
+        if self.log is not None:
+            log, self.log = self.log, None
+            log.close()
+
+def apply_edit(lines, record):
+    # Applies one journal record to the document held as a list of lines. Positions
+    # are Tk indices: 1-based lines, 0-based character columns.
+    kind = record[0]
+    if kind == 's':
+        lines[:] = record[1].split('\n')
+    elif kind == 'i':
+        line, column, text = record[1], record[2], record[3]
+        current = lines[line - 1]
+        lines[line - 1:line] = (current[:column] + text + current[column:]).split('\n')
+    elif kind == 'd':
+        first, first_column, last, last_column = record[1:5]
+        lines[first - 1:last] = [lines[first - 1][:first_column] + lines[last - 1][last_column:]]
+
+def coalesce_edits(records):
+    # Merges runs of typing (adjacent single-line inserts) and of backspacing into
+    # single records; the document they produce is unchanged.
+    merged = []
+    for record in records:
+        previous = merged[-1] if merged else None
+        if previous and record[0] == 'i' and previous[0] == 'i' and '\n' not in previous[3] \
+                and record[1] == previous[1] and record[2] == previous[2] + len(previous[3]):
+            merged[-1] = ['i', previous[1], previous[2], previous[3] + record[3]]
+        elif previous and record[0] == 'd' and previous[0] == 'd' and record[1] == record[3] == previous[1] \
+                and previous[1] == previous[3] and record[4] == previous[2]:
+            merged[-1] = ['d', record[1], record[2], previous[3], previous[4]]
+        else:
+            merged.append(list(record))
+    return merged
+
+def read_journal(path):
+    # Returns the header and the records up to the first incomplete line, which is
+    # where a crash interrupted the last write.
+    header = None
+    records = []
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if not line.endswith('\n'):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if header is None:
+                header = record
+            elif record[0] == 'f':
+                header['file'] = record[1]
+            else:
+                records.append(record)
+    return header, records
+
+def replay_journal(records, keep=0):
+    # Rebuilds the document from the last snapshot onwards. With keep > 0 the last
+    # `keep` edits are returned unapplied, so they can be replayed with undo.
+    start = max((index for index, record in enumerate(records) if record[0] == 's'), default=-1)
+    edits = records[start + 1:]
+    split = max(0, len(edits) - keep)
+    lines = ['']
+    if start >= 0:
+        apply_edit(lines, records[start])
+    for record in edits[:split]:
+        apply_edit(lines, record)
+    return '\n'.join(lines), edits[split:]
+
+class EditJournal:
+    # Append-only on-disk log of the editor's insert/delete operations: a header,
+    # a snapshot of the starting text, then one JSON record per edit. The Tk thread
+    # only queues records; a writer thread appends them and fsyncs once per batch,
+    # and compacts the file when it grows.
+    def __init__(self, path, file_path, text):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.operations = 0
+        self.file_path = file_path
+        self.queue = queue.Queue()
+        self.queue.put(['s', text])
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self.write_records([self.header()])
+        self.base_bytes = len(text)
+        self.written = 0
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+        self.thread.start()
+
+    def header(self):
+        return {'version': 1, 'file': self.file_path, 'pid': os.getpid()}
+
+    def rename(self, file_path):
+        self.file_path = file_path
+        self.queue.put(['f', file_path])
+
+    def snapshot(self, text):
+        self.operations += 1
+        self.queue.put(['s', text])
+
+    def insert(self, line, column, text):
+        self.operations += 1
+        self.queue.put(['i', line, column, text])
+
+    def delete(self, first, first_column, last, last_column):
+        self.operations += 1
+        self.queue.put(['d', first, first_column, last, last_column])
+
+    def write_records(self, records):
+        data = ''.join(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n' for record in records)
+        self.file.write(data)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return len(data)
+
+    def loop(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + JOURNAL_FSYNC_MS / 1000
+            while batch[-1] is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not None]
+            try:
+                if records:
+                    self.written += self.write_records(records)
+                # The file holds one snapshot; compact once the edits outweigh it.
+                if self.written > max(JOURNAL_COMPACT_BYTES, 2 * self.base_bytes):
+                    self.compact()
+            except (OSError, ValueError):
+                pass
+            if batch[-1] is None:
+                self.file.close()
+                return
+
+    def compact(self):
+        # Folds everything but the last JOURNAL_KEEP_EDITS (coalesced) edits into a
+        # new snapshot and atomically replaces the file.
+        records = read_journal(self.path)[1]
+        start = max((index for index, record in enumerate(records) if record[0] == 's'), default=0)
+        records = records[start:start + 1] + coalesce_edits(records[start + 1:])
+        text, kept = replay_journal(records, JOURNAL_KEEP_EDITS)
+        temp_path = self.path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            for record in [self.header(), ['s', text]] + kept:
+                file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+        self.file.close()
+        os.replace(temp_path, self.path)
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.base_bytes = len(text)
+        self.written = self.path.stat().st_size
+
+    def close(self, discard=False):
+        self.queue.put(None)
+        self.thread.join(timeout=5)
+        if discard:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+def orphaned_journals(directory):
+    # Journals whose IDE process is gone: the session crashed, was killed, or was
+    # closed with unsaved changes.
+    orphans = []
+    for path in sorted(Path(directory).glob('*.jnl')):
+        try:
+            pid = int(path.stem.split('-')[0])
+        except ValueError:
+            continue
+        if pid == os.getpid():
+            continue
+        if sys.platform != "win32":
+            try:
+                os.kill(pid, 0)
+                continue
+            except ProcessLookupError:
+                pass
+            except OSError:
+                continue
+        orphans.append(path)
+    return orphans
+
+class ShellSession:
+    # A long-lived shell fed through its stdin, so cd and exported variables persist.
+    # After every command the shell prints a marker with the exit status and working
+    # directory; the reader strips it from the stream and reports the command as done.
+    MARK_START = '\x1e'
+    MARK_END = '\x1f'
+
+    def __init__(self, on_output, on_done):
+        self.on_output = on_output
+        self.on_done = on_done
+        self.process = None
+        self.busy = False
+        self.cwd = os.getcwd()
+        self.shell = '/bin/bash' if os.path.exists('/bin/bash') else '/bin/sh'
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        if sys.platform == "win32":
+            cmd = ['cmd.exe', '/Q', '/K', 'prompt', '$H']
+            kwargs = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            cmd = [self.shell]
+            kwargs = {'start_new_session': True}
+
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT, bufsize=0, cwd=self.cwd, **kwargs)
+        if sys.platform != "win32":
+            # A no-op trap keeps the shell alive on SIGINT while its children still
+            # get the default disposition and are interrupted.
+            self.write("trap ':' INT\n")
+
+        thread = threading.Thread(target=self.read_loop, args=(self.process,))
+        thread.daemon = True
+        thread.start()
+
+    def write(self, text):
+        self.process.stdin.write(text.encode('utf-8'))
+        self.process.stdin.flush()
+
+    def execute(self, command):
+        if not self.alive():
+            self.start()
+        if sys.platform == "win32":
+            script = f"{command}\necho {self.MARK_START}%ERRORLEVEL% %CD%{self.MARK_END}\n"
+        else:
+            # The group makes bash read the marker together with the command, so a
+            # command that reads stdin gets the user's next line, not the marker.
+            script = f"{{\n{command}\n}}; printf '\\036%s %s\\037\\n' \"$?\" \"$PWD\"\n"
+            # An incomplete command (an open quote, a here-document without its end)
+            # would swallow the marker and leave the session busy for good.
+            error = self.syntax_error(script)
+            if error:
+                self.on_output(error + '\n')
+                self.on_done('2', self.cwd)
+                return
+        self.busy = True
+        self.write(script)
+
+    def syntax_error(self, script):
+        try:
+            result = subprocess.run([self.shell, '-n'], input=script, capture_output=True, text=True, timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if result.returncode != 0 or 'here-document' in result.stderr:
+            return result.stderr.strip() or "syntax error"
+        return None
+
+    def has_children(self):
+        # Unknown (no /proc) counts as running, so interrupt never kills real work.
+        pid = self.process.pid
+        try:
+            with open(f"/proc/{pid}/task/{pid}/children") as file:
+                return bool(file.read().split())
+        except OSError:
+            return True
+
+    def send_input(self, text):
+        self.write(text + '\n')
+
+    def read_loop(self, process):
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        fd = process.stdout.fileno()
+        pending = ''
+        skip_newline = False
+
+        while True:
+            chunk = os.read(fd, READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            text = pending + decoder.decode(chunk).replace('\r\n', '\n')
+            if sys.platform == "win32":
+                text = text.replace('\x08', '')
+            pending = ''
+
+            while text:
+                if skip_newline:
+                    text = text[1:] if text.startswith('\n') else text
+                    skip_newline = False
+                    continue
+                start = text.find(self.MARK_START)
+                if start == -1:
+                    self.on_output(text)
+                    break
+                if start:
+                    self.on_output(text[:start])
+                end = text.find(self.MARK_END, start)
+                if end == -1:
+                    pending = text[start:]
+                    break
+                status, _, cwd = text[start + 1:end].partition(' ')
+                text = text[end + 1:]
+                skip_newline = True
+                self.finish(status, cwd.strip())
+
+        if self.process is process:
+            self.finish(None, self.cwd)
+
+    def finish(self, status, cwd):
+        self.busy = False
+        if cwd:
+            self.cwd = cwd
+        self.on_done(status, self.cwd)
+
+    def interrupt(self):
+        if not self.alive():
+            return
+        if self.busy and sys.platform != "win32" and not self.has_children():
+            # Busy with nothing running: the shell is stuck waiting for input that
+            # completes the command, so a fresh session replaces it.
+            self.close()
+            self.start()
+            self.on_output("Shell restarted; exported variables were reset\n")
+            self.finish('130', self.cwd)
+            return
+        try:
+            if sys.platform == "win32":
+                self.process.send_signal(signal.CTRL_BREAK_EVENT)
+            else:
+                os.killpg(self.process.pid, signal.SIGINT)
+        except OSError:
+            pass
+
+    def close(self):
+        process, self.process = self.process, None
+        if process is None or process.poll() is not None:
+            return
+        try:
+            if sys.platform == "win32":
+                process.kill()
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+DIAGNOSTIC_LINE = re.compile(r'^(.+?):(\d+):(?:(\d+):)? (fatal error|error|warning|note): (.*?)(?: \[(-W[^\]]+)\])?$')
+
+def diagnostic_args(kind, identity):
+    # Asks the compiler for machine-readable diagnostics: SARIF on GCC 13+, JSON on
+    # GCC 9-12. Clang's one-line-per-diagnostic text is parsed as is.
+    if kind == 'gcc':
+        match = re.search(r'\) (\d+)\.\d+', identity or '')
+        major = int(match.group(1)) if match else 0
+        if major >= 13:
+            return ['-fdiagnostics-format=sarif-stderr']
+        if major >= 9:
+            return ['-fdiagnostics-format=json']
+    if kind == 'clang':
+        return ['-fno-color-diagnostics', '-fno-caret-diagnostics']
+    return []
+
+def make_diagnostic(severity, message, file=None, line=0, column=0, end_column=0, option=None):
+    if severity == 'fatal error':
+        severity = 'error'
+    return {'severity': severity, 'message': message, 'file': file, 'line': line,
+            'column': column, 'end_column': end_column, 'option': option, 'children': []}
+
+def gcc_json_diagnostic(entry):
+    caret = finish = {}
+    if entry.get('locations'):
+        caret = entry['locations'][0].get('caret', {})
+        finish = entry['locations'][0].get('finish', caret)
+    diagnostic = make_diagnostic(entry.get('kind', 'error'), entry.get('message', ''),
+                                 caret.get('file'), caret.get('line', 0), caret.get('column', 0),
+                                 finish.get('column', 0), entry.get('option'))
+    diagnostic['children'] = [gcc_json_diagnostic(child) for child in entry.get('children', [])]
+    return diagnostic
+
+def sarif_location(location):
+    physical = location.get('physicalLocation', {})
+    uri = physical.get('artifactLocation', {}).get('uri')
+    if uri and uri.startswith('file://'):
+        uri = uri[len('file://'):]
+    region = physical.get('region', {})
+    return uri, region.get('startLine', 0), region.get('startColumn', 0), region.get('endColumn', 0)
+
+def sarif_diagnostics(log):
+    diagnostics = []
+    for run in log.get('runs', []):
+        for result in run.get('results', []):
+            locations = result.get('locations') or [{}]
+            level = result.get('level', 'warning')
+            diagnostic = make_diagnostic('note' if level == 'none' else level,
+                                         result.get('message', {}).get('text', ''),
+                                         *sarif_location(locations[0]), option=result.get('ruleId'))
+            for related in result.get('relatedLocations', []):
+                diagnostic['children'].append(make_diagnostic(
+                    'note', related.get('message', {}).get('text', ''), *sarif_location(related)))
+            diagnostics.append(diagnostic)
+    return diagnostics
+
+def parse_diagnostics(text):
+    # Splits compiler stderr into structured diagnostics and the lines that are not
+    # diagnostics (linker errors, "In file included from" context, ...). Notes are
+    # attached to the preceding error or warning.
+    diagnostics = []
+    other = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped[:1] in '[{' and stripped:
+            try:
+                data = json.loads(stripped)
+            except ValueError:
+                data = None
+            if isinstance(data, list):
+                diagnostics.extend(gcc_json_diagnostic(entry) for entry in data)
+                continue
+            if isinstance(data, dict) and 'runs' in data:
+                diagnostics.extend(sarif_diagnostics(data))
+                continue
+        match = DIAGNOSTIC_LINE.match(line)
+        if match:
+            file, line_no, column, severity, message, option = match.groups()
+            diagnostic = make_diagnostic(severity, message, file, int(line_no), int(column or 0),
+                                         option=option)
+            if severity == 'note' and diagnostics:
+                diagnostics[-1]['children'].append(diagnostic)
+            else:
+                diagnostics.append(diagnostic)
+        elif stripped:
+            other.append(line)
+    return diagnostics, other
+
+def format_diagnostic(diagnostic, display_file=None):
+    location = display_file or diagnostic['file'] or '<command line>'
+    if diagnostic['line']:
+        location += f":{diagnostic['line']}"
+        if diagnostic['column']:
+            location += f":{diagnostic['column']}"
+    text = f"{location}: {diagnostic['severity']}: {diagnostic['message']}"
+    if diagnostic['option']:
+        text += f" [{diagnostic['option']}]"
+    return text
+
+def relocate_diagnostics(diagnostics, old_file, new_file):
+    for diagnostic in diagnostics:
+        if diagnostic['file'] and os.path.abspath(diagnostic['file']) == os.path.abspath(old_file):
+            diagnostic['file'] = new_file
+        relocate_diagnostics(diagnostic['children'], old_file, new_file)
+
+class DiagnosticIndex:
+    # Diagnostics of one build, indexed by file and counted by severity.
+    def __init__(self, diagnostics=(), other=()):
+        self.items = list(diagnostics)
+        self.other = list(other)
+        self.by_file = {}
+        self.counts = {}
+        for diagnostic in self.items:
+            self.by_file.setdefault(diagnostic['file'], []).append(diagnostic)
+            self.counts[diagnostic['severity']] = self.counts.get(diagnostic['severity'], 0) + 1
+
+    def extend(self, diagnostics, other=()):
+        for diagnostic in diagnostics:
+            self.items.append(diagnostic)
+            self.by_file.setdefault(diagnostic['file'], []).append(diagnostic)
+            self.counts[diagnostic['severity']] = self.counts.get(diagnostic['severity'], 0) + 1
+        self.other.extend(other)
+
+    def summary(self):
+        parts = []
+        for severity in ('error', 'warning', 'note'):
+            count = self.counts.get(severity, 0)
+            if count:
+                parts.append(f"{count} {severity}{'s' if count != 1 else ''}")
+        return ', '.join(parts) or "no diagnostics"
+
+class Project:
+    # A multi-file build described by a JSON project file. Paths are relative to the
+    # directory holding the project file; sources may use glob patterns.
+    def __init__(self, path, data):
+        self.path = Path(path).resolve()
+        self.root = self.path.parent
+        self.name = data.get('name', self.path.stem)
+        self.sources = []
+        for pattern in data.get('sources', []):
+            matches = sorted(self.root.glob(pattern)) if any(c in pattern for c in '*?[') else [self.root / pattern]
+            self.sources.extend(match.resolve() for match in matches)
+        self.include_dirs = [(self.root / inc).resolve() for inc in data.get('include_dirs', [])]
+        self.flags = data.get('flags', [])
+        self.link_flags = data.get('link_flags', [])
+        self.std = data.get('std')
+        self.compiler = data.get('compiler')
+        self.build_dir = (self.root / data.get('build_dir', 'build')).resolve()
+        suffix = '.exe' if sys.platform == "win32" else ''
+        self.output = self.build_dir / (data.get('output', self.name) + suffix)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as file:
+            return cls(path, json.load(file))
+
+def read_depfile(path):
+    # Dependencies from a make-style .d file written by -MMD, without the target.
+    try:
+        text = Path(path).read_text(encoding='utf-8', errors='replace')
+    except OSError:
+        return None
+    text = text.replace('\\\r\n', ' ').replace('\\\n', ' ')
+    deps = []
+    for rule in text.splitlines():
+        _, sep, prerequisites = rule.partition(': ')
+        if not sep:
+            continue
+        for token in re.split(r'(?<!\\)\s+', prerequisites.strip()):
+            if token:
+                deps.append(token.replace('\\ ', ' '))
+    return deps
+
+class ProjectBuilder:
+    # Incremental project build: translation units whose object, depfile and recorded
+    # command are up to date are skipped, the rest compile in parallel, then relink.
+    def __init__(self, project, compiler, std, job, log, workers=None):
+        self.project = project
+        self.compiler = project.compiler or compiler
+        self.std = project.std or std
+        self.job = job
+        self.log = log
+        self.workers = workers or os.cpu_count() or 1
+        self.state_path = project.build_dir / 'build_state.json'
+        self.diagnostic_flags = []
+        self.diagnostics = DiagnosticIndex()
+
+    def object_path(self, source):
+        try:
+            relative = source.relative_to(self.project.root)
+        except ValueError:
+            relative = Path(hashlib.sha256(str(source).encode('utf-8')).hexdigest()[:12]) / source.name
+        return self.project.build_dir / 'obj' / relative.with_suffix(relative.suffix + '.o')
+
+    def display_name(self, source):
+        return source.relative_to(self.project.root) if source.is_relative_to(self.project.root) else source
+
+    def compile_command(self, source, obj):
+        depfile = obj.with_suffix('.d')
+        return ([self.compiler, f"-std={self.std}"] + self.project.flags
+                + [f"-I{inc}" for inc in self.project.include_dirs] + self.diagnostic_flags
+                + ['-MMD', '-MF', str(depfile), '-c', str(source), '-o', str(obj)])
+
+    def signature(self, cmd):
+        return hashlib.sha256('\0'.join(cmd).encode('utf-8')).hexdigest()
+
+    def load_state(self):
+        try:
+            return json.loads(self.state_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def up_to_date(self, source, obj, cmd, state):
+        if state.get(str(obj)) != self.signature(cmd) or not obj.exists():
+            return False
+        deps = read_depfile(obj.with_suffix('.d'))
+        if deps is None:
+            return False
+        built = obj.stat().st_mtime
+        for dep in [str(source)] + deps:
+            try:
+                if os.stat(dep).st_mtime > built:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def compile_unit(self, source, obj, cmd):
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+        result = self.job.run(cmd, timeout=300)
+        return result, time.perf_counter() - start
+
+    def log_diagnostics(self, text):
+        diagnostics, other = parse_diagnostics(text)
+        self.diagnostics.extend(diagnostics, other)
+        for diagnostic in diagnostics[:DIAGNOSTIC_OUTPUT_LINES]:
+            self.log(f"      {format_diagnostic(diagnostic)}")
+        if len(diagnostics) > DIAGNOSTIC_OUTPUT_LINES:
+            self.log(f"      ... {len(diagnostics) - DIAGNOSTIC_OUTPUT_LINES} more in the Problems tab")
+        for line in other[:DIAGNOSTIC_OUTPUT_LINES]:
+            self.log(f"      {line}")
+
+    def build(self):
+        project = self.project
+        if not project.sources:
+            self.log("The project has no source files")
+            return None
+        project.build_dir.mkdir(parents=True, exist_ok=True)
+        state = self.load_state()
+        start = time.perf_counter()
+
+        units = []
+        stale = []
+        for source in project.sources:
+            obj = self.object_path(source)
+            cmd = self.compile_command(source, obj)
+            units.append(obj)
+            if self.up_to_date(source, obj, cmd, state):
+                self.log(f"  [ up to date ] {self.display_name(source)}")
+            else:
+                stale.append((source, obj, cmd))
+
+        self.log(f"Compiling {len(stale)} of {len(units)} translation units on {self.workers} workers")
+        failed = False
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [(source, obj, cmd, pool.submit(self.compile_unit, source, obj, cmd))
+                       for source, obj, cmd in stale]
+            for source, obj, cmd, future in futures:
+                name = self.display_name(source)
+                try:
+                    result, elapsed = future.result()
+                except JobCancelled:
+                    raise
+                except FileNotFoundError:
+                    self.log(f"Compiler {self.compiler} Not found!")
+                    return None
+                except subprocess.TimeoutExpired:
+                    self.log(f"  [  timeout   ] {name}")
+                    failed = True
+                    continue
+                if result.returncode == 0:
+                    state[str(obj)] = self.signature(cmd)
+                    self.log(f"  [{elapsed:8.2f}s ] {name}")
+                else:
+                    state.pop(str(obj), None)
+                    failed = True
+                    self.log(f"  [   failed   ] {name}")
+                self.log_diagnostics(result.stderr or result.stdout)
+
+        self.state_path.write_text(json.dumps(state, indent=1), encoding='utf-8')
+        if failed:
+            return None
+
+        output = project.output
+        newest = max(obj.stat().st_mtime for obj in units)
+        link_cmd = [self.compiler] + [str(obj) for obj in units] + project.link_flags + ['-o', str(output)]
+        if stale or not output.exists() or output.stat().st_mtime < newest or \
+                state.get(str(output)) != self.signature(link_cmd):
+            link_start = time.perf_counter()
+            result = self.job.run(link_cmd, timeout=300)
+            if result.returncode != 0:
+                self.log("Link Errors:")
+                self.log_diagnostics(result.stderr or result.stdout)
+                return None
+            state[str(output)] = self.signature(link_cmd)
+            self.state_path.write_text(json.dumps(state, indent=1), encoding='utf-8')
+            self.log(f"  [{time.perf_counter() - link_start:8.2f}s ] link {output.name}")
+        else:
+            self.log(f"  [ up to date ] link {output.name}")
+
+        self.log(f"Total: {time.perf_counter() - start:.2f}s")
+        return str(output)
+
+def natural_key(text):
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', text)]
+
+def find_test_cases(folder):
+    # Pairs every NAME.in with NAME.out (or NAME.ans) in the folder.
+    cases = []
+    for input_path in Path(folder).glob('*.in'):
+        for suffix in ('.out', '.ans'):
+            expected = input_path.with_suffix(suffix)
+            if expected.exists():
+                cases.append((input_path.stem, input_path, expected))
+                break
+    return sorted(cases, key=lambda case: natural_key(case[0]))
+
+def normalize_output(text):
+    lines = [line.rstrip() for line in text.splitlines()]
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+def run_test_case(executable, name, input_path, expected_path, timeout, job):
+    # Runs one case with the input file as stdin and compares whitespace-normalized
+    # output. Status is PASS, FAIL (wrong answer), RE (non-zero exit) or TLE.
+    expected = normalize_output(Path(expected_path).read_text(encoding='utf-8', errors='replace'))
+    start = time.perf_counter()
+    try:
+        with open(input_path, 'rb') as stdin:
+            result = job.run([executable], timeout=timeout, text=False, stdin=stdin)
+    except subprocess.TimeoutExpired:
+        return {'name': name, 'status': 'TLE', 'wall': time.perf_counter() - start,
+                'exit_code': None, 'diff': f"Time limit of {timeout}s exceeded"}
+    wall = time.perf_counter() - start
+
+    actual = normalize_output(result.stdout.decode('utf-8', errors='replace'))
+    diff = ''
+    if result.returncode != 0:
+        status = 'RE'
+        diff = result.stderr.decode('utf-8', errors='replace')[-2000:]
+    elif actual == expected:
+        status = 'PASS'
+    else:
+        status = 'FAIL'
+    if status != 'PASS' and actual != expected:
+        diff += '\n'.join(list(difflib.unified_diff(expected, actual, 'expected', 'actual', lineterm=''))[:40])
+    return {'name': name, 'status': status, 'wall': wall, 'exit_code': result.returncode, 'diff': diff}
+
+RUSAGE_HELPER_SOURCE = r"""
+#include <sys/resource.h>
+#include <sys/wait.h>
+#include <unistd.h>
+#include <signal.h>
+#include <stdio.h>
+#include <time.h>
+#ifdef __linux__
+#include <sys/prctl.h>
+#endif
+
+int main(int argc, char** argv) {
+    if (argc < 3) return 127;
+    struct timespec start, end;
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    pid_t pid = fork();
+    if (pid == 0) {
+#ifdef __linux__
+        prctl(PR_SET_PDEATHSIG, SIGKILL);
+#endif
+        execv(argv[2], argv + 2);
+        _exit(127);
+    }
+    int status = 0;
+    struct rusage usage;
+    if (pid < 0 || wait4(pid, &status, 0, &usage) < 0) return 127;
+    clock_gettime(CLOCK_MONOTONIC, &end);
+    FILE* out = fopen(argv[1], "w");
+    if (!out) return 127;
+    int code = WIFEXITED(status) ? WEXITSTATUS(status) : -WTERMSIG(status);
+    fprintf(out, "%.9f %ld.%06ld %ld.%06ld %ld %d\n",
+            (end.tv_sec - start.tv_sec) + (end.tv_nsec - start.tv_nsec) / 1e9,
+            (long)usage.ru_utime.tv_sec, (long)usage.ru_utime.tv_usec,
+            (long)usage.ru_stime.tv_sec, (long)usage.ru_stime.tv_usec,
+            (long)usage.ru_maxrss, code);
+    fclose(out);
+    return 0;
+}
+"""
+
+rusage_helper_lock = threading.Lock()
+
+def rusage_helper(compiler):
+    # Peak RSS reported by wait4 from Python includes the IDE's own footprint, because
+    # the child inherits the parent's high-water mark before exec. A tiny native
+    # launcher forked from a small process measures the program alone.
+    if sys.platform == "win32":
+        return None
+    path = APP_DIR / 'tools' / 'rusage'
+    with rusage_helper_lock:
+        if path.exists():
+            return str(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        source = path.with_name('rusage.cpp')
+        source.write_text(RUSAGE_HELPER_SOURCE, encoding='utf-8')
+        partial = path.with_name('rusage.tmp')
+        try:
+            result = subprocess.run([compiler, '-O2', str(source), '-o', str(partial)],
+                                    capture_output=True, timeout=60)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if result.returncode != 0:
+            return None
+        os.replace(partial, path)
+        return str(path)
+
+def measure_run(executable, job, stdin=None, helper=None):
+    # One run with output discarded, returning wall/user/sys seconds and peak RSS bytes.
+    stdin = stdin if stdin is not None else subprocess.DEVNULL
+    scale = 1 if sys.platform == "darwin" else 1024
+
+    if helper:
+        fd, stats_path = tempfile.mkstemp(suffix='.rusage')
+        os.close(fd)
+        process = job.start([helper, stats_path, executable], stdin=stdin,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            process.wait()
+            job.check()
+            with open(stats_path, 'r') as stats:
+                wall, user, system, rss, exit_code = stats.read().split()
+            return {'wall': float(wall), 'user': float(user), 'sys': float(system),
+                    'rss': int(rss) * scale, 'exit_code': int(exit_code)}
+        finally:
+            job.release(process)
+            os.unlink(stats_path)
+
+    start = time.perf_counter()
+    process = job.start([executable], stdin=stdin, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if hasattr(os, 'wait4'):
+            _, status, usage = os.wait4(process.pid, 0)
+            wall = time.perf_counter() - start
+            process.returncode = os.waitstatus_to_exitcode(status)
+            return {'wall': wall, 'user': usage.ru_utime, 'sys': usage.ru_stime,
+                    'rss': usage.ru_maxrss * scale, 'exit_code': process.returncode}
+        process.wait()
+        return {'wall': time.perf_counter() - start, 'user': None, 'sys': None,
+                'rss': None, 'exit_code': process.returncode}
+    finally:
+        job.release(process)
+        job.check()
+
+def summarize(values):
+    values = sorted(value for value in values if value is not None)
+    if not values:
+        return None
+    return {
+        'min': values[0],
+        'median': statistics.median(values),
+        'p95': values[max(0, math.ceil(0.95 * len(values)) - 1)],
+        'stddev': statistics.pstdev(values),
+    }
+
+class BenchmarkStore:
+    # Benchmark history per source hash in a small JSON file.
+    def __init__(self, path, history=BENCHMARK_HISTORY):
+        self.path = Path(path)
+        self.history = history
+        self.lock = threading.Lock()
+
+    def load(self):
+        try:
+            return json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def last(self, source_hash):
+        with self.lock:
+            entries = self.load().get(source_hash, [])
+        return entries[-1] if entries else None
+
+    def add(self, source_hash, entry):
+        with self.lock:
+            data = self.load()
+            entries = data.setdefault(source_hash, [])
+            entries.append(entry)
+            del entries[:-self.history]
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix('.tmp')
+            temp_path.write_text(json.dumps(data), encoding='utf-8')
+            os.replace(temp_path, self.path)
+
+    def entries(self):
+        with self.lock:
+            data = self.load()
+        entries = [(source_hash, entry) for source_hash, history in data.items() for entry in history]
+        return sorted(entries, key=lambda item: item[1]['time'])
+
+TIME_REPORT_LINE = re.compile(r'^\s*(\|?)(.+?)\s*:\s*([\d.]+)\s*\(\s*\d+%\)\s*([\d.]+)\s*\(\s*\d+%\)\s*([\d.]+)')
+
+def parse_time_report(text):
+    # GCC -ftime-report: one row per timer with usr, sys and wall columns. GCC has
+    # no per-header or per-template data, only phases and passes (the
+    # "template instantiation" pass covers all templates together).
+    totals = {}
+    for line in text.splitlines():
+        match = TIME_REPORT_LINE.match(line)
+        if not match or match.group(2) == 'TOTAL':
+            continue
+        nested, name, wall = match.group(1), match.group(2), float(match.group(5))
+        if name.startswith('phase '):
+            key = ('phase', name[len('phase '):])
+        else:
+            key = ('pass', ('| ' if nested else '') + name)
+        totals[key] = totals.get(key, 0.0) + wall
+    return totals
+
+def parse_time_trace(path):
+    # clang -ftime-trace: Chrome trace events in microseconds. Header times are
+    # inclusive of the headers they include.
+    with open(path, encoding='utf-8') as file:
+        events = json.load(file).get('traceEvents', [])
+    totals = {}
+    for event in events:
+        if event.get('ph') != 'X' or 'dur' not in event:
+            continue
+        name = event.get('name', '')
+        detail = event.get('args', {}).get('detail', '')
+        if name == 'Source':
+            key = ('header', detail)
+        elif name.startswith('Instantiate'):
+            key = ('template', detail)
+        elif name.startswith('Total '):
+            key = ('phase', name[len('Total '):])
+        elif name in ('ParseFunctionDefinition', 'ParseClass', 'OptFunction', 'CodeGen Function'):
+            key = ('function', f"{detail} ({name})")
+        else:
+            continue
+        totals[key] = totals.get(key, 0.0) + event['dur'] / 1e6
+    return totals
+
+def scan_path_for_compilers():
+    # C++ drivers on PATH, including versioned names such as g++-13 or clang++-17.
+    # The first match of each name wins, as it would for the shell.
+    found = {}
+    for directory in os.environ.get('PATH', '').split(os.pathsep):
+        try:
+            entries = os.listdir(directory or '.')
+        except OSError:
+            continue
+        for entry in entries:
+            match = COMPILER_NAME.match(entry)
+            if not match or match.group(0) in found:
+                continue
+            path = os.path.join(directory, entry)
+            if os.path.isfile(path) and os.access(path, os.X_OK):
+                name = entry[:-4] if entry.lower().endswith('.exe') else entry
+                found.setdefault(name, path)
+    if sys.platform == "win32" and shutil.which('cl'):
+        found['cl'] = shutil.which('cl')
+    return found
+
+def probe_compiler(name, path):
+    info = {'name': name, 'path': path, 'version': '', 'stds': []}
+    if name == 'cl':
+        info['stds'] = ["c++14", "c++17", "c++20"]
+        return info
+    try:
+        result = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=5)
+        info['version'] = (result.stdout or result.stderr).strip().splitlines()[0]
+    except (OSError, subprocess.TimeoutExpired, IndexError):
+        return None
+    for std in CPP_STANDARDS:
+        try:
+            check = subprocess.run([path, f"-std={std}", '-x', 'c++', '-fsyntax-only', '-'],
+                                   input='', capture_output=True, text=True, timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        if check.returncode == 0:
+            info['stds'].append(std)
+    return info
+
+def discover_compilers(cache_path):
+    # Probes every compiler on PATH in parallel. Results are cached on disk and
+    # reused while the resolved binary keeps the same mtime.
+    cache_path = Path(cache_path)
+    try:
+        cache = json.loads(cache_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        cache = {}
+
+    candidates = {}
+    for name, path in scan_path_for_compilers().items():
+        try:
+            real = os.path.realpath(path)
+            candidates[name] = (path, real, os.stat(real).st_mtime_ns)
+        except OSError:
+            continue
+
+    results = {}
+    stale = []
+    for name, (path, real, mtime) in candidates.items():
+        entry = cache.get(name)
+        if entry and entry.get('real') == real and entry.get('mtime') == mtime:
+            results[name] = entry
+        else:
+            stale.append(name)
+
+    if stale:
+        with ThreadPoolExecutor(max_workers=min(8, len(stale))) as pool:
+            probes = {name: pool.submit(probe_compiler, name, candidates[name][0]) for name in stale}
+            for name, future in probes.items():
+                info = future.result()
+                if info:
+                    path, real, mtime = candidates[name]
+                    info.update(real=real, mtime=mtime)
+                    results[name] = info
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps(results, indent=1), encoding='utf-8')
+        except OSError:
+            pass
+
+    preferred = {'g++': 0, 'clang++': 1, 'c++': 2, 'cl': 3}
+    return sorted(results.values(), key=lambda info: (preferred.get(info['name'], 4), natural_key(info['name'])))
+
+ASM_FILE = re.compile(r'^\s*\.file\s+(\d+)\s+"([^"]*)"(?:\s+"([^"]*)")?')
+ASM_LOC = re.compile(r'^\s*\.loc\s+(\d+)\s+(\d+)')
+ASM_LABEL = re.compile(r'^(\.L\d+|"[^"]*"|[^.\s"][^\s:]*):')
+
+def parse_assembly(text, source):
+    # Keeps labels and instructions of the code sections and tags each instruction
+    # with the line of `source` it came from, following the .loc directives that
+    # -g emits. Code inlined from other files maps to no line. Expects the raw,
+    # mangled compiler output: labels start at column 0 and contain no spaces, so an
+    # instruction such as `movq %fs:40, %rax` is never taken for one.
+    files = {}
+    lines = []
+    in_code = True
+    current_line = None
+    source_name = os.path.basename(source)
+    for raw in text.splitlines():
+        stripped = raw.strip()
+        if not stripped or stripped.startswith(('#', '//', ';')):
+            continue
+        match = ASM_FILE.match(raw)
+        if match:
+            name = match.group(3) or match.group(2)
+            files[match.group(1)] = os.path.basename(name) == source_name
+            continue
+        match = ASM_LOC.match(raw)
+        if match:
+            current_line = int(match.group(2)) if files.get(match.group(1)) else None
+            continue
+        if stripped.startswith(('.text', '.section', '.data', '.bss')):
+            section = stripped.split()[1].rstrip(',') if stripped.startswith('.section') else stripped.split()[0]
+            in_code = section.startswith('.text')
+            continue
+        if not in_code:
+            continue
+        label = ASM_LABEL.match(raw)
+        if label:
+            lines.append((stripped, None))
+            if not stripped.startswith('.L'):
+                current_line = None
+        elif not stripped.startswith('.'):
+            lines.append(('    ' + ' '.join(stripped.split()), current_line))
+    return lines
+
+def demangle(text):
+    tool = shutil.which('c++filt')
+    if not tool:
+        return text
+    try:
+        return subprocess.run([tool], input=text, capture_output=True, text=True, timeout=30).stdout or text
+    except (OSError, subprocess.TimeoutExpired):
+        return text
+
+GPROF_FLAT_LINE = re.compile(r'^\s*([\d.]+)\s+[\d.]+\s+([\d.]+)\s+(?:(\d+)\s+[\d.]+\s+[\d.]+\s+)?(\S.*)$')
+GPROF_LOCATION = re.compile(r'^(.*) \((.+):(\d+) @ [0-9a-f]+\)$')
+PERF_REPORT_LINE = re.compile(r'^\s*([\d.]+)%\s+\[[.k]\]\s+(.+?)\s+(\S+):(\d+)\s*$')
+
+def parse_gprof_flat(text):
+    # Rows of a gprof flat profile as (name, percent, self seconds, calls). With
+    # -l the name carries "(file:line @ address)" and is returned as is.
+    rows = []
+    for line in text.splitlines():
+        match = GPROF_FLAT_LINE.match(line)
+        if match:
+            percent, seconds, calls, name = match.groups()
+            rows.append((name.strip(), float(percent), float(seconds), int(calls) if calls else None))
+    return rows
+
+def parse_perf_report(text):
+    # perf report --sort sym,srcline: one (symbol, file, line, percent) row each.
+    rows = []
+    for line in text.splitlines():
+        match = PERF_REPORT_LINE.match(line)
+        if match:
+            percent, symbol, file, line_no = match.groups()
+            rows.append((symbol, file, int(line_no), float(percent)))
+    return rows
+
+SYMBOL_DEFINE = re.compile(r'^\s*#\s*define\s+(\w+)')
+SYMBOL_INCLUDE = re.compile(r'^\s*#\s*include\s*"([^"]+)"')
+SYMBOL_TYPE = re.compile(r'\b(class|struct|union|enum(?:\s+class|\s+struct)?|namespace)\s+(?:alignas\s*\([^)]*\)\s*)?(\w+)\s*(?![\w;])')
+SYMBOL_ALIAS = re.compile(r'\busing\s+(\w+)\s*=|\btypedef\b.*?(\w+)\s*;')
+SYMBOL_FUNCTION = re.compile(r'^\s*(?:template\s*<.*>\s*)?(?P<type>(?:[\w:]+(?:<[^;()]*>)?[\s*&]+)*)'
+                             r'(?P<name>(?:\w+(?:<[^;()]*>)?::)*(?:operator\s*(?:\(\)|[^\s\w(]+|\w+)|~?\w+))'
+                             r'\s*\([^;]*$')
+SYMBOL_VARIABLE = re.compile(r'^\s*(?:(?:static|const|constexpr|extern|inline|thread_local|mutable|volatile)\s+)*'
+                             r'([\w:]+)(?:<[^;()]*>)?[\s*&]+(\w+)\s*(?:=|;|\[|\{|,)')
+SYMBOL_DECLARATION = re.compile(r'^\s*(?:template\s*<.*>\s*)?((?:[\w:]+(?:<[^;()]*>)?[\s*&]+)+)(~?\w+)\s*\([^;{]*\)'
+                                r'\s*(?:const\s*)?(?:noexcept\s*)?(?:override\s*)?(?:=\s*0\s*)?;')
+SYMBOL_NOT_TYPES = {'return', 'delete', 'goto', 'case', 'else', 'using', 'typedef', 'throw', 'new',
+                    'co_return', 'co_yield', 'co_await', 'sizeof', 'do', 'public', 'private', 'protected',
+                    'class', 'struct', 'union', 'enum', 'namespace', 'template', 'typename', 'friend'}
+SYMBOL_NOT_NAMES = {'if', 'for', 'while', 'switch', 'return', 'sizeof', 'catch', 'decltype', 'alignof',
+                    'static_assert', 'defined', 'operator'}
+
+def extract_line_symbols(line, state, keywords):
+    # (kind, name, column, scope) of every declaration on one line plus local
+    # includes. The scope is the qualifier of an out-of-line definition such as
+    # `int Graph::size() const {`, whose name is indexed as `size`.
+    # Comments and literals are blanked using the highlighter's lexer first, so the
+    # same state machine decides what is code.
+    tokens, next_state = lex_cpp_line(line, state, keywords)
+    code = list(line)
+    for tag, start, end in tokens:
+        if tag in ('comment', 'string'):
+            code[start:end] = ' ' * (end - start)
+    code = ''.join(code)
+
+    found = []
+    includes = []
+    if code.lstrip().startswith('#'):
+        match = SYMBOL_DEFINE.match(code)
+        if match:
+            found.append(('macro', match.group(1), match.start(1), ''))
+        match = SYMBOL_INCLUDE.match(line)
+        if match:
+            includes.append(match.group(1))
+        return found, includes, next_state
+
+    for match in SYMBOL_TYPE.finditer(code):
+        found.append(('namespace' if match.group(1) == 'namespace' else 'type', match.group(2), match.start(2), ''))
+    for match in SYMBOL_ALIAS.finditer(code):
+        group = 1 if match.group(1) else 2
+        found.append(('type', match.group(group), match.start(group), ''))
+    match = SYMBOL_FUNCTION.match(code)
+    declaration = SYMBOL_DECLARATION.match(code)
+    function = None
+    if match:
+        scope, _, name = match.group('name').rpartition('::')
+        return_type = match.group('type').split()
+        # Without a return type only a qualified constructor or destructor counts, so
+        # a call continued on the next line (`std::sort(a,`) is not a definition.
+        if return_type and return_type[0] not in SYMBOL_NOT_TYPES or \
+                not return_type and scope and scope.rpartition('::')[2].split('<')[0] == name.lstrip('~'):
+            if name not in SYMBOL_NOT_NAMES and name not in keywords:
+                function = (name, match.end('name') - len(name), scope)
+    if function:
+        found.append(('function',) + function)
+    elif declaration and declaration.group(1).split()[0] not in SYMBOL_NOT_TYPES \
+            and declaration.group(2) not in SYMBOL_NOT_NAMES and declaration.group(2) not in keywords:
+        found.append(('declaration', declaration.group(2), declaration.start(2), ''))
+    else:
+        match = SYMBOL_VARIABLE.match(code)
+        if match and match.group(1) not in SYMBOL_NOT_TYPES and match.group(2) not in keywords:
+            found.append(('variable', match.group(2), match.start(2), ''))
+    return found, includes, next_state
+
+class SymbolTrie:
+    # Prefix tree of symbol names. Each node maps characters to children; the None
+    # key counts how many indexed symbols end there, so removals can prune.
+    def __init__(self):
+        self.root = {}
+
+    def add(self, word):
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[None] = node.get(None, 0) + 1
+
+    def discard(self, word):
+        path = [self.root]
+        for char in word:
+            node = path[-1].get(char)
+            if node is None:
+                return
+            path.append(node)
+        if not path[-1].get(None):
+            return
+        path[-1][None] -= 1
+        if path[-1][None]:
+            return
+        del path[-1][None]
+        for depth in range(len(word), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][word[depth - 1]]
+
+    def complete(self, prefix, limit=20):
+        # Depth first in character order: names come out sorted, a name before its
+        # extensions, and only about limit * depth nodes are visited.
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        words = []
+        stack = [(prefix, node)]
+        while stack and len(words) < limit:
+            word, node = stack.pop()
+            if node.get(None) and word != prefix:
+                words.append(word)
+            stack.extend((word + char, child) for char, child in
+                         sorted(((char, child) for char, child in node.items() if char is not None), reverse=True))
+        return words
+
+class SymbolIndex:
+    # Symbols of the buffer and the local headers it includes. Extraction results
+    # are cached per (line, lexer state), so re-indexing after an edit only lexes
+    # the lines that changed. Readers on the Tk thread only take the lock briefly.
+    LINE_CACHE_LIMIT = 200000
+    MAX_INCLUDED_FILES = 64
+
+    def __init__(self, keywords):
+        self.keywords = keywords
+        self.lock = threading.Lock()
+        self.trie = SymbolTrie()
+        self.files = {}
+        self.definitions = {}
+        self.stamps = {}
+        self.line_cache = {}
+        for keyword in keywords:
+            self.trie.add(keyword)
+
+    def extract(self, path, text):
+        if len(self.line_cache) > self.LINE_CACHE_LIMIT:
+            self.line_cache.clear()
+        symbols = []
+        includes = []
+        state = LEX_CODE
+        for number, line in enumerate(text.split('\n'), 1):
+            key = (line, state)
+            cached = self.line_cache.get(key)
+            if cached is None:
+                cached = self.line_cache[key] = extract_line_symbols(line, state, self.keywords)
+            found, line_includes, state = cached
+            symbols.extend((name, kind, path, number, column, scope) for kind, name, column, scope in found)
+            includes.extend(line_includes)
+        return symbols, includes
+
+    def replace_file(self, path, symbols):
+        with self.lock:
+            for symbol in self.files.pop(path, []):
+                self.trie.discard(symbol[0])
+                entries = self.definitions.get(symbol[0])
+                if entries:
+                    entries.remove(symbol)
+                    if not entries:
+                        del self.definitions[symbol[0]]
+            if symbols is not None:
+                self.files[path] = symbols
+                for symbol in symbols:
+                    self.trie.add(symbol[0])
+                    self.definitions.setdefault(symbol[0], []).append(symbol)
+
+    def update(self, path, text, include_dirs=()):
+        # Indexes the buffer, then follows #include "..." through the buffer's
+        # directory and the include dirs. Headers are re-read only when their mtime
+        # changes, and files that are no longer reachable are dropped.
+        symbols, includes = self.extract(path, text)
+        self.replace_file(path, symbols)
+        reachable = {path}
+        base = os.path.dirname(os.path.abspath(path)) if os.path.isabs(path) else os.getcwd()
+        pending = [(base, include) for include in includes]
+        while pending and len(reachable) < self.MAX_INCLUDED_FILES:
+            directory, include = pending.pop()
+            for candidate_dir in [directory] + list(include_dirs):
+                candidate = os.path.normpath(os.path.join(candidate_dir, include))
+                if os.path.isfile(candidate):
+                    break
+            else:
+                continue
+            if candidate in reachable:
+                continue
+            reachable.add(candidate)
+            try:
+                mtime = os.stat(candidate).st_mtime_ns
+                stamp = self.stamps.get(candidate)
+                if not stamp or stamp[0] != mtime:
+                    with open(candidate, encoding='utf-8', errors='replace') as file:
+                        header_symbols, header_includes = self.extract(candidate, file.read())
+                    self.replace_file(candidate, header_symbols)
+                    stamp = self.stamps[candidate] = (mtime, header_includes)
+                header_includes = stamp[1]
+            except OSError:
+                continue
+            pending.extend((os.path.dirname(candidate), header) for header in header_includes)
+        for stale in [file for file in self.files if file not in reachable]:
+            self.replace_file(stale, None)
+            self.stamps.pop(stale, None)
+
+    def complete(self, prefix, limit=20):
+        with self.lock:
+            return self.trie.complete(prefix, limit)
+
+    def lookup(self, name):
+        # Functions and types first, then variables and macros; the buffer before headers.
+        order = {'function': 0, 'type': 0, 'namespace': 1, 'declaration': 2, 'variable': 2, 'macro': 3}
+        with self.lock:
+            symbols = list(self.definitions.get(name, []))
+        return sorted(symbols, key=lambda symbol: order.get(symbol[1], 4))
+
+class SymbolIndexer:
+    # A single daemon thread owns all indexing work. Submissions replace any that
+    # are still waiting, so a burst of edits is indexed once.
+    def __init__(self, index, on_indexed=None):
+        self.index = index
+        self.on_indexed = on_indexed
+        self.pending = None
+        self.condition = threading.Condition()
+        self.closed = False
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+        self.thread.start()
+
+    def submit(self, path, text, include_dirs=()):
+        with self.condition:
+            self.pending = (path, text, tuple(include_dirs))
+            self.condition.notify()
+
+    def loop(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                path, text, include_dirs = self.pending
+                self.pending = None
+            start = time.perf_counter()
+            try:
+                self.index.update(path, text, include_dirs)
+            except Exception:
+                continue
+            perf_timers.record('symbol indexing', time.perf_counter() - start)
+            if self.on_indexed:
+                self.on_indexed()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+class BuildEngine:
+    # Compile, run and test machinery without any Tk dependency. Work is queued on
+    # a pool of workers as BuildJobs; the GUI and the batch command line are both
+    # clients. Progress goes to the caller's log callback.
+    def __init__(self, build_dir, workers=4, cache_limit=COMPILE_CACHE_LIMIT_MB * 1024 * 1024):
+        self.build_dir = build_dir
+        self.workers = workers
+        self.compile_cache = CompileCache(APP_DIR / 'cache', cache_limit)
+        self.pch = PrecompiledHeaders(APP_DIR / 'pch', PCH_LIMIT)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.assembly_cache = OrderedDict()
+        self.assembly_lock = threading.Lock()
+        self.pch_jobs = set()
+
+    def submit(self, function, *args, **kwargs):
+        job = BuildJob()
+        job.future = self.executor.submit(function, job, *args, **kwargs)
+        return job
+
+    def shutdown(self, wait=True):
+        # Waiting lets background PCH builds install their header; otherwise they are
+        # killed along with everything else still queued.
+        if not wait:
+            for job in list(self.pch_jobs):
+                job.cancel()
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def write_source(self, code):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.cpp', delete=False,
+                                         dir=self.build_dir) as temp_file:
+            temp_file.write(code)
+            return temp_file.name
+
+    def compile(self, job, code, compiler, std, flags, log=print, source_name="untitled.cpp",
+                timeout=COMPILE_TIMEOUT):
+        # Returns the executable (None on errors), whether it came from the cache,
+        # the compile time and the parsed diagnostics. Timeouts, a missing compiler
+        # and cancellation are raised to the caller.
+        key = self.compile_cache.key(code, compiler, std, flags)
+        cached = self.compile_cache.lookup(key) if key else None
+        if cached:
+            # The warnings of the original build are replayed, under this buffer's name.
+            stored = self.compile_cache.cached_diagnostics(key) or {}
+            diagnostics = stored.get('items', [])
+            if stored.get('source'):
+                relocate_diagnostics(diagnostics, stored['source'], source_name)
+            return {'executable': cached, 'cached': True, 'elapsed': 0.0,
+                    'diagnostics': DiagnosticIndex(diagnostics, stored.get('other', [])),
+                    'stdout': stored.get('stdout', '')}
+
+        source = self.write_source(code)
+        try:
+            output = source[:-len('.cpp')] + ('.exe' if sys.platform == "win32" else '')
+            identity = self.compile_cache.compiler_identity(compiler)
+            includes = self.pch.detect_prefix(code)
+            kind = self.pch.compiler_kind(identity) if identity and includes else None
+            pch_key = self.pch.key(identity, std, flags, includes) if kind else None
+            pch_args = self.pch.compile_args(pch_key, kind) if pch_key else None
+
+            diagnostic_flags = diagnostic_args(self.pch.compiler_kind(identity), identity) if identity else []
+            compile_cmd = [compiler, std] + flags + (pch_args or []) + diagnostic_flags + [source, '-o', output]
+            log(f"Compiling: {' '.join(compile_cmd)}")
+
+            start = time.perf_counter()
+            result = job.run(compile_cmd, timeout=timeout)
+            elapsed = time.perf_counter() - start
+            perf_timers.record('compile subprocess', elapsed)
+
+            diagnostics, other = parse_diagnostics(result.stderr)
+            relocate_diagnostics(diagnostics, source, source_name)
+            executable = None
+            if result.returncode == 0:
+                stored = {'source': source_name, 'items': diagnostics, 'other': other, 'stdout': result.stdout}
+                executable = self.compile_cache.store(key, output, stored) if key else output
+                if pch_key:
+                    self.report_precompiled_header(log, pch_key, kind, pch_args, elapsed,
+                                                   compiler, std, flags, includes)
+            return {'executable': executable, 'cached': False, 'elapsed': elapsed,
+                    'diagnostics': DiagnosticIndex(diagnostics, other), 'stdout': result.stdout}
+        finally:
+            if os.path.exists(source):
+                os.unlink(source)
+
+    def report_precompiled_header(self, log, pch_key, kind, pch_args, elapsed, compiler, std, flags, includes):
+        if pch_args:
+            cold = self.pch.cold_time(pch_key)
+            if cold is not None:
+                log(f"Precompiled header used: saved {cold - elapsed:.2f}s "
+                    f"compared with a cold compile ({cold:.2f}s)")
+            else:
+                log("Precompiled header used")
+            return
+
+        if self.pch.build_failed(pch_key) or not self.pch.claim(pch_key):
+            return
+
+        self.pch.record_cold_time(pch_key, elapsed)
+        log("Building precompiled header in the background...")
+        try:
+            job = self.submit(self.build_precompiled_header, log, pch_key, kind, compiler, std, flags, includes)
+        except RuntimeError:
+            # The engine is shutting down.
+            self.pch.release(pch_key)
+            return
+        self.pch_jobs.add(job)
+        job.future.add_done_callback(lambda future: self.pch_jobs.discard(job))
+
+    def build_precompiled_header(self, job, log, pch_key, kind, compiler, std, flags, includes):
+        try:
+            build_time = self.pch.build(job, pch_key, kind, compiler, std, flags, includes)
+        except JobCancelled:
+            return None
+        except (OSError, subprocess.TimeoutExpired):
+            build_time = None
+        finally:
+            self.pch.release(pch_key)
+        if build_time is None:
+            log("Precompiled header could not be built; headers will be parsed on every compile")
+        else:
+            log(f"Precompiled header built for {len(includes)} includes in {build_time:.2f}s")
+        return build_time
+
+    def syntax_check(self, job, code, compiler, std, flags, source_name="untitled.cpp",
+                     timeout=SYNTAX_CHECK_TIMEOUT):
+        identity = self.compile_cache.compiler_identity(compiler)
+        if not identity:
+            return None
+        source = self.write_source(code)
+        try:
+            kind = self.pch.compiler_kind(identity)
+            includes = self.pch.detect_prefix(code)
+            pch_key = self.pch.key(identity, std, flags, includes) if kind and includes else None
+            pch_args = self.pch.compile_args(pch_key, kind) if pch_key else None
+
+            cmd = ([compiler, std] + flags + (pch_args or []) + diagnostic_args(kind, identity)
+                   + ['-fsyntax-only', source])
+            result = job.run(cmd, timeout=timeout)
+            diagnostics, other = parse_diagnostics(result.stderr)
+            relocate_diagnostics(diagnostics, source, source_name)
+            return DiagnosticIndex(diagnostics, other)
+        finally:
+            if os.path.exists(source):
+                os.unlink(source)
+
+    def assembly(self, job, code, compiler, std, flags, timeout=COMPILE_TIMEOUT):
+        # Returns [(instruction, source line or None)], cached per source, compiler
+        # and flags; the cache is small and in memory, most recent last.
+        key = self.compile_cache.key(code, compiler, std, flags, extra=('asm',))
+        with self.assembly_lock:
+            if key in self.assembly_cache:
+                self.assembly_cache.move_to_end(key)
+                return self.assembly_cache[key], True
+
+        source = self.write_source(code)
+        output = source[:-len('.cpp')] + '.s'
+        try:
+            result = job.run([compiler, std] + [flag for flag in flags if flag != '-flto']
+                             + ['-S', '-g', source, '-o', output], timeout=timeout)
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.strip() or f"{compiler} exited with {result.returncode}")
+            with open(output, encoding='utf-8', errors='replace') as file:
+                lines = parse_assembly(file.read(), source)
+            # Demangling comes after classification; c++filt keeps lines one to one.
+            texts = demangle('\n'.join(text for text, line in lines) + '\n').rstrip('\n').split('\n')
+            if len(texts) == len(lines):
+                lines = [(text, line) for text, (_, line) in zip(texts, lines)]
+        finally:
+            for path in (source, output):
+                if os.path.exists(path):
+                    os.unlink(path)
+
+        if key:
+            with self.assembly_lock:
+                self.assembly_cache[key] = lines
+                while len(self.assembly_cache) > ASSEMBLY_CACHE_ENTRIES:
+                    self.assembly_cache.popitem(last=False)
+        return lines, False
+
+    def profile_run(self, job, code, compiler, std, flags, stdin_path=None, timeout=PROFILE_RUN_TIMEOUT):
+        # Builds an instrumented binary and runs it once in a scratch directory.
+        # perf samples when it is installed and usable; otherwise gprof reads the
+        # gmon.out that -pg leaves behind. Costs are per function and per line of the
+        # buffer.
+        workdir = tempfile.mkdtemp(dir=self.build_dir, prefix='profile-run-')
+        source = os.path.join(workdir, 'main.cpp')
+        executable = os.path.join(workdir, 'main' + ('.exe' if sys.platform == "win32" else ''))
+        with open(source, 'w', encoding='utf-8') as file:
+            file.write(code)
+        perf = shutil.which('perf')
+        gprof = shutil.which('gprof')
+        try:
+            if not perf and not gprof:
+                raise RuntimeError("Neither perf nor gprof is installed")
+            if perf:
+                try:
+                    return self.profile_with_perf(job, perf, workdir, compiler, std, flags, source, executable,
+                                                  stdin_path, timeout)
+                except ProfilerUnavailable as e:
+                    if not gprof:
+                        raise RuntimeError(str(e))
+                    profile = self.profile_with_gprof(job, workdir, compiler, std, flags, source, executable,
+                                                      stdin_path, timeout)
+                    profile['note'] = f"{e}; used gprof instead"
+                    return profile
+            return self.profile_with_gprof(job, workdir, compiler, std, flags, source, executable,
+                                           stdin_path, timeout)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def build_instrumented(self, job, compiler, std, flags, instrument, source, executable):
+        result = job.run([compiler, std] + flags + instrument + [source, '-o', executable], timeout=COMPILE_TIMEOUT)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"{compiler} exited with {result.returncode}")
+
+    def profile_with_perf(self, job, perf, workdir, compiler, std, flags, source, executable, stdin_path, timeout):
+        # perf's own exit code says nothing about the program's, so a small shell
+        # wrapper writes the program's status to a file. A perf that cannot record
+        # (perf_event_paranoid, containers, a wrapper without a matching kernel
+        # binary) raises ProfilerUnavailable with its error output.
+        self.build_instrumented(job, compiler, std, flags, ['-g', '-fno-omit-frame-pointer'], source, executable)
+        status_path = os.path.join(workdir, 'exit_status')
+        data_path = os.path.join(workdir, 'perf.data')
+        cmd = [perf, 'record', '-q', '-o', data_path, '--',
+               '/bin/sh', '-c', '"$0"; echo $? > "$1"', executable, status_path]
+        start = time.perf_counter()
+        with open(stdin_path or os.devnull, 'rb') as stdin:
+            record = job.run(cmd, timeout=timeout, text=False, stdin=stdin, cwd=workdir)
+        wall = time.perf_counter() - start
+        recorded = os.path.exists(data_path) and os.path.getsize(data_path) > 0
+        if not recorded or not os.path.exists(status_path):
+            errors = record.stderr.decode('utf-8', errors='replace').strip()
+            raise ProfilerUnavailable(f"perf record failed (exit {record.returncode})"
+                                      + (f": {errors.splitlines()[-1]}" if errors else ""))
+        with open(status_path, encoding='utf-8') as file:
+            exit_code = int(file.read().strip() or 0)
+
+        report = job.run([perf, 'report', '-i', data_path, '--stdio', '--no-children',
+                          '--sort', 'sym,srcline'], timeout=timeout, cwd=workdir)
+        if report.returncode != 0:
+            errors = report.stderr.strip()
+            raise ProfilerUnavailable(f"perf report failed (exit {report.returncode})"
+                                      + (f": {errors.splitlines()[-1]}" if errors else ""))
+        functions = {}
+        lines = {}
+        for symbol, file, line, percent in parse_perf_report(report.stdout):
+            entry = functions.setdefault(symbol, {'percent': 0.0, 'seconds': None, 'calls': None})
+            entry['percent'] += percent
+            if os.path.basename(file) == 'main.cpp':
+                lines[line] = lines.get(line, 0.0) + percent
+        return {'tool': 'perf', 'wall': wall, 'exit_code': exit_code, 'functions': functions, 'lines': lines}
+
+    def profile_with_gprof(self, job, workdir, compiler, std, flags, source, executable, stdin_path, timeout):
+        self.build_instrumented(job, compiler, std, flags, ['-g', '-pg'], source, executable)
+        start = time.perf_counter()
+        with open(stdin_path or os.devnull, 'rb') as stdin:
+            run = job.run([executable], timeout=timeout, text=False, stdin=stdin, cwd=workdir)
+        wall = time.perf_counter() - start
+        if not os.path.exists(os.path.join(workdir, 'gmon.out')):
+            raise RuntimeError("The program did not write gmon.out (it must exit normally)")
+
+        functions = {}
+        lines = {}
+        flat = job.run(['gprof', '-b', '-p', executable, 'gmon.out'], timeout=timeout, cwd=workdir)
+        for name, percent, seconds, calls in parse_gprof_flat(flat.stdout):
+            functions[name] = {'percent': percent, 'seconds': seconds, 'calls': calls}
+        by_line = job.run(['gprof', '-b', '-l', '-p', executable, 'gmon.out'], timeout=timeout, cwd=workdir)
+        for name, percent, seconds, calls in parse_gprof_flat(by_line.stdout):
+            location = GPROF_LOCATION.match(name)
+            if location and os.path.basename(location.group(2)) == 'main.cpp':
+                line = int(location.group(3))
+                lines[line] = lines.get(line, 0.0) + percent
+        return {'tool': 'gprof', 'wall': wall, 'exit_code': run.returncode, 'functions': functions, 'lines': lines}
+
+    def build_project(self, job, project, compiler, std, log=print):
+        # Returns the executable (None when the build failed) and the builder's
+        # diagnostics.
+        builder = ProjectBuilder(project, compiler, std, job, log)
+        identity = self.compile_cache.compiler_identity(builder.compiler)
+        if identity:
+            builder.diagnostic_flags = diagnostic_args(self.pch.compiler_kind(identity), identity)
+        return builder.build(), builder.diagnostics
+
+    def compile_profile(self, job, code, compiler, std, flags, timeout=300):
+        # Compiles to an object file only, so the numbers are the front and middle end
+        # without the link. clang writes its trace next to the object as NAME.json.
+        identity = self.compile_cache.compiler_identity(compiler)
+        kind = self.pch.compiler_kind(identity) if identity else None
+        if kind not in ('gcc', 'clang'):
+            raise RuntimeError(f"Compile profiling needs GCC or clang, not {compiler}")
+
+        workdir = tempfile.mkdtemp(dir=self.build_dir, prefix='profile-')
+        source = os.path.join(workdir, 'main.cpp')
+        obj = os.path.join(workdir, 'main.o')
+        with open(source, 'w', encoding='utf-8') as file:
+            file.write(code)
+        try:
+            option = '-ftime-trace' if kind == 'clang' else '-ftime-report'
+            start = time.perf_counter()
+            result = job.run([compiler, std] + flags + [option, '-c', source, '-o', obj], timeout=timeout)
+            wall = time.perf_counter() - start
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.strip() or f"{compiler} exited with {result.returncode}")
+
+            if kind == 'clang':
+                totals = parse_time_trace(os.path.join(workdir, 'main.json'))
+            else:
+                totals = parse_time_report(result.stderr)
+            rows = sorted(([category, name, seconds] for (category, name), seconds in totals.items()),
+                          key=lambda row: row[2], reverse=True)[:COMPILE_PROFILE_ROWS]
+            return {'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'config': f"{compiler} {std} {' '.join(flags)}",
+                    'wall': wall, 'rows': rows}
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def benchmark(self, job, executable, compiler, runs, warmup, on_sample=None):
+        # Times `runs` runs after `warmup` untimed ones; on_sample(index, sample) is
+        # called as each timed run finishes.
+        helper = rusage_helper(compiler)
+        for _ in range(warmup):
+            measure_run(executable, job, helper=helper)
+        samples = []
+        for index in range(runs):
+            sample = measure_run(executable, job, helper=helper)
+            samples.append(sample)
+            if on_sample:
+                on_sample(index, sample)
+        stats = {metric: summarize(sample[metric] for sample in samples)
+                 for metric in ('wall', 'user', 'sys', 'rss')}
+        failures = sum(1 for sample in samples if sample['exit_code'] != 0)
+        return {'samples': samples, 'stats': stats, 'failures': failures}
+
+    def compare(self, job, code, configs, runs, warmup, on_built=None, log=print):
+        # Builds every (label, compiler, args) configuration concurrently, then
+        # benchmarks them round-robin so drift in machine load affects all of them
+        # alike. Returns one result per configuration, in order; on_built(index,
+        # result) reports each build as it finishes.
+        workdir = tempfile.mkdtemp(dir=self.build_dir, prefix='compare-')
+        source = os.path.join(workdir, 'main.cpp')
+        with open(source, 'w', encoding='utf-8') as file:
+            file.write(code)
+
+        def build(index, compiler, args):
+            output = os.path.join(workdir, f"config{index}" + ('.exe' if sys.platform == "win32" else ''))
+            start = time.perf_counter()
+            result = job.run([compiler] + args + [source, '-o', output], timeout=120)
+            elapsed = time.perf_counter() - start
+            if result.returncode != 0:
+                return None, elapsed, result.stderr
+            return output, elapsed, ''
+
+        try:
+            results = [None] * len(configs)
+            outputs = {}
+            with ThreadPoolExecutor(max_workers=len(configs)) as pool:
+                futures = {pool.submit(build, index, compiler, args): index
+                           for index, (label, compiler, args) in enumerate(configs)}
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        output, elapsed, errors = future.result()
+                    except (OSError, subprocess.TimeoutExpired) as e:
+                        output, elapsed, errors = None, 0, str(e)
+                    results[index] = {'compile': elapsed, 'size': os.path.getsize(output) if output else None,
+                                      'errors': errors, 'wall': None, 'rss': None}
+                    if output:
+                        outputs[index] = output
+                    if on_built:
+                        on_built(index, results[index])
+
+            helper = rusage_helper(configs[0][1])
+            samples = {index: [] for index in sorted(outputs)}
+            log(f"Running {len(samples)} binaries {runs} times each...")
+            for round_index in range(warmup + runs):
+                for index in samples:
+                    sample = measure_run(outputs[index], job, helper=helper)
+                    if round_index >= warmup:
+                        samples[index].append(sample)
+
+            for index, runs_of_config in samples.items():
+                results[index]['wall'] = summarize(sample['wall'] for sample in runs_of_config)
+                results[index]['rss'] = max((sample['rss'] for sample in runs_of_config
+                                             if sample['rss'] is not None), default=None)
+            return results
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def run(self, job, executable, stdin_path=None, timeout=None):
+        # One non-interactive run; output is captured, not streamed.
+        start = time.perf_counter()
+        with open(stdin_path or os.devnull, 'rb') as stdin:
+            result = job.run([executable], timeout=timeout, text=False, stdin=stdin)
+        wall = time.perf_counter() - start
+        perf_timers.record('run subprocess', wall)
+        return {'exit_code': result.returncode, 'wall': wall, 'stdout': result.stdout, 'stderr': result.stderr}
+
+    def test(self, job, executable, cases, workers=1, timeout=TEST_TIMEOUT, on_result=None):
+        results = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_test_case, executable, name, input_path, expected_path, timeout, job)
+                       for name, input_path, expected_path in cases]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                if on_result:
+                    on_result(result)
+        return results
+
+    def batch_job(self, job, source_path, compiler, std, flags, cases=(), timeout=TEST_TIMEOUT):
+        # Compile one submission and run it: against the test cases when given,
+        # otherwise once with NAME.in (if present) as stdin.
+        source_path = Path(source_path)
+        entry = {'name': source_path.name, 'status': 'OK', 'compile': 0.0, 'run': 0.0, 'detail': ''}
+        start = time.perf_counter()
+        try:
+            code = source_path.read_text(encoding='utf-8', errors='replace')
+            built = self.compile(job, code, compiler, std, flags, log=lambda text: None,
+                                 source_name=str(source_path))
+            entry['compile'] = built['elapsed']
+            entry['cached'] = built['cached']
+            if not built['executable']:
+                first = built['diagnostics'].items[:1]
+                entry.update(status='CE', detail=format_diagnostic(first[0]) if first
+                             else built['diagnostics'].summary())
+                return entry
+
+            run_start = time.perf_counter()
+            if cases:
+                results = self.test(job, built['executable'], cases, timeout=timeout)
+                failed = [result for result in results if result['status'] != 'PASS']
+                passed = len(results) - len(failed)
+                entry['detail'] = f"{passed}/{len(results)} passed"
+                if failed:
+                    failed.sort(key=lambda result: natural_key(result['name']))
+                    entry['status'] = failed[0]['status']
+                    entry['detail'] += f", first failure: {failed[0]['name']}"
+            else:
+                stdin_path = source_path.with_suffix('.in')
+                result = self.run(job, built['executable'], stdin_path if stdin_path.exists() else None,
+                                  timeout=timeout)
+                entry['detail'] = f"exit {result['exit_code']}, {format_size(len(result['stdout']))} output"
+                if result['exit_code'] != 0:
+                    entry['status'] = 'RE'
+            entry['run'] = time.perf_counter() - run_start
+        except subprocess.TimeoutExpired:
+            entry.update(status='TLE', detail=f"time limit of {timeout}s exceeded")
+        except FileNotFoundError:
+            entry.update(status='ERROR', detail=f"compiler {compiler} not found")
+        except JobCancelled:
+            entry.update(status='CANCELLED')
+        except Exception as e:
+            entry.update(status='ERROR', detail=str(e))
+        finally:
+            entry['total'] = time.perf_counter() - start
+        return entry
 
 class CppCompilerIDE:
     def __init__(self, root):
@@ -20,6 +2558,26 @@ class CppCompilerIDE:
         self.current_file = None
         self.process = None
         self.output_queue = queue.Queue()
+        self.build_dir = tempfile.mkdtemp(prefix='cppide-')
+        self.engine = BuildEngine(self.build_dir)
+        self.compile_cache = self.engine.compile_cache
+        self.pch = self.engine.pch
+        self.executor = self.engine.executor
+        self.current_job = None
+        self.project = None
+        self.benchmarks = BenchmarkStore(APP_DIR / 'benchmarks.json')
+        self.load_job = None
+        self.file_load = None
+        self.saved_digest = None
+        self.journal = None
+        self.buffer_version = 0
+        self.check_job = None
+        self.check_timer = None
+        self.checked_version = None
+        self.scrollback = {
+            'output': ScrollbackBuffer(os.path.join(self.build_dir, 'output.log')),
+            'terminal': ScrollbackBuffer(os.path.join(self.build_dir, 'terminal.log')),
+        }
         
         self.setup_styles()
         
@@ -29,6 +2587,10 @@ class CppCompilerIDE:
         self.create_status_bar()
         
         self.load_sample_code()
+        self.start_journal()
+        self.root.after(OUTPUT_PUMP_MS, self.pump_output)
+        self.root.after_idle(self.start_compiler_discovery)
+        self.root.after_idle(self.start_journal_recovery)
         
     def setup_styles(self):
         style = ttk.Style()
@@ -53,13 +2615,25 @@ class CppCompilerIDE:
         file_menu.add_command(label="Save", command=self.save_file, accelerator="Ctrl+S")
         file_menu.add_command(label="Save As...", command=self.save_as_file)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Open Project...", command=self.open_project)
+        file_menu.add_command(label="Close Project", command=self.close_project)
+        file_menu.add_separator()
+        file_menu.add_command(label="Exit", command=self.on_closing)
+        
+        edit_menu = tk.Menu(menubar, tearoff=0, bg='#2b2b2b', fg='white')
+        menubar.add_cascade(label="Edit", menu=edit_menu)
+        edit_menu.add_command(label="Complete Symbol", command=self.show_completions, accelerator="Ctrl+Space")
+        edit_menu.add_command(label="Go to Definition", command=self.goto_definition, accelerator="F12")
         
         build_menu = tk.Menu(menubar, tearoff=0, bg='#2b2b2b', fg='white')
         menubar.add_cascade(label="Build", menu=build_menu)
         build_menu.add_command(label="Compile", command=self.compile_code, accelerator="F5")
         build_menu.add_command(label="Compile and Run", command=self.compile_and_run, accelerator="F6")
         build_menu.add_command(label="Run Only", command=self.run_code, accelerator="F7")
+        build_menu.add_command(label="Run with Input File...", command=self.run_with_input_file)
+        build_menu.add_command(label="Benchmark", command=self.benchmark_code, accelerator="F8")
+        build_menu.add_command(label="Profile Compile", command=self.profile_compile)
+        build_menu.add_command(label="Profile Run", command=self.profile_run)
         build_menu.add_separator()
         build_menu.add_command(label="Clear", command=self.clean_build)
         
@@ -73,6 +2647,7 @@ class CppCompilerIDE:
         self.root.bind('<F5>', lambda e: self.compile_code())
         self.root.bind('<F6>', lambda e: self.compile_and_run())
         self.root.bind('<F7>', lambda e: self.run_code())
+        self.root.bind('<F8>', lambda e: self.benchmark_code())
         
     def create_toolbar(self):
         toolbar_frame = tk.Frame(self.root, bg='#404040', height=40)
@@ -87,6 +2662,7 @@ class CppCompilerIDE:
             ("Compile", "Compile", self.compile_code),
             ("Compile and Run", "Compile and Run", self.compile_and_run),
             ("Run", "Run", self.run_code),
+            ("Benchmark", "Benchmark", self.benchmark_code),
             ("Clean", "Clean", self.clean_build),
             ("|", "", None),
             ("Stop", "Stop", self.stop_execution)
@@ -144,7 +2720,7 @@ class CppCompilerIDE:
             font=('Consolas', 12),
             wrap='none',
             undo=True,
-            maxundo=50
+            maxundo=0
         )
         self.code_editor.pack(fill='both', expand=True, padx=5, pady=5)
         
@@ -159,6 +2735,10 @@ class CppCompilerIDE:
         output_frame = tk.Frame(self.notebook, bg='#2b2b2b')
         self.notebook.add(output_frame, text='Compilation Result')
         
+        self.cache_info = tk.Label(output_frame, text="Cache: 0 hits / 0 misses",
+                                 bg='#2b2b2b', fg='#a0a0a0', anchor='w')
+        self.cache_info.pack(side='bottom', fill='x', padx=5)
+        
         self.output_text = scrolledtext.ScrolledText(
             output_frame,
             bg='#1e1e1e',
@@ -183,14 +2763,66 @@ class CppCompilerIDE:
         terminal_input_frame = tk.Frame(terminal_frame, bg='#2b2b2b')
         terminal_input_frame.pack(fill='x', padx=5, pady=5)
         
-        tk.Label(terminal_input_frame, text="$", bg='#2b2b2b', fg='#00ff00', 
-                font=('Consolas', 10)).pack(side='left')
+        self.terminal_prompt = tk.Label(terminal_input_frame, text="$", bg='#2b2b2b', fg='#00ff00', 
+                                      font=('Consolas', 10))
+        self.terminal_prompt.pack(side='left')
         
         self.terminal_input = tk.Entry(terminal_input_frame, bg='#1e1e1e', 
                                      fg='#00ff00', font=('Consolas', 10),
                                      insertbackground='#00ff00')
         self.terminal_input.pack(side='left', fill='x', expand=True, padx=5)
         self.terminal_input.bind('<Return>', self.execute_terminal_command)
+        self.terminal_input.bind('<Control-c>', self.interrupt_terminal)
+        
+        self.shell = ShellSession(self.write_terminal,
+                                  lambda status, cwd: self.call_in_ui(self.shell_command_done, status, cwd))
+        
+        terminal_info_frame = tk.Frame(terminal_frame, bg='#2b2b2b')
+        terminal_info_frame.pack(fill='x', padx=5, pady=(0, 5))
+        
+        self.scrollback_info = tk.Label(terminal_info_frame, text="", bg='#2b2b2b',
+                                      fg='#a0a0a0', anchor='w')
+        self.scrollback_info.pack(side='left', fill='x', expand=True)
+        
+        tk.Button(terminal_info_frame, text="Save log", command=self.save_terminal_log,
+                 bg='#505050', fg='white', border=0, padx=8).pack(side='right', padx=2)
+        tk.Button(terminal_info_frame, text="Open log", command=self.open_terminal_log,
+                 bg='#505050', fg='white', border=0, padx=8).pack(side='right', padx=2)
+        
+        tests_frame = tk.Frame(self.notebook, bg='#2b2b2b')
+        self.notebook.add(tests_frame, text='Tests')
+        
+        self.create_tests_panel(tests_frame)
+        
+        problems_frame = tk.Frame(self.notebook, bg='#2b2b2b')
+        self.notebook.add(problems_frame, text='Problems')
+        
+        self.create_problems_panel(problems_frame)
+        
+        profile_frame = tk.Frame(self.notebook, bg='#2b2b2b')
+        self.notebook.add(profile_frame, text='Compile Profile')
+        
+        self.create_compile_profile_panel(profile_frame)
+        
+        run_profile_frame = tk.Frame(self.notebook, bg='#2b2b2b')
+        self.notebook.add(run_profile_frame, text='Run Profile')
+        
+        self.create_run_profile_panel(run_profile_frame)
+        
+        assembly_frame = tk.Frame(self.notebook, bg='#2b2b2b')
+        self.notebook.add(assembly_frame, text='Assembly')
+        
+        self.create_assembly_panel(assembly_frame)
+        
+        compare_frame = tk.Frame(self.notebook, bg='#2b2b2b')
+        self.notebook.add(compare_frame, text='Compare')
+        
+        self.create_compare_panel(compare_frame)
+        
+        performance_frame = tk.Frame(self.notebook, bg='#2b2b2b')
+        self.notebook.add(performance_frame, text='Performance')
+        
+        self.create_performance_panel(performance_frame)
         
         settings_frame = tk.Frame(self.notebook, bg='#2b2b2b')
         self.notebook.add(settings_frame, text='Settings')
@@ -203,6 +2835,8 @@ class CppCompilerIDE:
         self.code_editor.tag_configure("comment", foreground="#6a9955")
         self.code_editor.tag_configure("preprocessor", foreground="#9cdcfe")
         self.code_editor.tag_configure("number", foreground="#b5cea8")
+        self.code_editor.tag_configure("diag_error", underline=True, background="#4b1818")
+        self.code_editor.tag_configure("diag_warning", underline=True, background="#4b3f18")
         
         self.keywords = {
             'int', 'char', 'float', 'double', 'bool', 'void', 'auto',
@@ -213,45 +2847,531 @@ class CppCompilerIDE:
             'new', 'delete', 'sizeof', 'typedef', 'template', 'typename'
         }
         
-        self.code_editor.bind('<KeyRelease>', self.update_syntax_highlighting)
+        self.highlighter = SyntaxHighlighter(self.code_editor, self.keywords)
+        self.symbols = SymbolIndex(self.keywords)
+        self.indexer = SymbolIndexer(self.symbols)
+        self.index_timer = None
+        self.completion_popup = None
+        self.completion_prefix = None
+        self.pending_goto = None
+        self.highlight_scheduled = False
+        self.visible_highlight_scheduled = False
+        self.highlight_job = None
+        self.install_editor_proxy()
+        self.code_editor.configure(yscrollcommand=self.on_editor_yscroll)
+        self.code_editor.bind('<KeyRelease>', self.schedule_syntax_check, add='+')
+        self.code_editor.bind('<KeyRelease>', self.refresh_completions, add='+')
+        self.code_editor.bind('<Control-space>', self.show_completions)
+        self.code_editor.bind('<Escape>', self.close_completions)
+        self.code_editor.bind('<Up>', lambda e: self.move_completion(-1))
+        self.code_editor.bind('<Down>', lambda e: self.move_completion(1))
+        self.code_editor.bind('<Return>', self.accept_completion)
+        self.code_editor.bind('<Tab>', self.accept_completion)
+        self.code_editor.bind('<Button-1>', self.close_completions, add='+')
+        self.code_editor.bind('<F12>', self.goto_definition)
+        self.code_editor.bind('<Control-Button-1>', self.goto_definition)
+
+    def install_editor_proxy(self):
+        # Route inserts and deletes on the editor (including undo/redo, which replay
+        # through the widget command) through editor_dispatch so they report exactly
+        # which lines they touched. The wrapper is a Tcl proc: every other subcommand
+        # goes straight to the widget, and errors from edits are re-raised in Tcl, so
+        # `catch` in Tk's own bindings (tk_textCopy and friends) still sees them.
+        widget_name = str(self.code_editor)
+        self.editor_orig = widget_name + '_orig'
+        self.root.tk.call('rename', widget_name, self.editor_orig)
+        self.root.tk.createcommand(widget_name + '_edit', self.editor_dispatch)
+        self.root.tk.call('proc', widget_name, 'args', f'''
+            switch -exact -- [lindex $args 0] {{
+                insert - delete - replace {{
+                    lassign [{widget_name}_edit {{*}}$args] code result
+                    return -code $code $result
+                }}
+            }}
+            {self.editor_orig} {{*}}$args
+        ''')
+
+    def editor_line(self, index):
+        return int(self.root.tk.call(self.editor_orig, 'index', index).split('.')[0])
+
+    def editor_position(self, index):
+        # Resolves an index the way insert/delete will use it: nothing lands after
+        # the final newline.
+        call = self.root.tk.call
+        if self.root.tk.getboolean(call(self.editor_orig, 'compare', index, '>', 'end-1c')):
+            index = 'end-1c'
+        line, column = call(self.editor_orig, 'index', index).split('.')
+        return int(line), int(column)
+
+    def journal_delete(self, start, end):
+        first = self.editor_position(start)
+        last = self.editor_position(end)
+        if first < last:
+            self.journal.delete(*first, *last)
+
+    def editor_dispatch(self, operation, *args):
+        # Errors are returned to the wrapper proc rather than raised: an exception
+        # escaping a Python command would also be re-raised later from mainloop.
+        try:
+            return ('ok', self.editor_edit(operation, *args))
+        except tk.TclError as e:
+            return ('error', str(e))
+
+    def editor_edit(self, operation, *args):
+        call = self.root.tk.call
+        journal = self.journal if self.journal and not self.file_load else None
+        if operation == 'insert' and len(args) >= 2:
+            first = min(self.editor_line(args[0]), self.editor_line('end-1c'))
+            if journal:
+                journal.insert(*self.editor_position(args[0]), ''.join(args[1::2]))
+            result = call((self.editor_orig, operation) + args)
+            added = sum(chunk.count('\n') for chunk in args[1::2])
+            self.editor_lines_changed(first, first, first + added)
+            return result
+
+        if operation == 'delete' and 1 <= len(args) <= 2:
+            first = self.editor_line(args[0])
+            last = self.editor_line(args[1]) if len(args) == 2 else self.editor_line(f"{args[0]}+1c")
+            if journal:
+                self.journal_delete(args[0], args[1] if len(args) == 2 else f"{args[0]}+1c")
+            result = call((self.editor_orig, operation) + args)
+            self.editor_lines_changed(first, max(first, last), first)
+            return result
+
+        if operation == 'replace' and len(args) >= 3 and journal:
+            start = self.editor_position(args[0])
+            self.journal_delete(args[0], args[1])
+            journal.insert(*start, ''.join(args[2::2]))
+            journal = None
+
+        result = call((self.editor_orig, operation) + args)
+        self.highlighter.invalidate()
+        self.schedule_syntax_highlighting()
+        if journal:
+            journal.snapshot(call(self.editor_orig, 'get', '1.0', 'end-1c'))
+        return result
+
+    def editor_lines_changed(self, first, old_last, new_last):
+        self.buffer_version += 1
+        if self.index_timer:
+            self.root.after_cancel(self.index_timer)
+        self.index_timer = self.root.after(SYMBOL_INDEX_DELAY_MS, self.submit_symbol_index)
+        self.highlighter.lines_changed(first, old_last, new_last)
+        self.schedule_syntax_highlighting()
+
+    def submit_symbol_index(self):
+        # Only the text copy happens here; lexing and the trie update run on the
+        # indexer thread.
+        self.index_timer = None
+        if self.file_load:
+            return
+        include_dirs = [str(path) for path in self.project.include_dirs] if self.project else []
+        self.indexer.submit(self.current_file or '<buffer>', self.code_editor.get(1.0, tk.END + '-1c'),
+                            include_dirs)
+        
+    def word_before_cursor(self):
+        match = re.search(r'\w+$', self.code_editor.get('insert linestart', tk.INSERT))
+        return match.group(0) if match else ''
+        
+    def show_completions(self, event=None):
+        prefix = self.word_before_cursor()
+        words = [word for word in self.symbols.complete(prefix, COMPLETION_LIMIT + 1) if word != prefix]
+        if not words:
+            self.close_completions()
+            return 'break'
+        if not self.completion_popup:
+            self.completion_popup = tk.Toplevel(self.root)
+            self.completion_popup.overrideredirect(True)
+            self.completion_list = tk.Listbox(self.completion_popup, bg='#252526', fg='#d4d4d4',
+                                              selectbackground='#264f78', font=('Consolas', 11),
+                                              height=8, activestyle='none', exportselection=False)
+            self.completion_list.pack(fill='both', expand=True)
+            self.completion_list.bind('<Double-Button-1>', self.accept_completion)
+        self.completion_prefix = prefix
+        self.completion_list.delete(0, tk.END)
+        for word in words[:COMPLETION_LIMIT]:
+            self.completion_list.insert(tk.END, word)
+        self.completion_list.selection_set(0)
+        bbox = self.code_editor.bbox(tk.INSERT)
+        if bbox:
+            x = self.code_editor.winfo_rootx() + bbox[0]
+            y = self.code_editor.winfo_rooty() + bbox[1] + bbox[3]
+            self.completion_popup.geometry(f"+{x}+{y}")
+        return 'break'
         
+    def refresh_completions(self, event=None):
+        if not self.completion_popup or event.keysym in ('Up', 'Down', 'Return', 'Tab', 'Escape'):
+            return
+        prefix = self.word_before_cursor()
+        if not prefix:
+            self.close_completions()
+        elif prefix != self.completion_prefix:
+            self.show_completions()
+            
+    def move_completion(self, step):
+        if not self.completion_popup:
+            return None
+        size = self.completion_list.size()
+        current = self.completion_list.curselection()
+        index = ((current[0] if current else -step) + step) % size
+        self.completion_list.selection_clear(0, tk.END)
+        self.completion_list.selection_set(index)
+        self.completion_list.see(index)
+        return 'break'
+        
+    def accept_completion(self, event=None):
+        if not self.completion_popup:
+            return None
+        selection = self.completion_list.curselection()
+        if selection:
+            word = self.completion_list.get(selection[0])
+            self.code_editor.insert(tk.INSERT, word[len(self.word_before_cursor()):])
+        self.close_completions()
+        return 'break'
+        
+    def close_completions(self, event=None):
+        if self.completion_popup:
+            self.completion_popup.destroy()
+            self.completion_popup = None
+            self.completion_prefix = None
+            
+    def goto_definition(self, event=None):
+        index = f"@{event.x},{event.y}" if event is not None and event.type == tk.EventType.ButtonPress else tk.INSERT
+        name = self.code_editor.get(f"{index} wordstart", f"{index} wordend").strip()
+        if not re.fullmatch(r'\w+', name or ''):
+            return 'break'
+        here = self.editor_line(index)
+        buffer_path = self.current_file or '<buffer>'
+        symbols = self.symbols.lookup(name)
+        # Prefer a definition other than the one under the cursor.
+        symbols = [symbol for symbol in symbols if not (symbol[2] == buffer_path and symbol[3] == here)] or symbols
+        if not symbols:
+            self.update_status(f"No definition found for {name}")
+            return 'break'
+            
+        name, kind, path, line, column, scope = symbols[0]
+        if scope:
+            name = f"{scope}::{name}"
+        if path == buffer_path:
+            self.code_editor.mark_set(tk.INSERT, f"{line}.{column}")
+            self.code_editor.see(tk.INSERT)
+            self.update_status(f"{name}: {kind}, line {line}")
+        elif messagebox.askyesno("Go to Definition",
+                                 f"{name} is defined in {path}:{line}.\nOpen it? Unsaved changes in the editor will be lost."):
+            self.pending_goto = (line, column)
+            try:
+                self.load_file(path)
+            except Exception as e:
+                self.pending_goto = None
+                messagebox.showerror("Error", f"Cannot open file: {e}")
+        return 'break'
+        
+    def schedule_syntax_highlighting(self):
+        if not self.highlight_scheduled:
+            self.highlight_scheduled = True
+            self.root.after_idle(self.update_syntax_highlighting)
+
+    @perf_timers.timed('syntax highlighting')
     def update_syntax_highlighting(self, event=None):
-        content = self.code_editor.get(1.0, tk.END)
-        
-        for tag in ["keyword", "string", "comment", "preprocessor", "number"]:
-            self.code_editor.tag_delete(tag)
-        
-        lines = content.split('\n')
-        for line_num, line in enumerate(lines, 1):
-            if '//' in line:
-                start = line.find('//')
-                self.code_editor.tag_add("comment", f"{line_num}.{start}", f"{line_num}.end")
-            
-            if line.strip().startswith('#'):
-                self.code_editor.tag_add("preprocessor", f"{line_num}.0", f"{line_num}.end")
-            
-            in_string = False
-            i = 0
-            while i < len(line):
-                if line[i] == '"' and (i == 0 or line[i-1] != '\\'):
-                    if not in_string:
-                        start = i
-                        in_string = True
-                    else:
-                        self.code_editor.tag_add("string", f"{line_num}.{start}", f"{line_num}.{i+1}")
-                        in_string = False
-                i += 1
-            
-            words = line.split()
-            col = 0
-            for word in words:
-                clean_word = ''.join(c for c in word if c.isalnum() or c == '_')
-                if clean_word in self.keywords:
-                    start_pos = line.find(word, col)
-                    if start_pos != -1:
-                        self.code_editor.tag_add("keyword", f"{line_num}.{start_pos}", 
-                                               f"{line_num}.{start_pos + len(clean_word)}")
-                        col = start_pos + len(word)
+        self.highlight_scheduled = False
+        self.highlighter.highlight_dirty(SyntaxHighlighter.SLICE_LINES)
+        if self.highlighter.pending():
+            self.highlight_visible_lines()
+            self.schedule_background_highlighting()
+
+    def schedule_background_highlighting(self):
+        if self.highlight_job is None:
+            self.highlight_job = self.root.after(1, self.highlight_background_slice)
+
+    @perf_timers.timed('background highlighting')
+    def highlight_background_slice(self):
+        self.highlight_job = None
+        self.highlighter.highlight_dirty(SyntaxHighlighter.SLICE_LINES)
+        if self.highlighter.pending():
+            self.schedule_background_highlighting()
+
+    def on_editor_yscroll(self, first, last):
+        self.code_editor.vbar.set(first, last)
+        if self.highlighter.pending() and not self.visible_highlight_scheduled:
+            self.visible_highlight_scheduled = True
+            self.root.after_idle(self.highlight_visible_lines)
+
+    @perf_timers.timed('visible highlighting')
+    def highlight_visible_lines(self):
+        self.visible_highlight_scheduled = False
+        first = self.editor_line('@0,0')
+        last = self.editor_line(f"@0,{self.code_editor.winfo_height()}")
+        self.highlighter.highlight_visible(first, last)
+
+    def create_tests_panel(self, parent):
+        controls = tk.Frame(parent, bg='#2b2b2b')
+        controls.pack(fill='x', padx=5, pady=5)
+        
+        tk.Label(controls, text="Folder:", bg='#2b2b2b', fg='white').pack(side='left')
+        self.tests_folder_var = tk.StringVar()
+        tk.Entry(controls, textvariable=self.tests_folder_var, bg='#404040',
+                fg='white').pack(side='left', fill='x', expand=True, padx=5)
+        tk.Button(controls, text="Browse...", command=self.choose_tests_folder,
+                 bg='#505050', fg='white', border=0, padx=8).pack(side='left', padx=2)
+        
+        tk.Label(controls, text="Workers:", bg='#2b2b2b', fg='white').pack(side='left', padx=(10, 0))
+        self.tests_workers_var = tk.StringVar(value=str(os.cpu_count() or 1))
+        tk.Entry(controls, textvariable=self.tests_workers_var, width=4, bg='#404040',
+                fg='white').pack(side='left', padx=5)
+        tk.Button(controls, text="Run tests", command=self.run_tests,
+                 bg='#505050', fg='white', border=0, padx=8).pack(side='left', padx=2)
+        
+        columns = ('result', 'time', 'exit')
+        self.tests_table = ttk.Treeview(parent, columns=columns, height=12)
+        self.tests_table.heading('#0', text='Case')
+        self.tests_table.heading('result', text='Result')
+        self.tests_table.heading('time', text='Wall time')
+        self.tests_table.heading('exit', text='Exit code')
+        self.tests_table.column('#0', width=200)
+        for column in columns:
+            self.tests_table.column(column, width=90, anchor='center')
+        self.tests_table.tag_configure('PASS', foreground='#2e7d32')
+        self.tests_table.tag_configure('FAIL', foreground='#c62828')
+        self.tests_table.tag_configure('RE', foreground='#c62828')
+        self.tests_table.tag_configure('TLE', foreground='#ef6c00')
+        self.tests_table.pack(fill='both', expand=True, padx=5)
+        self.tests_table.bind('<<TreeviewSelect>>', self.show_test_details)
+        
+        self.tests_summary = tk.Label(parent, text="", bg='#2b2b2b', fg='#a0a0a0', anchor='w')
+        self.tests_summary.pack(fill='x', padx=5)
+        
+        self.tests_details = scrolledtext.ScrolledText(parent, bg='#1e1e1e', fg='#d4d4d4',
+                                                      font=('Consolas', 10), height=8, state='disabled')
+        self.tests_details.pack(fill='both', padx=5, pady=5)
+        self.test_results = {}
+        
+    def create_problems_panel(self, parent):
+        self.problems_summary = tk.Label(parent, text="No diagnostics", bg='#2b2b2b',
+                                       fg='#a0a0a0', anchor='w')
+        self.problems_summary.pack(fill='x', padx=5, pady=(5, 0))
+        
+        columns = ('location', 'message')
+        self.problems_table = ttk.Treeview(parent, columns=columns)
+        self.problems_table.heading('#0', text='Severity')
+        self.problems_table.heading('location', text='Location')
+        self.problems_table.heading('message', text='Message')
+        self.problems_table.column('#0', width=90)
+        self.problems_table.column('location', width=160)
+        self.problems_table.column('message', width=500)
+        self.problems_table.tag_configure('error', foreground='#c62828')
+        self.problems_table.tag_configure('warning', foreground='#ef6c00')
+        self.problems_table.tag_configure('note', foreground='#607d8b')
+        self.problems_table.pack(fill='both', expand=True, padx=5, pady=5)
+        self.problems_table.bind('<<TreeviewSelect>>', self.jump_to_diagnostic)
+        
+        self.diagnostics = DiagnosticIndex()
+        self.diagnostic_items = {}
+        self.diagnostic_buffer_files = set()
+        self.diagnostic_generation = 0
+        
+    def create_compile_profile_panel(self, parent):
+        controls = tk.Frame(parent, bg='#2b2b2b')
+        controls.pack(fill='x', padx=5, pady=5)
+        
+        tk.Button(controls, text="Profile compile", command=self.profile_compile,
+                 bg='#505050', fg='white', border=0, padx=8).pack(side='left', padx=2)
+        tk.Label(controls, text="Compare with:", bg='#2b2b2b', fg='white').pack(side='left', padx=(10, 0))
+        self.profile_baseline_var = tk.StringVar()
+        self.profile_baseline_combo = ttk.Combobox(controls, textvariable=self.profile_baseline_var,
+                                                 state='readonly', width=40)
+        self.profile_baseline_combo.pack(side='left', fill='x', expand=True, padx=5)
+        self.profile_baseline_combo.bind('<<ComboboxSelected>>', lambda e: self.render_compile_profile())
+        
+        columns = ('category', 'time', 'share', 'baseline')
+        self.profile_table = ttk.Treeview(parent, columns=columns)
+        self.profile_table.heading('#0', text='Name', command=lambda: self.sort_compile_profile('name'))
+        for column, title in (('category', 'Category'), ('time', 'Time'), ('share', 'Share'),
+                              ('baseline', 'Baseline')):
+            self.profile_table.heading(column, text=title,
+                                       command=lambda column=column: self.sort_compile_profile(column))
+            self.profile_table.column(column, width=90, anchor='center')
+        self.profile_table.column('#0', width=360)
+        self.profile_table.tag_configure('slower', foreground='#c62828')
+        self.profile_table.tag_configure('faster', foreground='#2e7d32')
+        self.profile_table.pack(fill='both', expand=True, padx=5)
+        
+        self.profile_summary = tk.Label(parent, text="", bg='#2b2b2b', fg='#a0a0a0', anchor='w')
+        self.profile_summary.pack(fill='x', padx=5, pady=(0, 5))
+        
+        self.compile_profiles = BenchmarkStore(APP_DIR / 'compile_profiles.json', COMPILE_PROFILE_HISTORY)
+        self.compile_profile = None
+        self.profile_baselines = {}
+        self.profile_sort = ('time', True)
+        
+    def create_performance_panel(self, parent):
+        self.perf_refresh_job = None
+        controls = tk.Frame(parent, bg='#2b2b2b')
+        controls.pack(fill='x', padx=5, pady=5)
+        
+        self.perf_enabled_var = tk.BooleanVar(value=perf_timers.enabled)
+        tk.Checkbutton(controls, text="Record timings", variable=self.perf_enabled_var,
+                      command=self.toggle_perf_timers, bg='#2b2b2b', fg='white',
+                      selectcolor='#404040', activebackground='#2b2b2b').pack(side='left')
+        tk.Button(controls, text="Reset", command=self.reset_perf_timers,
+                 bg='#505050', fg='white', border=0, padx=8).pack(side='left', padx=2)
+        tk.Button(controls, text="Export JSON...", command=self.export_perf_timers,
+                 bg='#505050', fg='white', border=0, padx=8).pack(side='left', padx=2)
+        
+        columns = ('count', 'p50', 'p99', 'max', 'total')
+        self.perf_table = ttk.Treeview(parent, columns=columns)
+        self.perf_table.heading('#0', text='Timer')
+        self.perf_table.heading('count', text='Calls')
+        self.perf_table.heading('p50', text='p50')
+        self.perf_table.heading('p99', text='p99')
+        self.perf_table.heading('max', text='Max')
+        self.perf_table.heading('total', text='Total')
+        self.perf_table.column('#0', width=200)
+        for column in columns:
+            self.perf_table.column(column, width=80, anchor='center')
+        self.perf_table.pack(fill='both', expand=True, padx=5, pady=5)
+        
+    def toggle_perf_timers(self):
+        perf_timers.enabled = self.perf_enabled_var.get()
+        # Keep a single refresh loop no matter how often the checkbox is flipped
+        if self.perf_refresh_job:
+            self.root.after_cancel(self.perf_refresh_job)
+            self.perf_refresh_job = None
+        if perf_timers.enabled:
+            self.perf_refresh_job = self.root.after(PERF_REFRESH_MS, self.refresh_perf_table)
+            
+    def reset_perf_timers(self):
+        perf_timers.reset()
+        self.refresh_perf_table(reschedule=False)
+        
+    def refresh_perf_table(self, reschedule=True):
+        def duration(seconds):
+            return f"{seconds * 1000:.2f} ms" if seconds < 1 else f"{seconds:.2f} s"
+            
+        self.perf_table.delete(*self.perf_table.get_children())
+        for name, stats in sorted(perf_timers.snapshot().items()):
+            self.perf_table.insert('', tk.END, text=name,
+                                   values=(stats['count'], duration(stats['p50']), duration(stats['p99']),
+                                           duration(stats['max']), duration(stats['total'])))
+        if reschedule:
+            self.perf_refresh_job = None
+            if perf_timers.enabled:
+                self.perf_refresh_job = self.root.after(PERF_REFRESH_MS, self.refresh_perf_table)
+            
+    def export_perf_timers(self):
+        file_path = filedialog.asksaveasfilename(
+            title="Export timings",
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if file_path:
+            try:
+                with open(file_path, 'w', encoding='utf-8') as file:
+                    json.dump(perf_timers.snapshot(), file, indent=1)
+                self.update_status(f"Timings exported: {file_path}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Cannot export timings: {e}")
+                
+    def create_run_profile_panel(self, parent):
+        controls = tk.Frame(parent, bg='#2b2b2b')
+        controls.pack(fill='x', padx=5, pady=5)
+        
+        tk.Label(controls, text="Input:", bg='#2b2b2b', fg='white').pack(side='left')
+        self.profile_input_var = tk.StringVar()
+        tk.Entry(controls, textvariable=self.profile_input_var, bg='#404040',
+                fg='white').pack(side='left', fill='x', expand=True, padx=5)
+        tk.Button(controls, text="Browse...", command=self.choose_profile_input,
+                 bg='#505050', fg='white', border=0, padx=8).pack(side='left', padx=2)
+        tk.Button(controls, text="Profile", command=self.profile_run,
+                 bg='#505050', fg='white', border=0, padx=8).pack(side='left', padx=2)
+        tk.Button(controls, text="Clear heat", command=self.clear_heat,
+                 bg='#505050', fg='white', border=0, padx=8).pack(side='left', padx=2)
+        
+        self.run_profile_view = tk.StringVar(value='Functions')
+        views = tk.Frame(parent, bg='#2b2b2b')
+        views.pack(fill='x', padx=5)
+        for view in ('Functions', 'Lines'):
+            tk.Radiobutton(views, text=view, value=view, variable=self.run_profile_view,
+                          command=self.render_run_profile, bg='#2b2b2b', fg='white',
+                          selectcolor='#404040', activebackground='#2b2b2b').pack(side='left')
+        
+        columns = ('share', 'seconds', 'calls')
+        self.run_profile_table = ttk.Treeview(parent, columns=columns)
+        self.run_profile_table.heading('#0', text='Function / line', command=lambda: self.sort_run_profile('name'))
+        for column, title in (('share', 'Share'), ('seconds', 'Self time'), ('calls', 'Calls')):
+            self.run_profile_table.heading(column, text=title,
+                                           command=lambda column=column: self.sort_run_profile(column))
+            self.run_profile_table.column(column, width=90, anchor='center')
+        self.run_profile_table.column('#0', width=360)
+        self.run_profile_table.pack(fill='both', expand=True, padx=5, pady=5)
+        self.run_profile_table.bind('<<TreeviewSelect>>', self.run_profile_selected)
+        
+        self.run_profile_summary = tk.Label(parent, text="", bg='#2b2b2b', fg='#a0a0a0', anchor='w')
+        self.run_profile_summary.pack(fill='x', padx=5, pady=(0, 5))
+        
+        for level, color in enumerate(HEAT_LEVELS):
+            self.code_editor.tag_configure(f"heat{level}", background=color)
+        self.run_profile = None
+        self.run_profile_sort = ('share', True)
+        
+    def create_assembly_panel(self, parent):
+        self.assembly_info = tk.Label(parent, text="Open this tab to compile the buffer with -S",
+                                    bg='#2b2b2b', fg='#a0a0a0', anchor='w')
+        self.assembly_info.pack(fill='x', padx=5, pady=(5, 0))
+        
+        self.assembly_text = scrolledtext.ScrolledText(
+            parent,
+            bg='#1e1e1e',
+            fg='#d4d4d4',
+            font=('Consolas', 10),
+            wrap='none',
+            state='disabled'
+        )
+        self.assembly_text.pack(fill='both', expand=True, padx=5, pady=5)
+        self.assembly_text.tag_configure("label", foreground="#dcdcaa")
+        self.assembly_text.tag_configure("mapped", foreground="#d4d4d4")
+        self.assembly_text.tag_configure("unmapped", foreground="#808080")
+        self.assembly_text.tag_configure("current", background="#264f78")
+        self.assembly_text.bind('<ButtonRelease-1>', self.assembly_clicked)
+        
+        self.code_editor.tag_configure("asm_source", background="#264f78")
+        self.code_editor.bind('<KeyRelease>', self.schedule_assembly, add='+')
+        self.code_editor.bind('<ButtonRelease-1>', self.highlight_assembly, add='+')
+        self.notebook.bind('<<NotebookTabChanged>>', self.schedule_assembly, add='+')
+        
+        self.assembly_job = None
+        self.assembly_timer = None
+        self.assembly_version = None
+        self.assembly_lines = []
+        self.assembly_map = {}
+        
+    def create_compare_panel(self, parent):
+        tk.Label(parent, text="Configurations (one per line: compiler and flags):",
+                bg='#2b2b2b', fg='white', anchor='w').pack(fill='x', padx=5, pady=(5, 0))
+        
+        self.compare_configs = tk.Text(parent, bg='#1e1e1e', fg='#d4d4d4', insertbackground='white',
+                                     font=('Consolas', 10), height=5)
+        self.compare_configs.pack(fill='x', padx=5, pady=5)
+        self.compare_configs.insert(1.0, "g++ -O2\ng++ -O3 -march=native\nclang++ -O2")
+        
+        tk.Button(parent, text="Compare", command=self.compare_configurations,
+                 bg='#505050', fg='white', border=0, padx=8).pack(anchor='w', padx=5)
+        
+        columns = ('compile', 'size', 'runtime', 'memory')
+        self.compare_table = ttk.Treeview(parent, columns=columns, height=8)
+        self.compare_table.heading('#0', text='Configuration')
+        self.compare_table.heading('compile', text='Compile time')
+        self.compare_table.heading('size', text='Binary size')
+        self.compare_table.heading('runtime', text='Median runtime')
+        self.compare_table.heading('memory', text='Peak memory')
+        self.compare_table.column('#0', width=220)
+        for column in columns:
+            self.compare_table.column(column, width=100, anchor='center')
+        self.compare_table.tag_configure('fastest', background='#2e7d32', foreground='white')
+        self.compare_table.tag_configure('failed', foreground='#c62828')
+        self.compare_table.pack(fill='both', expand=True, padx=5, pady=5)
+        
+        self.compare_summary = tk.Label(parent, text="", bg='#2b2b2b', fg='#a0a0a0', anchor='w')
+        self.compare_summary.pack(fill='x', padx=5, pady=(0, 5))
         
     def create_compiler_settings(self, parent):
         settings_scroll = scrolledtext.ScrolledText(parent, bg='#2b2b2b', height=10)
@@ -262,9 +3382,15 @@ class CppCompilerIDE:
         
         tk.Label(settings_content, text="Compiler:", bg='#2b2b2b', fg='white').grid(row=0, column=0, sticky='w', pady=2)
         self.compiler_var = tk.StringVar(value="g++")
-        compiler_combo = ttk.Combobox(settings_content, textvariable=self.compiler_var, 
-                                    values=["g++", "clang++", "cl"])
-        compiler_combo.grid(row=0, column=1, sticky='ew', padx=5, pady=2)
+        self.compiler_combo = ttk.Combobox(settings_content, textvariable=self.compiler_var, 
+                                         values=["g++", "clang++", "cl"])
+        self.compiler_combo.grid(row=0, column=1, sticky='ew', padx=5, pady=2)
+        self.compiler_combo.bind('<<ComboboxSelected>>', self.compiler_selected)
+        
+        self.compiler_version = tk.Label(settings_content, text="Detecting compilers...",
+                                       bg='#2b2b2b', fg='#a0a0a0', anchor='w')
+        self.compiler_version.grid(row=0, column=2, sticky='w', padx=5)
+        self.compilers = {}
         
         tk.Label(settings_content, text="Flags:", bg='#2b2b2b', fg='white').grid(row=1, column=0, sticky='w', pady=2)
         self.flags_var = tk.StringVar(value="-std=c++17 -O2 -Wall")
@@ -273,9 +3399,35 @@ class CppCompilerIDE:
         
         tk.Label(settings_content, text="Standard:", bg='#2b2b2b', fg='white').grid(row=2, column=0, sticky='w', pady=2)
         self.std_var = tk.StringVar(value="c++17")
-        std_combo = ttk.Combobox(settings_content, textvariable=self.std_var,
-                               values=["c++11", "c++14", "c++17", "c++20", "c++23"])
-        std_combo.grid(row=2, column=1, sticky='ew', padx=5, pady=2)
+        self.std_combo = ttk.Combobox(settings_content, textvariable=self.std_var,
+                                    values=["c++11", "c++14", "c++17", "c++20", "c++23"])
+        self.std_combo.grid(row=2, column=1, sticky='ew', padx=5, pady=2)
+        
+        tk.Label(settings_content, text="Cache limit (MB):", bg='#2b2b2b', fg='white').grid(row=3, column=0, sticky='w', pady=2)
+        self.cache_limit_var = tk.StringVar(value=str(COMPILE_CACHE_LIMIT_MB))
+        cache_limit_entry = tk.Entry(settings_content, textvariable=self.cache_limit_var, bg='#404040', fg='white')
+        cache_limit_entry.grid(row=3, column=1, sticky='ew', padx=5, pady=2)
+        
+        tk.Label(settings_content, text="Scrollback lines:", bg='#2b2b2b', fg='white').grid(row=4, column=0, sticky='w', pady=2)
+        self.scrollback_var = tk.StringVar(value=str(SCROLLBACK_LINES))
+        scrollback_entry = tk.Entry(settings_content, textvariable=self.scrollback_var, bg='#404040', fg='white')
+        scrollback_entry.grid(row=4, column=1, sticky='ew', padx=5, pady=2)
+        self.scrollback_var.trace_add('write', self.update_scrollback_limit)
+        
+        tk.Label(settings_content, text="Benchmark runs:", bg='#2b2b2b', fg='white').grid(row=5, column=0, sticky='w', pady=2)
+        self.benchmark_runs_var = tk.StringVar(value=str(BENCHMARK_RUNS))
+        benchmark_runs_entry = tk.Entry(settings_content, textvariable=self.benchmark_runs_var, bg='#404040', fg='white')
+        benchmark_runs_entry.grid(row=5, column=1, sticky='ew', padx=5, pady=2)
+        
+        tk.Label(settings_content, text="Warmup runs:", bg='#2b2b2b', fg='white').grid(row=6, column=0, sticky='w', pady=2)
+        self.benchmark_warmup_var = tk.StringVar(value=str(BENCHMARK_WARMUP))
+        benchmark_warmup_entry = tk.Entry(settings_content, textvariable=self.benchmark_warmup_var, bg='#404040', fg='white')
+        benchmark_warmup_entry.grid(row=6, column=1, sticky='ew', padx=5, pady=2)
+        
+        tk.Label(settings_content, text="Check delay (ms, 0 = off):", bg='#2b2b2b', fg='white').grid(row=7, column=0, sticky='w', pady=2)
+        self.check_delay_var = tk.StringVar(value=str(SYNTAX_CHECK_DELAY_MS))
+        check_delay_entry = tk.Entry(settings_content, textvariable=self.check_delay_var, bg='#404040', fg='white')
+        check_delay_entry.grid(row=7, column=1, sticky='ew', padx=5, pady=2)
         
         settings_content.columnconfigure(1, weight=1)
         
@@ -292,6 +3444,8 @@ class CppCompilerIDE:
                                 bg='#404040', fg='white', anchor='e')
         self.file_info.pack(side='right', padx=10)
         
+        self.load_progress = ttk.Progressbar(self.status_bar, length=200, mode='determinate')
+        
     def load_sample_code(self):
         sample_code = '''#include <iostream>
 using namespace std;
@@ -303,66 +3457,438 @@ int main() {
         self.code_editor.insert(1.0, sample_code)
         self.update_syntax_highlighting()
         
+    @perf_timers.timed('update_status')
     def update_status(self, message):
-        self.status_label.config(text=message)
-        self.root.update()
+        self.output_queue.put(('status', message))
         
+    @perf_timers.timed('append_output')
     def append_output(self, text, color="white"):
-        self.output_text.config(state='normal')
-        self.output_text.insert(tk.END, text + '\n')
-        self.output_text.see(tk.END)
-        self.output_text.config(state='disabled')
+        self.output_queue.put(('output', text + '\n'))
         
+    @perf_timers.timed('append_terminal')
     def append_terminal(self, text, color="#00ff00"):
-        self.terminal_output.config(state='normal')
-        self.terminal_output.insert(tk.END, text + '\n')
-        self.terminal_output.see(tk.END)
-        self.terminal_output.config(state='disabled')
+        self.output_queue.put(('terminal', text + '\n'))
+        
+    def write_terminal(self, text):
+        self.output_queue.put(('terminal', text))
+        
+    def call_in_ui(self, callback, *args, **kwargs):
+        self.output_queue.put(('call', lambda: callback(*args, **kwargs)))
+        
+    @perf_timers.timed('output rendering')
+    def pump_output(self):
+        # A failure in one frame must not stop the pump for the rest of the session.
+        try:
+            self.drain_output()
+        finally:
+            self.root.after(OUTPUT_PUMP_MS, self.pump_output)
+            
+    def drain_output(self):
+        # Worker threads never touch widgets directly: everything they produce goes
+        # through output_queue and is applied here, one insert per widget per frame.
+        widgets = {'output': self.output_text, 'terminal': self.terminal_output}
+        pending = {target: [] for target in widgets}
+        cleared = set()
+        status = None
+        calls = []
+        chars = 0
+        
+        while chars < OUTPUT_PUMP_MAX_CHARS:
+            try:
+                kind, payload = self.output_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind in widgets:
+                pending[kind].append(payload)
+                chars += len(payload)
+            elif kind == 'clear':
+                pending[payload] = []
+                cleared.add(payload)
+            elif kind == 'status':
+                status = payload
+            elif kind == 'call':
+                calls.append(payload)
+                
+        for target, widget in widgets.items():
+            if target not in cleared and not pending[target]:
+                continue
+            buffer = self.scrollback[target]
+            widget.config(state='normal')
+            if target in cleared:
+                buffer.clear()
+                widget.delete(1.0, tk.END)
+            if pending[target]:
+                replace, text, trim = buffer.write(''.join(pending[target]))
+                if replace:
+                    widget.delete(1.0, tk.END)
+                elif trim:
+                    widget.delete(1.0, f"{trim + 1}.0")
+                widget.insert(tk.END, text)
+                widget.see(tk.END)
+            widget.config(state='disabled')
+            if buffer.log_error:
+                status = f"Output log disabled: {buffer.log_error}"
+                buffer.log_error = None
+            
+        if pending['terminal'] or 'terminal' in cleared:
+            self.update_scrollback_info()
+            
+        if status is not None:
+            self.status_label.config(text=status)
+            
+        for callback in calls:
+            try:
+                callback()
+            except Exception as e:
+                self.status_label.config(text=f"Error: {e}")
+                
+    def update_scrollback_info(self):
+        buffer = self.scrollback['terminal']
+        text = f"{buffer.shown} lines shown"
+        if buffer.dropped:
+            text += f", {buffer.dropped} dropped from view"
+        text += f" ({buffer.logged} lines in log)"
+        self.scrollback_info.config(text=text)
+        
+    def update_scrollback_limit(self, *args):
+        try:
+            limit = max(100, int(self.scrollback_var.get()))
+        except ValueError:
+            return
+        for buffer in self.scrollback.values():
+            buffer.limit = limit
+            
+    def open_terminal_log(self):
+        path = self.scrollback['terminal'].log_path
+        if not path.exists():
+            self.update_status("The terminal log is empty")
+            return
+        try:
+            if sys.platform == "win32":
+                os.startfile(path)
+            else:
+                opener = 'open' if sys.platform == "darwin" else 'xdg-open'
+                subprocess.Popen([opener, str(path)])
+        except Exception as e:
+            messagebox.showerror("Error", f"Cannot open log: {e}")
+            
+    def save_terminal_log(self):
+        path = self.scrollback['terminal'].log_path
+        if not path.exists():
+            self.update_status("The terminal log is empty")
+            return
+        file_path = filedialog.asksaveasfilename(
+            title="Save Terminal Log",
+            defaultextension=".log",
+            filetypes=[("Log files", "*.log"), ("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if file_path:
+            try:
+                shutil.copyfile(path, file_path)
+                self.update_status(f"Log saved: {file_path}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Cannot save log: {e}")
+                
+    def update_cache_info(self):
+        cache = self.compile_cache
+        self.call_in_ui(self.cache_info.config, text=f"Cache: {cache.hits} hits / {cache.misses} misses")
+        
+    def cache_limit_bytes(self):
+        try:
+            return max(0, float(self.cache_limit_var.get())) * 1024 * 1024
+        except ValueError:
+            return COMPILE_CACHE_LIMIT_MB * 1024 * 1024
+        
+    def clear_output(self):
+        self.output_queue.put(('clear', 'output'))
+        
+    def clear_terminal(self):
+        self.output_queue.put(('clear', 'terminal'))
+        
+    def new_file(self):
+        if messagebox.askyesno("New File", "Would you like to create a new file?"):
+            self.cancel_file_load()
+            self.code_editor.delete(1.0, tk.END)
+            self.current_file = None
+            self.saved_digest = None
+            self.start_journal()
+            self.file_info.config(text="New File")
+            self.update_status("A new file has been created")
+            
+    def open_file(self):
+        file_path = filedialog.askopenfilename(
+            title="Open C++ File",
+            filetypes=[("C++ files", "*.cpp *.cxx *.cc"), ("C files", "*.c"), ("All files", "*.*")]
+        )
+        
+        if file_path:
+            try:
+                self.load_file(file_path)
+            except Exception as e:
+                self.cancel_file_load()
+                messagebox.showerror("Error", f"Cannot open file: {e}")
+                
+    def load_file(self, file_path):
+        # The file is mapped and fed to the editor in chunks from after() callbacks,
+        # so the window stays responsive and shows progress while a big file loads.
+        self.cancel_file_load()
+        self.stop_journal()
+        
+        file = open(file_path, 'rb')
+        size = os.fstat(file.fileno()).st_size
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        # Untitled until the load completes, so nothing can write the partial buffer
+        # over the previous file.
+        self.current_file = None
+        self.saved_digest = None
+        self.file_info.config(text=f"Opening {os.path.basename(file_path)}...")
+        # Invalid UTF-8 is replaced rather than aborting halfway through; replacements
+        # are found by comparing U+FFFD counts in the text with those in the bytes.
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        digest = hashlib.sha256()
+        
+        self.code_editor.configure(undo=False)
+        self.code_editor.delete(1.0, tk.END)
+        self.code_editor.configure(state='disabled')
+        self.load_progress['value'] = 0
+        self.load_progress.pack(side='right', padx=10)
+        
+        load = {'file': file, 'data': data, 'offset': 0, 'carry': '', 'replaced': 0}
+        started = time.perf_counter()
+        
+        def step():
+            try:
+                offset = load['offset']
+                end = min(size, offset + LOAD_CHUNK_BYTES)
+                text = load['carry'] + decoder.decode(data[offset:end], final=end >= size)
+                load['replaced'] += text.count('\ufffd') - data[offset:end + 2].count(b'\xef\xbf\xbd')
+                load['offset'] = end
+                load['carry'] = ''
+                if end < size and text.endswith('\r'):
+                    text, load['carry'] = text[:-1], '\r'
+                text = text.replace('\r\n', '\n').replace('\r', '\n')
+                
+                if text:
+                    digest.update(text.encode('utf-8'))
+                    self.code_editor.configure(state='normal')
+                    self.code_editor.insert('end-1c', text)
+                    self.code_editor.configure(state='disabled')
+                    
+                if end < size:
+                    percent = end * 100 // size
+                    self.load_progress['value'] = percent
+                    self.update_status(f"Opening {os.path.basename(file_path)}: {percent}%")
+                    self.load_job = self.root.after(1, step)
+                    return
+                    
+                replaced = load['replaced']
+                self.finish_file_load()
+                perf_timers.record('file open', time.perf_counter() - started)
+                self.current_file = file_path
+                # After replacements the buffer differs from the file, so it is not clean.
+                self.saved_digest = (file_path, digest.hexdigest()) if not replaced else None
+                self.start_journal()
+                self.file_info.config(text=os.path.basename(file_path))
+                if replaced:
+                    self.update_status(f"Opened: {file_path} ({replaced} invalid UTF-8 sequences replaced)")
+                else:
+                    self.update_status(f"Opened: {file_path}")
+                line, column = self.pending_goto or (1, 0)
+                self.pending_goto = None
+                self.code_editor.mark_set('insert', f"{line}.{column}")
+                self.code_editor.see('insert')
+            except Exception as e:
+                self.cancel_file_load()
+                messagebox.showerror("Error", f"Cannot open file: {e}")
+                
+        self.file_load = load
+        self.load_job = self.root.after(1, step)
+        
+    def finish_file_load(self):
+        load = self.file_load
+        if load:
+            if isinstance(load['data'], mmap.mmap):
+                load['data'].close()
+            load['file'].close()
+            self.file_load = None
+        self.load_job = None
+        self.load_progress.pack_forget()
+        self.code_editor.configure(state='normal', undo=True)
+        self.code_editor.edit_reset()
+        self.code_editor.edit_modified(False)
+        
+    def cancel_file_load(self):
+        # A half-loaded buffer must never be saved over the previous file, so it is
+        # left untitled.
+        if self.load_job:
+            self.root.after_cancel(self.load_job)
+        if self.file_load:
+            self.finish_file_load()
+            self.current_file = None
+            self.saved_digest = None
+            self.file_info.config(text="New File")
+            self.start_journal()
+            
+    def iter_editor_chunks(self):
+        last_line = self.editor_line('end-1c')
+        for line in range(1, last_line + 1, SAVE_CHUNK_LINES):
+            end = f"{line + SAVE_CHUNK_LINES}.0" if line + SAVE_CHUNK_LINES <= last_line else 'end-1c'
+            yield self.code_editor.get(f"{line}.0", end)
+            
+    def editor_digest(self):
+        digest = hashlib.sha256()
+        for chunk in self.iter_editor_chunks():
+            digest.update(chunk.encode('utf-8'))
+        return digest.hexdigest()
+        
+    def start_journal(self):
+        # Every buffer gets a fresh journal whose snapshot is the text it starts from.
+        self.stop_journal()
+        path = APP_DIR / 'journal' / f"{os.getpid()}-{int(time.time() * 1000)}.jnl"
+        try:
+            self.journal = EditJournal(path, self.current_file, self.code_editor.get(1.0, tk.END + '-1c'))
+        except OSError as e:
+            self.append_output(f"Edit journal disabled: {e}")
+            
+    def stop_journal(self):
+        if self.journal:
+            self.journal.close(discard=True)
+            self.journal = None
+            
+    def start_journal_recovery(self):
+        future = self.executor.submit(self.scan_journals, orphaned_journals(APP_DIR / 'journal'))
+        future.add_done_callback(lambda future: self.call_in_ui(self.offer_journal_recovery, future))
+        
+    def scan_journals(self, paths):
+        # Runs on the executor: replays each orphaned journal and drops the ones whose
+        # text is already on disk. The newest journal comes first.
+        recoverable = []
+        for path in paths:
+            try:
+                header, records = read_journal(path)
+                # Nothing but the starting snapshot: the buffer was never edited.
+                if len(records) <= 1:
+                    path.unlink()
+                    continue
+                base, tail = replay_journal(records, JOURNAL_RECOVER_UNDO)
+                lines = base.split('\n')
+                for record in tail:
+                    apply_edit(lines, record)
+                text = '\n'.join(lines)
+                
+                file_path = header.get('file') if header else None
+                saved = None
+                if file_path and os.path.exists(file_path):
+                    with open(file_path, encoding='utf-8', errors='replace') as file:
+                        saved = file.read()
+                    if saved == text:
+                        path.unlink()
+                        continue
+                digest = hashlib.sha256(saved.encode('utf-8')).hexdigest() if saved is not None else None
+                recoverable.append({'path': path, 'file': file_path, 'base': base, 'tail': tail,
+                                    'digest': digest, 'mtime': path.stat().st_mtime})
+            except (OSError, ValueError, IndexError, TypeError, AttributeError):
+                continue
+        return sorted(recoverable, key=lambda journal: journal['mtime'], reverse=True)
+        
+    def offer_journal_recovery(self, future):
+        try:
+            journals = future.result()
+        except Exception as e:
+            self.append_output(f"Journal recovery failed: {e}")
+            return
+            
+        recovered = False
+        for journal in journals:
+            if not recovered:
+                name = journal['file'] or "an unsaved buffer"
+                stamp = time.strftime('%Y-%m-%d %H:%M', time.localtime(journal['mtime']))
+                if messagebox.askyesno("Recover Unsaved Changes",
+                                       f"Unsaved changes to {name} from {stamp} were found.\n"
+                                       f"Would you like to restore them?"):
+                    self.restore_journal(journal)
+                    recovered = True
+            try:
+                journal['path'].unlink()
+            except OSError:
+                pass
+                
+    def restore_journal(self, journal):
+        # The bulk of the text is loaded like a file; the last edits are replayed
+        # through the editor so they can be undone and land in the new journal.
+        self.cancel_file_load()
+        self.stop_journal()
+        self.code_editor.configure(undo=False)
+        self.code_editor.delete(1.0, tk.END)
+        self.code_editor.insert(1.0, journal['base'])
+        self.code_editor.configure(undo=True)
+        self.code_editor.edit_reset()
         
-    def clear_output(self):
-        self.output_text.config(state='normal')
-        self.output_text.delete(1.0, tk.END)
-        self.output_text.config(state='disabled')
+        self.current_file = journal['file']
+        self.saved_digest = (journal['file'], journal['digest']) if journal['digest'] else None
+        self.start_journal()
+        for record in journal['tail']:
+            if record[0] == 'i':
+                self.code_editor.insert(f"{record[1]}.{record[2]}", record[3])
+            elif record[0] == 'd':
+                self.code_editor.delete(f"{record[1]}.{record[2]}", f"{record[3]}.{record[4]}")
+        self.code_editor.edit_modified(True)
+        self.code_editor.see('insert')
+        self.file_info.config(text=f"{os.path.basename(self.current_file or 'New File')} (recovered)")
+        self.update_status(f"Recovered {len(journal['tail'])} undoable edits from the journal")
         
-    def new_file(self):
-        if messagebox.askyesno("New File", "Would you like to create a new file?"):
-            self.code_editor.delete(1.0, tk.END)
-            self.current_file = None
-            self.file_info.config(text="New File")
-            self.update_status("A new file has been created")
+    @perf_timers.timed('file save')
+    def write_file(self, file_path):
+        # Returns False when the file already holds this exact content.
+        digest = self.editor_digest()
+        if self.saved_digest == (file_path, digest) and os.path.exists(file_path):
+            return False
             
-    def open_file(self):
-        file_path = filedialog.askopenfilename(
-            title="Open C++ File",
-            filetypes=[("C++ files", "*.cpp *.cxx *.cc"), ("C files", "*.c"), ("All files", "*.*")]
-        )
-        
-        if file_path:
+        directory = os.path.dirname(os.path.abspath(file_path))
+        with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', dir=directory, delete=False,
+                                         prefix=f".{os.path.basename(file_path)}.", suffix='.tmp') as temp_file:
             try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
-                    self.code_editor.delete(1.0, tk.END)
-                    self.code_editor.insert(1.0, content)
-                    self.current_file = file_path
-                    self.file_info.config(text=os.path.basename(file_path))
-                    self.update_status(f"Opened: {file_path}")
-                    self.update_syntax_highlighting()
-            except Exception as e:
-                messagebox.showerror("Error", f"Cannot open file: {e}")
+                for chunk in self.iter_editor_chunks():
+                    temp_file.write(chunk)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            except Exception:
+                temp_file.close()
+                os.unlink(temp_file.name)
+                raise
                 
+        try:
+            if os.path.exists(file_path):
+                shutil.copymode(file_path, temp_file.name)
+            os.replace(temp_file.name, file_path)
+        except Exception:
+            os.unlink(temp_file.name)
+            raise
+            
+        self.saved_digest = (file_path, digest)
+        self.code_editor.edit_modified(False)
+        return True
+        
     def save_file(self):
+        # The buffer only holds part of the file until the load finishes.
+        if self.file_load:
+            self.update_status("Cannot save while a file is still loading")
+            return
         if self.current_file:
             try:
-                content = self.code_editor.get(1.0, tk.END + '-1c')
-                with open(self.current_file, 'w', encoding='utf-8') as file:
-                    file.write(content)
-                self.update_status(f"Saved: {self.current_file}")
+                if self.write_file(self.current_file):
+                    self.update_status(f"Saved: {self.current_file}")
+                else:
+                    self.update_status(f"No changes to save: {self.current_file}")
             except Exception as e:
                 messagebox.showerror("Error", f"Cannot save file: {e}")
         else:
             self.save_as_file()
             
     def save_as_file(self):
+        if self.file_load:
+            self.update_status("Cannot save while a file is still loading")
+            return
         file_path = filedialog.asksaveasfilename(
             title="Save As",
             defaultextension=".cpp",
@@ -371,10 +3897,10 @@ int main() {
         
         if file_path:
             try:
-                content = self.code_editor.get(1.0, tk.END + '-1c')
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(content)
+                self.write_file(file_path)
                 self.current_file = file_path
+                if self.journal:
+                    self.journal.rename(file_path)
                 self.file_info.config(text=os.path.basename(file_path))
                 self.update_status(f"Saved as: {file_path}")
             except Exception as e:
@@ -385,76 +3911,569 @@ int main() {
         self.update_status("Compiling...")
         self.notebook.select(0)
         
+        if self.project:
+            return self.compile_project()
+            
         code = self.code_editor.get(1.0, tk.END + '-1c')
         
         if not code.strip():
             self.append_output("No code to compile!", "red")
             self.update_status("Error: No code")
-            return False
+            return None
             
         try:
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.cpp', delete=False) as temp_file:
-                temp_file.write(code)
-                self.temp_source = temp_file.name
-                
-            if sys.platform == "win32":
-                self.temp_executable = self.temp_source.replace('.cpp', '.exe')
-            else:
-                self.temp_executable = self.temp_source.replace('.cpp', '')
-                
             compiler = self.compiler_var.get()
-            flags = self.flags_var.get()
+            flags = self.flags_var.get().split()
             std = f"-std={self.std_var.get()}"
+            self.compile_cache.max_bytes = self.cache_limit_bytes()
             
-            compile_cmd = [compiler, std] + flags.split() + [self.temp_source, '-o', self.temp_executable]
+            self.cancel_build()
+            self.clear_diagnostics()
+            buffer_name = self.current_file or "untitled.cpp"
+            self.current_job = self.engine.submit(self.compile_job, code, compiler, std, flags, buffer_name)
+            return self.current_job
             
-            self.append_output(f"Compiling: {' '.join(compile_cmd)}")
+        except Exception as e:
+            self.append_output(f"Error during compilation setup: {e}")
+            self.update_status("Setup Error")
+            return None
             
-            def compile_thread():
-                try:
-                    result = subprocess.run(compile_cmd, capture_output=True, text=True, timeout=30)
-                    
-                    if result.returncode == 0:
-                        self.append_output("Compilation completed successfully!")
-                        if result.stdout:
-                            self.append_output(f"Output: {result.stdout}")
-                        self.update_status("Compilation completed successfully")
-                        return True
-                    else:
-                        self.append_output("Compilation Errors:")
-                        if result.stderr:
-                            self.append_output(result.stderr)
-                        if result.stdout:
-                            self.append_output(result.stdout)
-                        self.update_status("Compilation Error")
-                        return False
-                        
-                except subprocess.TimeoutExpired:
-                    self.append_output("Compilation exceeded the time limit (30 seconds)")
-                    self.update_status("Compilation - timeout")
-                    return False
-                except FileNotFoundError:
-                    self.append_output(f"Compiler {compiler} Not found!")
-                    self.update_status("Error: No compiler")
-                    return False
-                except Exception as e:
-                    self.append_output(f"Compilation Error: {e}")
-                    self.update_status("Compilation Error")
-                    return False
+    def compile_job(self, job, code, compiler, std, flags, buffer_name="untitled.cpp"):
+        try:
+            result = self.engine.compile(job, code, compiler, std, flags, self.append_output, buffer_name)
+        except JobCancelled:
+            self.append_output("Compilation cancelled")
+            return None
+        except subprocess.TimeoutExpired:
+            self.append_output(f"Compilation exceeded the time limit ({COMPILE_TIMEOUT} seconds)")
+            self.update_status("Compilation - timeout")
+            return None
+        except FileNotFoundError:
+            self.append_output(f"Compiler {compiler} Not found!")
+            self.update_status("Error: No compiler")
+            return None
+        except Exception as e:
+            self.append_output(f"Compilation Error: {e}")
+            self.update_status("Compilation Error")
+            return None
+        finally:
+            self.update_cache_info()
+            
+        index = result['diagnostics']
+        if result['cached']:
+            self.temp_executable = result['executable']
+            self.append_output(f"Using cached executable: {result['executable']}")
+            self.append_output("Compilation completed successfully!")
+            if index.items:
+                self.report_diagnostics(index, {buffer_name})
+            self.update_status("Compilation completed successfully (cached)")
+        elif result['executable']:
+            self.temp_executable = result['executable']
+            self.append_output(f"Compilation completed successfully! ({result['elapsed']:.2f}s)")
+            if result['stdout']:
+                self.append_output(f"Output: {result['stdout']}")
+            if index.items:
+                self.report_diagnostics(index, {buffer_name})
+            self.update_status("Compilation completed successfully")
+        else:
+            self.append_output(f"Compilation Errors: {index.summary()}")
+            self.report_diagnostics(index, {buffer_name})
+            if result['stdout']:
+                self.append_output(result['stdout'])
+            self.update_status("Compilation Error")
+        return result['executable']
+        
+    def report_diagnostics(self, index, buffer_files):
+        # The output tab only gets the head of the list; the full, navigable list is
+        # rendered into the Problems tab.
+        for diagnostic in index.items[:DIAGNOSTIC_OUTPUT_LINES]:
+            self.append_output(format_diagnostic(diagnostic))
+        if len(index.items) > DIAGNOSTIC_OUTPUT_LINES:
+            self.append_output(f"... {len(index.items) - DIAGNOSTIC_OUTPUT_LINES} more in the Problems tab")
+        for line in index.other[:DIAGNOSTIC_OUTPUT_LINES]:
+            self.append_output(line)
+        self.call_in_ui(self.show_diagnostics, index, buffer_files)
+        
+    def clear_diagnostics(self):
+        self.diagnostic_generation += 1
+        self.diagnostics = DiagnosticIndex()
+        self.diagnostic_items = {}
+        self.problems_table.delete(*self.problems_table.get_children())
+        self.problems_summary.config(text="No diagnostics")
+        self.code_editor.tag_remove("diag_error", 1.0, tk.END)
+        self.code_editor.tag_remove("diag_warning", 1.0, tk.END)
+        
+    def show_diagnostics(self, index, buffer_files, select=True):
+        self.clear_diagnostics()
+        self.diagnostics = index
+        self.diagnostic_buffer_files = {os.path.abspath(path) for path in buffer_files}
+        self.problems_summary.config(text=index.summary())
+        if select and index.counts.get('error'):
+            self.notebook.select(self.problems_table.master)
+        self.render_diagnostics(self.diagnostic_generation, 0)
+        
+    def render_diagnostics(self, generation, start):
+        # Huge error cascades are inserted a slice at a time so the editor stays
+        # responsive; a newer build bumps the generation and stops this loop.
+        if generation != self.diagnostic_generation:
+            return
+        items = self.diagnostics.items
+        for number in range(start, min(start + DIAGNOSTIC_SLICE, len(items))):
+            self.insert_diagnostic('', f"d{number}", items[number])
+        if start + DIAGNOSTIC_SLICE < len(items):
+            self.root.after(1, self.render_diagnostics, generation, start + DIAGNOSTIC_SLICE)
+            
+    def insert_diagnostic(self, parent, iid, diagnostic):
+        location = os.path.basename(diagnostic['file']) if diagnostic['file'] else ''
+        if diagnostic['line']:
+            location += f":{diagnostic['line']}"
+        self.problems_table.insert(parent, tk.END, iid=iid, text=diagnostic['severity'],
+                                   values=(location, diagnostic['message']), tags=(diagnostic['severity'],))
+        self.diagnostic_items[iid] = diagnostic
+        for number, child in enumerate(diagnostic['children']):
+            self.insert_diagnostic(iid, f"{iid}.{number}", child)
+            
+        if diagnostic['severity'] in ('error', 'warning') and self.in_buffer(diagnostic):
+            start, end = self.diagnostic_range(diagnostic)
+            self.code_editor.tag_add(f"diag_{diagnostic['severity']}", start, end)
+            
+    def in_buffer(self, diagnostic):
+        return bool(diagnostic['file'] and diagnostic['line']) and \
+            os.path.abspath(diagnostic['file']) in self.diagnostic_buffer_files
+            
+    def diagnostic_range(self, diagnostic):
+        line = diagnostic['line']
+        if not diagnostic['column']:
+            return f"{line}.0", f"{line}.end"
+        start = f"{line}.{diagnostic['column'] - 1}"
+        if diagnostic['end_column'] >= diagnostic['column']:
+            return start, f"{line}.{diagnostic['end_column']}"
+        return start, f"{start} wordend"
+        
+    def jump_to_diagnostic(self, event=None):
+        selection = self.problems_table.selection()
+        diagnostic = self.diagnostic_items.get(selection[0]) if selection else None
+        if not diagnostic:
+            return
+        if not self.in_buffer(diagnostic):
+            self.update_status(format_diagnostic(diagnostic))
+            return
+        start, end = self.diagnostic_range(diagnostic)
+        self.code_editor.mark_set(tk.INSERT, start)
+        self.code_editor.tag_remove(tk.SEL, 1.0, tk.END)
+        self.code_editor.tag_add(tk.SEL, start, end)
+        self.code_editor.see(start)
+        self.code_editor.focus_set()
+        self.update_status(format_diagnostic(diagnostic))
+        
+    def compile_project(self):
+        self.cancel_build()
+        self.clear_diagnostics()
+        self.current_job = self.engine.submit(self.project_job, self.project, self.compiler_var.get(),
+                                              self.std_var.get())
+        return self.current_job
+        
+    def project_job(self, job, project, compiler, std):
+        self.append_output(f"Building project: {project.name}")
+        buffer_files = {self.current_file} if self.current_file else set()
+        try:
+            executable, diagnostics = self.engine.build_project(job, project, compiler, std, self.append_output)
+        except JobCancelled:
+            self.append_output("Build cancelled")
+            return None
+        except Exception as e:
+            self.append_output(f"Build Error: {e}")
+            self.update_status("Build Error")
+            return None
+            
+        if diagnostics.items:
+            self.call_in_ui(self.show_diagnostics, diagnostics, buffer_files)
+        if executable:
+            self.temp_executable = executable
+            self.update_status("Project built successfully")
+        else:
+            self.update_status("Build Error")
+        return executable
+        
+    def open_project(self):
+        file_path = filedialog.askopenfilename(
+            title="Open Project",
+            filetypes=[("C++ IDE projects", "*.cppproj"), ("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        
+        if file_path:
+            try:
+                self.project = Project.load(file_path)
+                self.file_info.config(text=f"Project: {self.project.name}")
+                self.update_status(f"Opened project: {file_path} ({len(self.project.sources)} sources)")
+            except Exception as e:
+                messagebox.showerror("Error", f"Cannot open project: {e}")
+                
+    def close_project(self):
+        if self.project:
+            self.project = None
+            self.file_info.config(text=os.path.basename(self.current_file) if self.current_file else "New File")
+            self.update_status("Project closed")
+            
+    def choose_tests_folder(self):
+        folder = filedialog.askdirectory(title="Select a folder with .in/.out files")
+        if folder:
+            self.tests_folder_var.set(folder)
+            
+    def run_tests(self):
+        executable = getattr(self, 'temp_executable', None)
+        if not executable or not os.path.exists(executable):
+            messagebox.showwarning("Tests", "No compiled file! Please compile the code first.")
+            return
+            
+        cases = find_test_cases(self.tests_folder_var.get())
+        if not cases:
+            messagebox.showwarning("Tests", "No test cases (NAME.in with NAME.out) found in the folder.")
+            return
+            
+        try:
+            workers = max(1, int(self.tests_workers_var.get()))
+        except ValueError:
+            workers = os.cpu_count() or 1
+            
+        self.tests_table.delete(*self.tests_table.get_children())
+        self.test_results = {}
+        for name, input_path, expected_path in cases:
+            self.tests_table.insert('', tk.END, iid=name, text=name, values=('...', '', ''))
+            
+        self.cancel_build()
+        self.tests_summary.config(text=f"Running {len(cases)} cases on {workers} workers...")
+        self.current_job = self.engine.submit(self.tests_job, executable, cases, workers)
+        
+    def tests_job(self, job, executable, cases, workers):
+        start = time.perf_counter()
+        try:
+            results = self.engine.test(job, executable, cases, workers,
+                                       on_result=lambda result: self.call_in_ui(self.show_test_result, result))
+        except JobCancelled:
+            self.call_in_ui(self.tests_summary.config, text="Test run cancelled")
+            return None
+        except Exception as e:
+            self.call_in_ui(self.tests_summary.config, text=f"Test run failed: {e}")
+            return None
+        passed = sum(result['status'] == 'PASS' for result in results)
+        elapsed = time.perf_counter() - start
+        self.call_in_ui(self.tests_summary.config,
+                        text=f"{passed}/{len(cases)} passed in {elapsed:.2f}s on {workers} workers")
+        self.update_status(f"Tests: {passed}/{len(cases)} passed")
+        return passed
+        
+    def show_test_result(self, result):
+        self.test_results[result['name']] = result
+        exit_code = '' if result['exit_code'] is None else result['exit_code']
+        self.tests_table.item(result['name'], values=(result['status'], f"{result['wall']:.3f}s", exit_code),
+                              tags=(result['status'],))
+        
+    def show_test_details(self, event=None):
+        selection = self.tests_table.selection()
+        result = self.test_results.get(selection[0]) if selection else None
+        self.tests_details.config(state='normal')
+        self.tests_details.delete(1.0, tk.END)
+        if result:
+            self.tests_details.insert(tk.END, result['diff'] or "Output matches the expected output")
+        self.tests_details.config(state='disabled')
+        
+    def start_compiler_discovery(self):
+        future = self.executor.submit(discover_compilers, APP_DIR / 'compilers.json')
+        future.add_done_callback(lambda future: self.call_in_ui(self.apply_compilers, future))
+        
+    def apply_compilers(self, future):
+        try:
+            compilers = future.result()
+        except Exception as e:
+            self.compiler_version.config(text=f"Compiler detection failed: {e}")
+            return
+            
+        self.compilers = {info['name']: info for info in compilers}
+        if not compilers:
+            self.compiler_version.config(text="No C++ compiler found")
+            self.append_output("Warning: C++ compiler not found!")
+            self.append_output("Install one of the following: g++, clang++")
+            self.append_output("The application will run, but compilation will not work.")
+            return
+            
+        self.compiler_combo.config(values=list(self.compilers))
+        if self.compiler_var.get() not in self.compilers:
+            self.compiler_var.set(compilers[0]['name'])
+        self.compiler_selected()
+        self.update_status(f"Detected compilers: {', '.join(self.compilers)}")
+        
+    def compiler_selected(self, event=None):
+        info = self.compilers.get(self.compiler_var.get())
+        if not info:
+            self.compiler_version.config(text="")
+            return
+        self.compiler_version.config(text=info['version'])
+        if info['stds']:
+            self.std_combo.config(values=info['stds'])
+            if self.std_var.get() not in info['stds']:
+                self.std_var.set('c++17' if 'c++17' in info['stds'] else info['stds'][-1])
+                
+    def schedule_syntax_check(self, event=None):
+        # Debounced: every key release restarts the timer, and only a buffer that
+        # changed since the last check is sent to the compiler.
+        if self.check_timer:
+            self.root.after_cancel(self.check_timer)
+            self.check_timer = None
+        try:
+            delay = int(self.check_delay_var.get())
+        except ValueError:
+            delay = SYNTAX_CHECK_DELAY_MS
+        if delay > 0 and self.buffer_version != self.checked_version:
+            self.check_timer = self.root.after(delay, self.start_syntax_check)
+            
+    def start_syntax_check(self):
+        self.check_timer = None
+        if self.file_load or self.buffer_version == self.checked_version:
+            return
+        code = self.code_editor.get(1.0, tk.END + '-1c')
+        if not code.strip():
+            return
+            
+        compiler = self.compiler_var.get()
+        flags = self.flags_var.get().split()
+        if self.project:
+            compiler = self.project.compiler or compiler
+            flags = self.project.flags + [f"-I{inc}" for inc in self.project.include_dirs]
+        if self.current_file:
+            flags = flags + ['-iquote', os.path.dirname(os.path.abspath(self.current_file))]
+        std = f"-std={self.project.std if self.project and self.project.std else self.std_var.get()}"
+        
+        if self.check_job and not self.check_job.done():
+            self.check_job.cancel()
+        self.checked_version = self.buffer_version
+        buffer_name = self.current_file or "untitled.cpp"
+        self.check_job = self.engine.submit(self.syntax_check_job, self.buffer_version, code,
+                                            compiler, std, flags, buffer_name)
+        
+    def syntax_check_job(self, job, version, code, compiler, std, flags, buffer_name):
+        try:
+            index = self.engine.syntax_check(job, code, compiler, std, flags, buffer_name)
+        except (JobCancelled, subprocess.TimeoutExpired, OSError):
+            return None
+        if index is not None:
+            self.call_in_ui(self.apply_syntax_check, version, index, buffer_name)
+        return index
+        
+    def apply_syntax_check(self, version, index, buffer_name):
+        # Results for a buffer that has been edited since are stale; the check for
+        # the newer version is already scheduled or running.
+        if version != self.buffer_version:
+            return
+        self.show_diagnostics(index, {buffer_name}, select=False)
+        self.update_status(f"Syntax check: {index.summary()}")
+        
+    def choose_profile_input(self):
+        file_path = filedialog.askopenfilename(title="Program input",
+                                               filetypes=[("Input files", "*.in *.txt"), ("All files", "*.*")])
+        if file_path:
+            self.profile_input_var.set(file_path)
+            
+    def profile_run(self):
+        code = self.code_editor.get(1.0, tk.END + '-1c')
+        if not code.strip():
+            messagebox.showwarning("Profile", "No code to compile!")
+            return
+        stdin_path = self.profile_input_var.get().strip() or None
+        if stdin_path and not os.path.exists(stdin_path):
+            messagebox.showwarning("Profile", f"Input file not found: {stdin_path}")
+            return
+            
+        self.cancel_build()
+        self.clear_heat()
+        self.run_profile_summary.config(text="Building with instrumentation and running...")
+        self.notebook.select(self.run_profile_table.master)
+        self.current_job = self.engine.submit(self.profile_run_job, code, self.compiler_var.get(),
+                                              f"-std={self.std_var.get()}", self.flags_var.get().split(),
+                                              stdin_path)
+        
+    def profile_run_job(self, job, code, compiler, std, flags, stdin_path):
+        try:
+            profile = self.engine.profile_run(job, code, compiler, std, flags, stdin_path)
+        except JobCancelled:
+            self.call_in_ui(self.run_profile_summary.config, text="Profile cancelled")
+            return None
+        except subprocess.TimeoutExpired:
+            self.call_in_ui(self.run_profile_summary.config,
+                            text=f"The program exceeded the time limit ({PROFILE_RUN_TIMEOUT} seconds)")
+            return None
+        except Exception as e:
+            self.call_in_ui(self.run_profile_summary.config, text=f"Profile failed: {e}")
+            return None
+        self.call_in_ui(self.show_run_profile, profile)
+        self.update_status(f"Profile finished ({profile['tool']})")
+        return profile
+        
+    def show_run_profile(self, profile):
+        self.run_profile = profile
+        self.render_run_profile()
+        self.clear_heat()
+        hottest = max(profile['lines'].values(), default=0)
+        for line, share in profile['lines'].items():
+            if hottest > 0 and share > 0:
+                level = min(len(HEAT_LEVELS) - 1, int(share / hottest * len(HEAT_LEVELS)))
+                self.code_editor.tag_add(f"heat{level}", f"{line}.0", f"{line + 1}.0")
+        summary = (f"{profile['tool']}: {len(profile['functions'])} functions, {len(profile['lines'])} hot lines, "
+                   f"wall {profile['wall']:.2f}s, exit code {profile['exit_code']}")
+        if not profile['functions']:
+            summary += " (no samples; the run may be too short)"
+        if profile.get('note'):
+            summary += f" ({profile['note']})"
+        self.run_profile_summary.config(text=summary)
+        
+    def render_run_profile(self):
+        profile = self.run_profile
+        self.run_profile_table.delete(*self.run_profile_table.get_children())
+        if not profile:
+            return
+        if self.run_profile_view.get() == 'Lines':
+            code_lines = self.code_editor.get(1.0, tk.END).splitlines()
+            rows = [(f"{line}: {code_lines[line - 1].strip() if line <= len(code_lines) else ''}",
+                     share, None, None, f"line{line}")
+                    for line, share in profile['lines'].items()]
+        else:
+            rows = [(name, entry['percent'], entry['seconds'], entry['calls'], None)
+                    for name, entry in profile['functions'].items()]
                     
-            thread = threading.Thread(target=compile_thread)
-            thread.daemon = True
-            thread.start()
+        column, descending = self.run_profile_sort
+        index = {'name': 0, 'share': 1, 'seconds': 2, 'calls': 3}[column]
+        rows.sort(key=lambda row: (row[index] is not None, row[index] if row[index] is not None else 0),
+                  reverse=descending)
+        for name, share, seconds, calls, iid in rows:
+            self.run_profile_table.insert('', tk.END, iid=iid, text=name,
+                                          values=(f"{share:.1f}%", '' if seconds is None else f"{seconds:.3f}s",
+                                                  '' if calls is None else calls))
+                                                  
+    def sort_run_profile(self, column):
+        current, descending = self.run_profile_sort
+        self.run_profile_sort = (column, not descending if column == current else column != 'name')
+        self.render_run_profile()
+        
+    def run_profile_selected(self, event=None):
+        selection = self.run_profile_table.selection()
+        if selection and selection[0].startswith('line'):
+            line = selection[0][len('line'):]
+            self.code_editor.mark_set(tk.INSERT, f"{line}.0")
+            self.code_editor.see(f"{line}.0")
             
-            return True
+    def clear_heat(self):
+        for level in range(len(HEAT_LEVELS)):
+            self.code_editor.tag_remove(f"heat{level}", 1.0, tk.END)
             
+    def assembly_visible(self):
+        return self.notebook.select() == str(self.assembly_text.master)
+        
+    def schedule_assembly(self, event=None):
+        # The listing is only rebuilt while the tab is open, after the same idle
+        # delay as the syntax check; otherwise a cursor move just re-highlights.
+        if not self.assembly_visible():
+            return
+        if self.assembly_version == self.buffer_version:
+            self.highlight_assembly()
+            return
+        if self.assembly_timer:
+            self.root.after_cancel(self.assembly_timer)
+        try:
+            delay = max(0, int(self.check_delay_var.get()))
+        except ValueError:
+            delay = SYNTAX_CHECK_DELAY_MS
+        self.assembly_timer = self.root.after(delay if event and event.type == tk.EventType.KeyRelease else 0,
+                                              self.start_assembly)
+        
+    def start_assembly(self):
+        self.assembly_timer = None
+        if self.file_load:
+            return
+        code = self.code_editor.get(1.0, tk.END + '-1c')
+        if not code.strip():
+            return
+        if self.assembly_job and not self.assembly_job.done():
+            self.assembly_job.cancel()
+        self.assembly_version = self.buffer_version
+        self.assembly_info.config(text="Compiling to assembly...")
+        self.assembly_job = self.engine.submit(self.assembly_job_run, self.buffer_version, code,
+                                               self.compiler_var.get(), f"-std={self.std_var.get()}",
+                                               self.flags_var.get().split())
+        
+    def assembly_job_run(self, job, version, code, compiler, std, flags):
+        start = time.perf_counter()
+        try:
+            lines, cached = self.engine.assembly(job, code, compiler, std, flags)
+        except JobCancelled:
+            return None
         except Exception as e:
-            self.append_output(f"Error during compilation setup: {e}")
-            self.update_status("Setup Error")
-            return False
+            self.call_in_ui(self.show_assembly_error, version, str(e))
+            return None
+        self.call_in_ui(self.show_assembly, version, lines, cached, time.perf_counter() - start,
+                        f"{compiler} {std} {' '.join(flags)}")
+        return lines
+        
+    def show_assembly_error(self, version, message):
+        if version == self.buffer_version:
+            lines = message.splitlines()
+            first = next((line for line in lines if 'error' in line), lines[0] if lines else '')
+            self.assembly_info.config(text=f"Assembly failed: {first}")
+            
+    def show_assembly(self, version, lines, cached, elapsed, config):
+        if version != self.buffer_version:
+            return
+        self.assembly_lines = lines
+        self.assembly_map = {}
+        for number, (text, source_line) in enumerate(lines, 1):
+            if source_line:
+                self.assembly_map.setdefault(source_line, []).append(number)
+                
+        widget = self.assembly_text
+        widget.config(state='normal')
+        widget.delete(1.0, tk.END)
+        widget.insert(tk.END, '\n'.join(text for text, source_line in lines))
+        for number, (text, source_line) in enumerate(lines, 1):
+            tag = 'label' if not text.startswith(' ') else 'mapped' if source_line else 'unmapped'
+            widget.tag_add(tag, f"{number}.0", f"{number}.end")
+        widget.config(state='disabled')
+        
+        instructions = sum(1 for text, source_line in lines if text.startswith(' '))
+        self.assembly_info.config(text=f"{instructions} instructions, {config}"
+                                       + (" (cached)" if cached else f" ({elapsed:.2f}s)"))
+        self.highlight_assembly()
+        
+    def highlight_assembly(self, event=None):
+        if not self.assembly_lines:
+            return
+        line = self.editor_line(tk.INSERT)
+        self.code_editor.tag_remove("asm_source", 1.0, tk.END)
+        self.assembly_text.tag_remove("current", 1.0, tk.END)
+        numbers = self.assembly_map.get(line, [])
+        for number in numbers:
+            self.assembly_text.tag_add("current", f"{number}.0", f"{number + 1}.0")
+        if numbers:
+            self.code_editor.tag_add("asm_source", f"{line}.0", f"{line + 1}.0")
+            self.assembly_text.see(f"{numbers[0]}.0")
+            
+    def assembly_clicked(self, event=None):
+        number = int(self.assembly_text.index(tk.CURRENT).split('.')[0])
+        if number > len(self.assembly_lines):
+            return
+        source_line = self.assembly_lines[number - 1][1]
+        if source_line:
+            self.code_editor.mark_set(tk.INSERT, f"{source_line}.0")
+            self.code_editor.see(f"{source_line}.0")
+            self.highlight_assembly()
             
-    def run_code(self):
-        if not hasattr(self, 'temp_executable') or not os.path.exists(self.temp_executable):
+    def cancel_build(self):
+        if self.current_job and not self.current_job.done():
+            self.current_job.cancel()
+            return True
+        return False
+        
+    def run_code(self, executable=None, stdin_path=None, stdout_path=None):
+        executable = executable or getattr(self, 'temp_executable', None)
+        if not executable or not os.path.exists(executable):
             self.append_output("No compiled file! Please compile the code first.")
             return
             
@@ -462,29 +4481,68 @@ int main() {
         self.update_status("Running the program...")
         
         def run_thread():
+            process = None
+            stdin = stdout = None
             try:
-                self.append_terminal(f"Running: {os.path.basename(self.temp_executable)}")
+                self.append_terminal(f"Running: {os.path.basename(executable)}")
+                if stdin_path:
+                    self.append_terminal(f"stdin: {stdin_path}")
+                if stdout_path:
+                    self.append_terminal(f"stdout: {stdout_path}")
                 self.append_terminal("_" * 50)
                 
-                self.process = subprocess.Popen(
-                    [self.temp_executable],
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
+                # Redirected streams are plain file descriptors handed to the child;
+                # that data never passes through Python or the terminal widget.
+                stdin = open(stdin_path, 'rb') if stdin_path else None
+                stdout = open(stdout_path, 'wb') if stdout_path else None
+                process = self.process = subprocess.Popen(
+                    [executable],
+                    stdin=stdin or subprocess.PIPE,
+                    stdout=stdout or subprocess.PIPE,
+                    stderr=subprocess.PIPE if stdout else subprocess.STDOUT,
                     bufsize=0
                 )
+                for file in (stdin, stdout):
+                    if file:
+                        file.close()
+                        
+                # Raw chunks instead of readline(): prompts without a trailing newline
+                # show up at once, and a flood of output is dispatched 64 KB at a time.
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+                fd = (process.stderr if stdout else process.stdout).fileno()
+                received = 0
+                at_line_start = True
+                start = time.perf_counter()
                 
                 while True:
-                    output = self.process.stdout.readline()
-                    if output == '' and self.process.poll() is not None:
+                    chunk = os.read(fd, READ_CHUNK_BYTES)
+                    if not chunk:
                         break
-                    if output:
-                        self.append_terminal(output.rstrip())
+                    received += len(chunk)
+                    text = decoder.decode(chunk).replace('\r\n', '\n')
+                    if text:
+                        self.write_terminal(text)
+                        at_line_start = text.endswith('\n')
                         
-                return_code = self.process.poll()
+                text = decoder.decode(b'', final=True)
+                if text:
+                    self.write_terminal(text)
+                    at_line_start = text.endswith('\n')
+                return_code = process.wait()
+                elapsed = time.perf_counter() - start
+                perf_timers.record('run subprocess', elapsed)
+                
+                if not at_line_start:
+                    self.write_terminal('\n')
                 self.append_terminal("_" * 50)
                 self.append_terminal(f"Program finished with code: {return_code}")
+                if stdout_path:
+                    written = os.path.getsize(stdout_path)
+                    self.append_terminal(f"Output: {format_size(written)} written to {stdout_path} in {elapsed:.2f}s "
+                                         f"({format_size(written / elapsed if elapsed > 0 else 0)}/s)")
+                else:
+                    self.append_terminal(f"Output: {format_size(received)} in {elapsed:.2f}s "
+                                         f"({format_size(received / elapsed if elapsed > 0 else 0)}/s)")
                 
                 if return_code == 0:
                     self.update_status("Program finished successfully")
@@ -495,27 +4553,310 @@ int main() {
                 self.append_terminal(f"Runtime Error: {e}")
                 self.update_status("Runtime Error")
             finally:
-                self.process = None
+                for file in (stdin, stdout):
+                    if file and not file.closed:
+                        file.close()
+                if self.process is process:
+                    self.process = None
                 
         thread = threading.Thread(target=run_thread)
         thread.daemon = True
         thread.start()
         
+    def run_with_input_file(self):
+        executable = getattr(self, 'temp_executable', None)
+        if not executable or not os.path.exists(executable):
+            self.append_output("No compiled file! Please compile the code first.")
+            return
+            
+        stdin_path = filedialog.askopenfilename(
+            title="Program input",
+            filetypes=[("Input files", "*.in *.txt"), ("All files", "*.*")]
+        )
+        if not stdin_path:
+            return
+        stdout_path = None
+        if messagebox.askyesno("Run with input file", "Write the program output to a file instead of the terminal?"):
+            stdout_path = filedialog.asksaveasfilename(
+                title="Program output",
+                defaultextension=".out",
+                filetypes=[("Output files", "*.out *.txt"), ("All files", "*.*")]
+            )
+            if not stdout_path:
+                return
+            if os.path.abspath(stdout_path) == os.path.abspath(stdin_path):
+                messagebox.showerror("Error", "The output file cannot be the input file.")
+                return
+                
+        if self.process:
+            self.stop_execution()
+        self.run_code(executable, stdin_path, stdout_path or None)
+        
+    def benchmark_code(self):
+        code = self.code_editor.get(1.0, tk.END + '-1c')
+        source_hash = hashlib.sha256(code.encode('utf-8')).hexdigest()
+        try:
+            runs = max(1, int(self.benchmark_runs_var.get()))
+            warmup = max(0, int(self.benchmark_warmup_var.get()))
+        except ValueError:
+            runs, warmup = BENCHMARK_RUNS, BENCHMARK_WARMUP
+            
+        job = self.compile_code()
+        if job:
+            job.future.add_done_callback(
+                lambda future: self.call_in_ui(self.start_benchmark, job, future, source_hash, runs, warmup))
+            
+    def start_benchmark(self, job, future, source_hash, runs, warmup):
+        if job.cancelled.is_set() or job is not self.current_job:
+            return
+        executable = future.result()
+        if not executable:
+            return
+            
+        self.notebook.select(1)
+        self.update_status("Benchmarking...")
+        compiler = self.compiler_var.get()
+        config = f"{compiler} -std={self.std_var.get()} {self.flags_var.get()}"
+        self.current_job = self.engine.submit(self.benchmark_job, executable, compiler,
+                                              source_hash, config, runs, warmup)
+        
+    def benchmark_job(self, job, executable, compiler, source_hash, config, runs, warmup):
+        self.append_terminal(f"Benchmark: {os.path.basename(executable)} ({runs} runs, {warmup} warmup)")
+        self.append_terminal("_" * 50)
+        
+        def report(index, sample):
+            rss = format_size(sample['rss']) if sample['rss'] is not None else 'n/a'
+            cpu = (f"user {sample['user'] * 1000:.1f} ms, sys {sample['sys'] * 1000:.1f} ms"
+                   if sample['user'] is not None else "cpu n/a")
+            self.append_terminal(f"run {index + 1:>3}: wall {sample['wall'] * 1000:.1f} ms, {cpu}, "
+                                 f"peak RSS {rss}, exit {sample['exit_code']}")
+            
+        try:
+            benchmark = self.engine.benchmark(job, executable, compiler, runs, warmup, on_sample=report)
+        except JobCancelled:
+            self.append_terminal("Benchmark cancelled")
+            return None
+        except Exception as e:
+            self.append_terminal(f"Benchmark Error: {e}")
+            self.update_status("Benchmark Error")
+            return None
+            
+        stats = benchmark['stats']
+        self.append_terminal("_" * 50)
+        self.append_terminal(f"{'':<12}{'min':>12}{'median':>12}{'p95':>12}{'stddev':>12}")
+        for metric, label in (('wall', 'wall (ms)'), ('user', 'user (ms)'), ('sys', 'sys (ms)')):
+            if stats[metric]:
+                self.append_terminal(f"{label:<12}" + ''.join(f"{stats[metric][key] * 1000:>12.2f}"
+                                                              for key in ('min', 'median', 'p95', 'stddev')))
+        if stats['rss']:
+            self.append_terminal(f"{'peak RSS':<12}" + ''.join(f"{format_size(stats['rss'][key]):>12}"
+                                                               for key in ('min', 'median', 'p95', 'stddev')))
+            
+        if benchmark['failures']:
+            self.append_terminal(f"Warning: {benchmark['failures']} of {runs} runs exited with a non-zero code")
+            
+        previous = self.benchmarks.last(source_hash)
+        if previous and previous['stats'].get('wall'):
+            before = previous['stats']['wall']['median']
+            after = stats['wall']['median']
+            change = (after - before) / before * 100 if before else 0
+            verdict = "regression" if change > 0 else "improvement"
+            self.append_terminal(f"Compared with the last benchmark ({previous['time']}, {previous['config']}): "
+                                 f"median wall {before * 1000:.2f} ms -> {after * 1000:.2f} ms "
+                                 f"({change:+.1f}%, {verdict})")
+            
+        self.benchmarks.add(source_hash, {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'config': config,
+            'runs': runs,
+            'stats': stats,
+        })
+        self.update_status(f"Benchmark finished: median {stats['wall']['median'] * 1000:.2f} ms")
+        return stats
+        
+    def profile_compile(self):
+        code = self.code_editor.get(1.0, tk.END + '-1c')
+        if not code.strip():
+            messagebox.showwarning("Compile profile", "No code to compile!")
+            return
+        source_hash = hashlib.sha256(code.encode('utf-8')).hexdigest()
+        compiler = self.compiler_var.get()
+        std = f"-std={self.std_var.get()}"
+        flags = self.flags_var.get().split()
+        
+        self.cancel_build()
+        self.profile_summary.config(text="Profiling compilation...")
+        self.notebook.select(self.profile_table.master)
+        self.current_job = self.engine.submit(self.profile_compile_job, code, source_hash, compiler, std, flags)
+        
+    def profile_compile_job(self, job, code, source_hash, compiler, std, flags):
+        try:
+            entry = self.engine.compile_profile(job, code, compiler, std, flags)
+        except JobCancelled:
+            self.call_in_ui(self.profile_summary.config, text="Compile profile cancelled")
+            return None
+        except Exception as e:
+            # Compiler errors are multi-line; the full text goes to Compilation Result.
+            message = str(e)
+            if '\n' in message:
+                self.append_output("Compilation Errors:")
+                self.append_output(message)
+                message = "compilation failed, see Compilation Result"
+            self.call_in_ui(self.profile_summary.config, text=f"Compile profile failed: {message}")
+            return None
+        self.compile_profiles.add(source_hash, entry)
+        self.call_in_ui(self.show_compile_profile, source_hash, entry)
+        self.update_status(f"Compile profile: {entry['wall']:.2f}s wall")
+        return entry
+            
+    def show_compile_profile(self, source_hash, entry):
+        self.compile_profile = entry
+        self.profile_baselines = {}
+        for other_hash, other in self.compile_profiles.entries():
+            if other is not entry and other['time'] != entry['time']:
+                label = f"{other['time']}  {other_hash[:8]}  {other['wall']:.2f}s  {other['config']}"
+                self.profile_baselines[label] = other
+        labels = list(self.profile_baselines)
+        self.profile_baseline_combo.config(values=labels)
+        self.profile_baseline_var.set(labels[-1] if labels else '')
+        self.render_compile_profile()
+        
+    def render_compile_profile(self):
+        entry = self.compile_profile
+        if not entry:
+            return
+        baseline = self.profile_baselines.get(self.profile_baseline_var.get())
+        before = {(row[0], row[1]): row[2] for row in baseline['rows']} if baseline else {}
+        column, descending = self.profile_sort
+        index = {'name': 1, 'category': 0}.get(column, 2)
+        rows = entry['rows']
+        if column == 'baseline':
+            rows = sorted(rows, key=lambda row: row[2] - before.get((row[0], row[1]), 0.0), reverse=descending)
+        else:
+            rows = sorted(rows, key=lambda row: row[index], reverse=descending)
+            
+        self.profile_table.delete(*self.profile_table.get_children())
+        for category, name, seconds in rows:
+            previous = before.get((category, name))
+            tags = ()
+            change = ''
+            if previous is not None:
+                change = f"{(seconds - previous) * 1000:+.1f} ms"
+                if abs(seconds - previous) >= 0.005:
+                    tags = ('slower',) if seconds > previous else ('faster',)
+            self.profile_table.insert('', tk.END, text=name, tags=tags,
+                                      values=(category, f"{seconds * 1000:.1f} ms",
+                                              f"{seconds / entry['wall'] * 100:.1f}%" if entry['wall'] else '',
+                                              change))
+            
+        summary = f"Total wall time {entry['wall']:.2f}s ({entry['config']})"
+        if baseline:
+            summary += f", baseline {baseline['wall']:.2f}s ({(entry['wall'] - baseline['wall']) * 1000:+.0f} ms)"
+        self.profile_summary.config(text=summary)
+        
+    def sort_compile_profile(self, column):
+        current, descending = self.profile_sort
+        self.profile_sort = (column, not descending if column == current else column not in ('name', 'category'))
+        self.render_compile_profile()
+        
+    def compare_configurations(self):
+        code = self.code_editor.get(1.0, tk.END + '-1c')
+        if not code.strip():
+            messagebox.showwarning("Compare", "No code to compile!")
+            return
+            
+        configs = []
+        for number, line in enumerate(self.compare_configs.get(1.0, tk.END).splitlines(), 1):
+            try:
+                args = shlex.split(line)
+            except ValueError as e:
+                messagebox.showerror("Compare", f"Configuration line {number} is invalid ({e}):\n{line.strip()}")
+                return
+            if not args:
+                continue
+            compiler = self.compiler_var.get() if args[0].startswith('-') else args.pop(0)
+            if not any(arg.startswith('-std=') for arg in args):
+                args.insert(0, f"-std={self.std_var.get()}")
+            configs.append((line.strip(), compiler, args))
+        if not configs:
+            messagebox.showwarning("Compare", "Enter at least one configuration.")
+            return
+            
+        try:
+            runs = max(1, int(self.benchmark_runs_var.get()))
+            warmup = max(0, int(self.benchmark_warmup_var.get()))
+        except ValueError:
+            runs, warmup = BENCHMARK_RUNS, BENCHMARK_WARMUP
+            
+        self.compare_table.delete(*self.compare_table.get_children())
+        for index, (label, compiler, args) in enumerate(configs):
+            self.compare_table.insert('', tk.END, iid=str(index), text=label, values=('compiling...', '', '', ''))
+            
+        self.cancel_build()
+        self.compare_summary.config(text=f"Compiling {len(configs)} configurations...")
+        self.current_job = self.engine.submit(self.compare_job, code, configs, runs, warmup)
+        
+    def compare_job(self, job, code, configs, runs, warmup):
+        def built(index, result):
+            if result['size'] is not None:
+                self.call_in_ui(self.compare_table.item, str(index),
+                                values=(f"{result['compile']:.2f}s", format_size(result['size']), 'waiting', ''))
+            else:
+                self.call_in_ui(self.compare_table.item, str(index), tags=('failed',),
+                                values=('failed', '', '', ''))
+                self.append_output(f"{configs[index][0]}: compilation failed\n{result['errors']}")
+                
+        try:
+            results = self.engine.compare(job, code, configs, runs, warmup, on_built=built,
+                                          log=lambda text: self.call_in_ui(self.compare_summary.config, text=text))
+        except JobCancelled:
+            self.call_in_ui(self.compare_summary.config, text="Comparison cancelled")
+            return None
+        except Exception as e:
+            self.call_in_ui(self.compare_summary.config, text=f"Comparison failed: {e}")
+            return None
+            
+        medians = {}
+        for index, result in enumerate(results):
+            if result['wall'] is None:
+                continue
+            medians[index] = result['wall']['median']
+            self.call_in_ui(self.compare_table.item, str(index),
+                            values=(f"{result['compile']:.2f}s", format_size(result['size']),
+                                    f"{result['wall']['median'] * 1000:.2f} ms",
+                                    format_size(result['rss']) if result['rss'] else 'n/a'))
+                                    
+        if medians:
+            fastest = min(medians, key=medians.get)
+            self.call_in_ui(self.compare_table.item, str(fastest), tags=('fastest',))
+            self.call_in_ui(self.compare_summary.config,
+                            text=f"Fastest: {configs[fastest][0]} ({medians[fastest] * 1000:.2f} ms median)")
+        else:
+            self.call_in_ui(self.compare_summary.config, text="No configuration compiled")
+        return medians
+            
     def compile_and_run(self):
         self.update_status("Compiling and Running...")
-        
-        def compile_and_run_thread():
-            if self.compile_code():
-                time.sleep(2)
-                if hasattr(self, 'temp_executable') and os.path.exists(self.temp_executable):
-                    time.sleep(1)
-                    self.run_code()
-                    
-        thread = threading.Thread(target=compile_and_run_thread)
-        thread.daemon = True
-        thread.start()
+        if self.process:
+            self.stop_execution()
+            
+        job = self.compile_code()
+        if job:
+            job.future.add_done_callback(
+                lambda future: self.call_in_ui(self.run_compiled, job, future))
+            
+    def run_compiled(self, job, future):
+        if job.cancelled.is_set() or job is not self.current_job:
+            return
+        executable = future.result()
+        if executable:
+            self.run_code(executable)
         
     def stop_execution(self):
+        cancelled = self.cancel_build()
+        if cancelled:
+            self.update_status("Build cancelled")
+            
         if self.process:
             try:
                 self.process.terminate()
@@ -525,7 +4866,7 @@ int main() {
                 pass
             finally:
                 self.process = None
-        else:
+        elif not cancelled:
             self.update_status("No running program")
             
     def execute_terminal_command(self, event):
@@ -534,21 +4875,26 @@ int main() {
             self.append_terminal(f"$ {command}")
             self.terminal_input.delete(0, tk.END)
             
-            if self.process and self.process.poll() is None:
+            if self.process and self.process.poll() is None and self.process.stdin is None:
+                self.append_terminal("The program reads its input from a file")
+            elif self.process and self.process.poll() is None:
                 try:
-                    self.process.stdin.write(command + '\n')
+                    self.process.stdin.write((command + '\n').encode('utf-8'))
                     self.process.stdin.flush()
                 except:
                     self.append_terminal("Error sending data to the program")
+            elif self.shell.busy and self.shell.alive():
+                try:
+                    self.shell.send_input(command)
+                except OSError:
+                    self.append_terminal("Error sending data to the command")
             else:
                 self.execute_system_command(command)
                 
     def execute_system_command(self, command):
         try:
             if command.lower() in ['clear', 'cls']:
-                self.terminal_output.config(state='normal')
-                self.terminal_output.delete(1.0, tk.END)
-                self.terminal_output.config(state='disabled')
+                self.clear_terminal()
                 return
                 
             if command.lower() == 'help':
@@ -558,24 +4904,37 @@ Available commands:
 - clear/cls: Clear the terminal
 - dir: List files
 - cd <directory>: Change directory
+- Ctrl+C: Interrupt the running command
 - Other system commands
                 """
                 self.append_terminal(help_text)
                 return
                 
-            result = subprocess.run(command, shell=True, capture_output=True, 
-                                  text=True, timeout=10)
+            self.shell.execute(command)
+            self.update_status(f"Running: {command}")
             
-            if result.stdout:
-                self.append_terminal(result.stdout)
-            if result.stderr:
-                self.append_terminal(f" {result.stderr}")
-                
-        except subprocess.TimeoutExpired:
-            self.append_terminal("Command timed out")
         except Exception as e:
             self.append_terminal(f"Runtime Error: {e}")
             
+    def shell_command_done(self, status, cwd):
+        self.terminal_prompt.config(text=f"{cwd} $")
+        if status is None:
+            self.update_status("Shell session ended")
+        elif status == '0':
+            self.update_status("Command finished")
+        else:
+            self.update_status(f"Command finished with code {status}")
+            
+    def interrupt_terminal(self, event):
+        if self.terminal_input.selection_present():
+            return None
+        if self.process and self.process.poll() is None:
+            self.stop_execution()
+        elif self.shell.busy:
+            self.shell.interrupt()
+            self.append_terminal("^C")
+        return "break"
+        
     def clean_build(self):
         try:
             files_removed = 0
@@ -588,6 +4947,8 @@ Available commands:
                 os.unlink(self.temp_executable)
                 files_removed += 1
                 
+            files_removed += self.compile_cache.clear()
+                
             self.clear_output()
             self.append_output(f"Cleared {files_removed} temporary files")
             self.update_status("Build cleared")
@@ -616,41 +4977,112 @@ Shortcuts:
 - F5 - Compile
 - F6 - Compile and run
 - F7 - Run
+- F8 - Benchmark
+- Ctrl+Space - Complete symbol
+- F12 / Ctrl+Click - Go to definition
 
 Help - Terminal
         """
         messagebox.showinfo("About", about_text)
         
     def on_closing(self):
+        self.shell.close()
+        self.cancel_build()
+        for job in (self.check_job, self.assembly_job):
+            if job:
+                job.cancel()
+        self.indexer.close()
+        self.engine.shutdown(wait=False)
+        if self.journal:
+            saved = self.current_file and self.saved_digest == (self.current_file, self.editor_digest())
+            self.journal.close(discard=saved or not self.journal.operations)
         if self.process:
             self.process.terminate()
             
         try:
-            if hasattr(self, 'temp_source') and os.path.exists(self.temp_source):
-                os.unlink(self.temp_source)
-            if hasattr(self, 'temp_executable') and os.path.exists(self.temp_executable):
-                os.unlink(self.temp_executable)
+            for buffer in self.scrollback.values():
+                buffer.close()
+            shutil.rmtree(self.build_dir, ignore_errors=True)
         except:
             pass
             
         self.root.destroy()
 
-def main():
-    compilers = ['g++', 'clang++', 'gcc']
-    available_compiler = None
+def run_batch(argv):
+    # Headless mode: every *.cpp in a directory is compiled and run through the
+    # same BuildEngine the GUI uses, with one line per submission and a summary.
+    parser = argparse.ArgumentParser(prog='CppIDE.py --batch',
+                                     description="Compile and run a directory of C++ sources without the GUI.")
+    parser.add_argument('directory', help="directory with *.cpp sources")
+    parser.add_argument('--compiler', default='g++')
+    parser.add_argument('--std', default='c++17')
+    parser.add_argument('--flags', default='-O2', help="compiler flags as one string")
+    parser.add_argument('--tests', help="folder with NAME.in/NAME.out cases to run every program against")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--timeout', type=float, default=TEST_TIMEOUT, help="run time limit in seconds")
+    parser.add_argument('--json', help="write per-job results and throughput to this file")
+    args = parser.parse_args(argv)
     
-    for compiler in compilers:
-        try:
-            subprocess.run([compiler, '--version'], capture_output=True, timeout=5)
-            available_compiler = compiler
-            break
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            continue
-            
-    if not available_compiler:
-        print("Warning: C++ compiler not found!")
-        print("Install one of the following: g++, clang++, gcc")
-        print("\nThe application will run, but compilation will not work.\n")
+    sources = sorted(Path(args.directory).glob('*.cpp'), key=lambda path: natural_key(path.name))
+    if not sources:
+        print(f"No *.cpp files in {args.directory}")
+        return 1
+    cases = find_test_cases(args.tests) if args.tests else []
+    if args.tests and not cases:
+        print(f"No test cases (NAME.in with NAME.out) in {args.tests}")
+        return 1
+        
+    build_dir = tempfile.mkdtemp(prefix='cppide-batch-')
+    engine = BuildEngine(build_dir, workers=max(1, args.workers))
+    flags = shlex.split(args.flags)
+    std = f"-std={args.std}"
+    print(f"{len(sources)} sources, {len(cases)} test cases, {engine.workers} workers")
+    
+    start = time.perf_counter()
+    jobs = [engine.submit(engine.batch_job, source, args.compiler, std, flags, cases, args.timeout)
+            for source in sources]
+    results = []
+    finished = False
+    try:
+        for future in as_completed([job.future for job in jobs]):
+            entry = future.result()
+            results.append(entry)
+            print(f"{entry['name']:<30} {entry['status']:<6} compile {entry['compile']:6.2f}s"
+                  f"{' (cached)' if entry.get('cached') else '         '}  run {entry['run']:6.2f}s  {entry['detail']}")
+        finished = True
+    except KeyboardInterrupt:
+        for job in jobs:
+            job.cancel()
+        print("Interrupted")
+        return 130
+    finally:
+        # A finished run waits for precompiled headers so the next run can use them.
+        if finished and engine.pch_jobs:
+            print("Waiting for the precompiled header build...")
+        engine.shutdown(wait=finished)
+        shutil.rmtree(build_dir, ignore_errors=True)
+        
+    elapsed = time.perf_counter() - start
+    statuses = {}
+    for entry in results:
+        statuses[entry['status']] = statuses.get(entry['status'], 0) + 1
+    totals = summarize(entry['total'] for entry in results)
+    throughput = len(results) / elapsed if elapsed > 0 else 0.0
+    print("_" * 50)
+    print(f"{len(results)} jobs in {elapsed:.2f}s: {throughput:.2f} jobs/s")
+    print(f"Per job: median {totals['median']:.2f}s, p95 {totals['p95']:.2f}s, "
+          f"max {max(entry['total'] for entry in results):.2f}s")
+    print(', '.join(f"{status}: {count}" for status, count in sorted(statuses.items())))
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'elapsed': elapsed, 'jobs_per_second': throughput, 'workers': engine.workers,
+                       'results': sorted(results, key=lambda entry: natural_key(entry['name']))}, file, indent=1)
+    return 0 if statuses.get('OK', 0) == len(results) else 2
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+        sys.exit(run_batch(sys.argv[2:]))
         
     root = tk.Tk()
     app = CppCompilerIDE(root)
@@ -0,0 +1,119 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from CppIDE import DiagnosticIndex, diagnostic_args, parse_diagnostics
+
+# What g++ 9-12 prints with -fdiagnostics-format=json (one line, one array).
+GCC_JSON = json.dumps([
+    {'kind': 'error', 'message': "no match for 'operator<<'", 'option': None,
+     'locations': [{'caret': {'file': 'main.cpp', 'line': 8, 'column': 15},
+                    'finish': {'file': 'main.cpp', 'line': 8, 'column': 20}}],
+     'children': [
+         {'kind': 'note', 'message': 'candidate: operator<<(int)',
+          'locations': [{'caret': {'file': '/usr/include/c++/12/ostream', 'line': 166, 'column': 7}}],
+          'children': [
+              {'kind': 'note', 'message': "no known conversion for argument 1 from 'Point'",
+               'locations': [{'caret': {'file': '/usr/include/c++/12/ostream', 'line': 166, 'column': 24}}]}]},
+     ]},
+    {'kind': 'warning', 'message': "unused variable 'x'", 'option': '-Wunused-variable',
+     'locations': [{'caret': {'file': 'main.cpp', 'line': 4, 'column': 9}}]},
+    {'kind': 'fatal error', 'message': 'missing.h: No such file or directory',
+     'locations': [{'caret': {'file': 'util.h', 'line': 1, 'column': 10}}]},
+])
+
+# What g++ 13+ prints with -fdiagnostics-format=sarif-stderr; notes become relatedLocations.
+GCC_SARIF = json.dumps({
+    'version': '2.1.0',
+    'runs': [{
+        'tool': {'driver': {'name': 'GNU C++17'}},
+        'results': [
+            {'ruleId': 'error', 'level': 'error',
+             'message': {'text': "'value' was not declared in this scope"},
+             'locations': [{'physicalLocation': {
+                 'artifactLocation': {'uri': 'file:///tmp/main.cpp'},
+                 'region': {'startLine': 12, 'startColumn': 5, 'endColumn': 10}}}],
+             'relatedLocations': [
+                 {'physicalLocation': {'artifactLocation': {'uri': 'main.cpp'},
+                                       'region': {'startLine': 3, 'startColumn': 6}},
+                  'message': {'text': "'values' declared here"}}]},
+            {'ruleId': '-Wsign-compare', 'level': 'warning',
+             'message': {'text': 'comparison of integer expressions of different signedness'},
+             'locations': [{'physicalLocation': {
+                 'artifactLocation': {'uri': 'main.cpp'},
+                 'region': {'startLine': 20, 'startColumn': 23, 'endColumn': 24}}}]},
+            {'level': 'none', 'message': {'text': 'some context'}},
+        ],
+    }],
+})
+
+CLANG_TEXT = '''In file included from main.cpp:1:
+util.h:5:10: warning: unused parameter 'n' [-Wunused-parameter]
+main.cpp:9:5: error: no matching function for call to 'scale'
+util.h:2:6: note: candidate function not viable: requires 2 arguments, but 1 was provided
+util.h:3:6: note: candidate function not viable: no known conversion from 'double' to 'int'
+main.cpp:14:1: fatal error: expected '}'
+/usr/bin/ld: cannot find -lfoo
+2 warnings and 2 errors generated.
+'''
+
+
+def test_gcc_json_nests_notes_and_counts_severities():
+    diagnostics, other = parse_diagnostics('In function main:\n' + GCC_JSON + '\n')
+
+    assert other == ['In function main:']
+    error, warning, fatal = diagnostics
+    assert (error['file'], error['line'], error['column'], error['end_column']) == ('main.cpp', 8, 15, 20)
+    assert [note['severity'] for note in error['children']] == ['note']
+    assert error['children'][0]['line'] == 166
+    assert error['children'][0]['children'][0]['message'].startswith('no known conversion')
+    assert warning['option'] == '-Wunused-variable' and warning['children'] == []
+    assert fatal['severity'] == 'error'
+
+    index = DiagnosticIndex(diagnostics, other)
+    assert index.counts == {'error': 2, 'warning': 1}
+    assert index.summary() == '2 errors, 1 warning'
+    assert [diagnostic['line'] for diagnostic in index.by_file['main.cpp']] == [8, 4]
+
+
+def test_sarif_turns_related_locations_into_notes():
+    diagnostics, other = parse_diagnostics(GCC_SARIF + '\n')
+
+    assert other == []
+    error, warning, note = diagnostics
+    assert (error['file'], error['line'], error['column'], error['end_column']) == ('/tmp/main.cpp', 12, 5, 10)
+    assert error['children'] == [{'severity': 'note', 'message': "'values' declared here", 'file': 'main.cpp',
+                                  'line': 3, 'column': 6, 'end_column': 0, 'option': None, 'children': []}]
+    assert warning['option'] == '-Wsign-compare'
+    assert (note['severity'], note['file'], note['line']) == ('note', None, 0)
+
+    index = DiagnosticIndex(diagnostics)
+    assert index.counts == {'error': 1, 'warning': 1, 'note': 1}
+    assert index.summary() == '1 error, 1 warning, 1 note'
+
+
+def test_clang_text_attaches_notes_to_the_preceding_diagnostic():
+    diagnostics, other = parse_diagnostics(CLANG_TEXT)
+
+    warning, error, fatal = diagnostics
+    assert (warning['file'], warning['line'], warning['column']) == ('util.h', 5, 10)
+    assert warning['option'] == '-Wunused-parameter'
+    assert warning['message'] == "unused parameter 'n'"
+    assert [(note['file'], note['line']) for note in error['children']] == [('util.h', 2), ('util.h', 3)]
+    assert fatal['severity'] == 'error' and fatal['children'] == []
+    assert other == ['In file included from main.cpp:1:', '/usr/bin/ld: cannot find -lfoo',
+                     '2 warnings and 2 errors generated.']
+
+    index = DiagnosticIndex()
+    index.extend(diagnostics, other)
+    assert index.summary() == '2 errors, 1 warning'
+    assert DiagnosticIndex().summary() == 'no diagnostics'
+
+
+def test_diagnostic_format_follows_the_compiler_version():
+    assert diagnostic_args('gcc', 'g++ (GCC) 13.2.1 20230801') == ['-fdiagnostics-format=sarif-stderr']
+    assert diagnostic_args('gcc', 'g++ (Ubuntu 11.4.0-1ubuntu1~22.04) 11.4.0') == ['-fdiagnostics-format=json']
+    assert diagnostic_args('gcc', 'g++ (GCC) 8.5.0') == []
+    assert diagnostic_args('clang', 'clang version 17.0.6') == ['-fno-color-diagnostics', '-fno-caret-diagnostics']
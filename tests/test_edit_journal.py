@@ -0,0 +1,130 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import CppIDE
+from CppIDE import CppCompilerIDE, EditJournal, coalesce_edits, read_journal, replay_journal
+
+START = 'int main() {\n    return 0;\n}\n'
+
+
+def offset(text, line, column):
+    return sum(len(part) + 1 for part in text.split('\n')[:line - 1]) + column
+
+
+def position(text, index):
+    line = text.count('\n', 0, index) + 1
+    return line, index - (text.rfind('\n', 0, index) + 1)
+
+
+def random_edits(text, count, seed=7):
+    # Mirrors what the editor journals: Tk positions, with the expected text kept as
+    # a flat string so apply_edit is checked against independent arithmetic.
+    rng = random.Random(seed)
+    edits = []
+    for _ in range(count):
+        if text and rng.random() < 0.4:
+            first = rng.randrange(len(text))
+            last = min(len(text), first + rng.randint(1, 6))
+            edits.append(['d', *position(text, first), *position(text, last)])
+            text = text[:first] + text[last:]
+        else:
+            index = rng.randint(0, len(text))
+            inserted = rng.choice(['x', 'y;', '\n', ' // note\n', '{}', 'ab\ncd'])
+            edits.append(['i', *position(text, index), inserted])
+            text = text[:index] + inserted + text[index:]
+    return edits, text
+
+
+def record(journal, edits):
+    for edit in edits:
+        if edit[0] == 'i':
+            journal.insert(*edit[1:])
+        else:
+            journal.delete(*edit[1:])
+
+
+def test_replaying_a_journal_gives_the_final_text(tmp_path):
+    edits, expected = random_edits(START, 300)
+    journal = EditJournal(tmp_path / '1-a.jnl', 'main.cpp', START)
+    record(journal, edits)
+    journal.close()
+
+    header, records = read_journal(tmp_path / '1-a.jnl')
+    assert header['file'] == 'main.cpp'
+    assert replay_journal(records)[0] == expected
+
+
+def test_replay_with_kept_edits_and_coalescing_match(tmp_path):
+    typed = [['i', 2, 4 + index, char] for index, char in enumerate('foo();')]
+    edits, expected = random_edits(replay_journal([['s', START]] + typed)[0], 200, seed=11)
+    records = [['s', START]] + typed + edits
+
+    base, tail = replay_journal(records, keep=50)
+    lines = base.split('\n')
+    for edit in tail:
+        CppIDE.apply_edit(lines, edit)
+    assert len(tail) == 50
+    assert '\n'.join(lines) == expected
+
+    merged = coalesce_edits(records[1:])
+    assert merged[0] == ['i', 2, 4, 'foo();']
+    assert replay_journal([['s', START]] + merged)[0] == expected
+
+
+def test_compaction_preserves_the_replayed_text(tmp_path, monkeypatch):
+    monkeypatch.setattr(CppIDE, 'JOURNAL_COMPACT_BYTES', 0)
+    monkeypatch.setattr(CppIDE, 'JOURNAL_KEEP_EDITS', 5)
+    monkeypatch.setattr(CppIDE, 'JOURNAL_FSYNC_MS', 1)
+    edits, expected = random_edits(START, 400, seed=3)
+    journal = EditJournal(tmp_path / '1-b.jnl', 'main.cpp', START)
+    record(journal, edits)
+    journal.close()
+
+    header, records = read_journal(tmp_path / '1-b.jnl')
+    assert header['file'] == 'main.cpp'
+    assert records[0][0] == 's' and len(records) < len(edits)
+    assert replay_journal(records)[0] == expected
+    assert not (tmp_path / '1-b.tmp').exists()
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    edits, expected = random_edits(START, 50, seed=5)
+    path = tmp_path / '1-c.jnl'
+    journal = EditJournal(path, None, START)
+    record(journal, edits)
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write('["i",1,0,"lost')
+
+    header, records = read_journal(path)
+    assert header['file'] is None
+    assert replay_journal(records)[0] == expected
+
+
+def test_scan_drops_untouched_and_saved_journals(tmp_path):
+    source = tmp_path / 'main.cpp'
+    edits, expected = random_edits(START, 40, seed=9)
+    source.write_text(expected)
+
+    untouched = EditJournal(tmp_path / '1-d.jnl', str(source), START)
+    untouched.close()
+    saved = EditJournal(tmp_path / '1-e.jnl', str(source), START)
+    record(saved, edits)
+    saved.close()
+    unsaved = EditJournal(tmp_path / '1-f.jnl', str(source), START)
+    record(unsaved, edits + [['i', 1, 0, '// draft\n']])
+    unsaved.close()
+
+    journals = CppCompilerIDE.scan_journals(None, [tmp_path / '1-d.jnl', tmp_path / '1-e.jnl',
+                                                   tmp_path / '1-f.jnl'])
+
+    assert not (tmp_path / '1-d.jnl').exists()
+    assert not (tmp_path / '1-e.jnl').exists()
+    assert [journal['path'] for journal in journals] == [tmp_path / '1-f.jnl']
+    lines = journals[0]['base'].split('\n')
+    for edit in journals[0]['tail']:
+        CppIDE.apply_edit(lines, edit)
+    assert '\n'.join(lines) == '// draft\n' + expected
@@ -0,0 +1,37 @@
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from CppIDE import CppCompilerIDE
+
+
+def loading_ide(current_file):
+    # Just the state save_file and save_as_file look at while a chunked load runs.
+    ide = SimpleNamespace(file_load={'offset': 0}, current_file=current_file, statuses=[], written=[])
+    ide.update_status = ide.statuses.append
+    ide.write_file = lambda path: ide.written.append(path) or True
+    ide.save_as_file = lambda: CppCompilerIDE.save_as_file(ide)
+    return ide
+
+
+def test_save_during_load_leaves_previous_file_untouched(tmp_path):
+    previous = tmp_path / 'previous.cpp'
+    previous.write_text('int main() { return 0; }\n')
+    ide = loading_ide(str(previous))
+
+    CppCompilerIDE.save_file(ide)
+
+    assert ide.written == []
+    assert previous.read_text() == 'int main() { return 0; }\n'
+    assert ide.statuses == ["Cannot save while a file is still loading"]
+
+
+def test_save_as_during_load_does_not_ask_for_a_path():
+    ide = loading_ide(None)
+
+    CppCompilerIDE.save_file(ide)
+
+    assert ide.written == []
+    assert ide.statuses == ["Cannot save while a file is still loading"]
@@ -0,0 +1,92 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import CppIDE
+from CppIDE import BuildEngine
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32" or not shutil.which('g++'),
+                                reason="needs g++ and a POSIX shell")
+
+CODE = '''#include <cstdio>
+int work(int n) {
+    long total = 0;
+    for (int i = 0; i < n; ++i) total += i % 7;
+    return (int)total;
+}
+int main() { std::printf("%d\\n", work(1000)); return 3; }
+'''
+
+BROKEN_PERF = '''#!/bin/sh
+echo "Error: Access to performance monitoring is restricted (perf_event_paranoid)" >&2
+exit 255
+'''
+
+WORKING_PERF = '''#!/bin/sh
+if [ "$1" = record ]; then
+    while [ "$1" != -- ]; do
+        [ "$1" = -o ] && output=$2
+        shift
+    done
+    shift
+    echo samples > "$output"
+    "$@"
+    exit 0
+fi
+echo "# Samples: 3"
+echo "    75.00%  [.] work(int)  main.cpp:4"
+echo "    25.00%  [.] main       main.cpp:7"
+'''
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(CppIDE, 'APP_DIR', tmp_path / 'app')
+    build_dir = tmp_path / 'build'
+    build_dir.mkdir()
+    engine = BuildEngine(str(build_dir), workers=1)
+    yield engine
+    engine.shutdown()
+
+
+def stub_perf(tmp_path, monkeypatch, script):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    perf = bin_dir / 'perf'
+    perf.write_text(script)
+    perf.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+def profile(engine):
+    return engine.submit(engine.profile_run, CODE, 'g++', '-std=c++17', ['-O0']).future.result()
+
+
+def test_perf_results_carry_the_program_exit_code(engine, tmp_path, monkeypatch):
+    stub_perf(tmp_path, monkeypatch, WORKING_PERF)
+    result = profile(engine)
+    assert result['tool'] == 'perf'
+    assert result['exit_code'] == 3
+    assert result['functions']['work(int)']['percent'] == 75.0
+    assert result['lines'] == {4: 75.0, 7: 25.0}
+
+
+@pytest.mark.skipif(not shutil.which('gprof'), reason="needs gprof")
+def test_unusable_perf_falls_back_to_gprof(engine, tmp_path, monkeypatch):
+    stub_perf(tmp_path, monkeypatch, BROKEN_PERF)
+    result = profile(engine)
+    assert result['tool'] == 'gprof'
+    assert result['exit_code'] == 3
+    assert 'perf_event_paranoid' in result['note']
+
+
+def test_unusable_perf_without_gprof_reports_perf_error(engine, tmp_path, monkeypatch):
+    stub_perf(tmp_path, monkeypatch, BROKEN_PERF)
+    real_which = shutil.which
+    monkeypatch.setattr(CppIDE.shutil, 'which', lambda name: None if name == 'gprof' else real_which(name))
+    with pytest.raises(RuntimeError, match='perf record failed'):
+        profile(engine)
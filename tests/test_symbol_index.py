@@ -0,0 +1,67 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from CppIDE import SymbolIndex
+
+KEYWORDS = {'int', 'void', 'bool', 'const', 'return', 'class', 'struct', 'public', 'for', 'if', 'auto'}
+
+GRAPH = '''class Graph {
+public:
+    Graph(int n);
+    ~Graph();
+    int size() const;
+    bool operator==(const Graph& other) const;
+private:
+    int nodes;
+};
+
+Graph::Graph(int n) : nodes(n) {
+}
+
+Graph::~Graph() {
+}
+
+int Graph::size() const {
+    return nodes;
+}
+
+bool Graph::operator==(const Graph& other) const {
+    return nodes == other.nodes;
+}
+
+int main() {
+    Graph graph(3);
+    std::printf("%d",
+                graph.size());
+    return 0;
+}
+'''
+
+
+def indexed(text):
+    index = SymbolIndex(KEYWORDS)
+    index.update('graph.cpp', text)
+    return index
+
+
+def test_out_of_line_member_definitions_win_over_declarations():
+    index = indexed(GRAPH)
+    name, kind, path, line, column, scope = index.lookup('size')[0]
+    assert (kind, line, scope) == ('function', 17, 'Graph')
+    assert GRAPH.split('\n')[line - 1][column:].startswith('size()')
+
+
+def test_constructors_destructors_and_operators_are_indexed_with_their_scope():
+    index = indexed(GRAPH)
+    assert [(symbol[1], symbol[3], symbol[5]) for symbol in index.lookup('Graph')
+            if symbol[1] == 'function'] == [('function', 11, 'Graph')]
+    assert index.lookup('~Graph')[0][3] == 14
+    assert index.lookup('operator==')[0][1:4:2] == ('function', 21)
+
+
+def test_calls_continued_on_the_next_line_are_not_definitions():
+    index = indexed(GRAPH)
+    assert index.lookup('printf') == []
+    assert 'size' in index.complete('si')
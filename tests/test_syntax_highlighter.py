@@ -0,0 +1,104 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from CppIDE import LEX_CODE, HIGHLIGHT_TAGS, SyntaxHighlighter, lex_cpp_line
+
+KEYWORDS = {'int', 'return'}
+
+
+class FakeText:
+    # Just enough of tk.Text for SyntaxHighlighter: lines, get(), index('end-1c') and
+    # character-level tags.
+    def __init__(self, lines):
+        self.lines = list(lines)
+        self.tags = {tag: set() for tag in HIGHLIGHT_TAGS}
+
+    def position(self, index):
+        line, column = index.split('.')
+        line = int(line)
+        return line, len(self.lines[line - 1]) if column == 'end' else int(column)
+
+    def index(self, index):
+        assert index == 'end-1c'
+        return f"{len(self.lines)}.{len(self.lines[-1])}"
+
+    def get(self, start, end):
+        (first, first_column), (last, last_column) = self.position(start), self.position(end)
+        text = '\n'.join(self.lines[first - 1:last])
+        return text[first_column:len(text) - (len(self.lines[last - 1]) - last_column)]
+
+    def tag_add(self, tag, *indices):
+        for start, end in zip(indices[::2], indices[1::2]):
+            (line, first), (_, last) = self.position(start), self.position(end)
+            self.tags[tag].update((line, column) for column in range(first, last))
+
+    def tag_remove(self, tag, start, end):
+        first, last = self.position(start)[0], self.position(end)[0]
+        self.tags[tag] = {(line, column) for line, column in self.tags[tag] if not first <= line <= last}
+
+    def tag_lines(self, line):
+        return {tag: sorted(column for tagged, column in chars if tagged == line)
+                for tag, chars in self.tags.items()}
+
+
+def replace_lines(text, highlighter, first, last, new_lines):
+    # Mirrors what editor_dispatch reports for an edit that rewrites lines first..last.
+    # Like Tk, tags go away with the replaced lines and move with the lines after them.
+    delta = len(new_lines) - (last - first + 1)
+    text.lines[first - 1:last] = new_lines
+    for tag, chars in text.tags.items():
+        text.tags[tag] = {(line + delta if line > last else line, column)
+                          for line, column in chars if not first <= line <= last}
+    highlighter.lines_changed(first, last, first + len(new_lines) - 1)
+
+
+def expected_tags(lines):
+    text = FakeText(lines)
+    state = LEX_CODE
+    for line_num, content in enumerate(lines, 1):
+        tokens, state = lex_cpp_line(content, state, KEYWORDS)
+        for tag, start, end in tokens:
+            text.tag_add(tag, f"{line_num}.{start}", f"{line_num}.{end}")
+    return text.tags
+
+
+def test_provisional_tags_do_not_outlive_the_sequential_pass():
+    text = FakeText(['int x = 1;', 'still raw', 'x /* a */ y', 'still raw', 'end */',
+                     '  int y;', '  int y;', '/* start'])
+    highlighter = SyntaxHighlighter(text, KEYWORDS)
+    highlighter.highlight_dirty()
+
+    replace_lines(text, highlighter, 3, 5, ['x /* a */ y', '/* start', 'still raw'])
+    highlighter.highlight_dirty(limit=3)
+    replace_lines(text, highlighter, 2, 4, ['return 0;', '"unterminated'])
+    highlighter.highlight_visible(5, 7)
+    highlighter.highlight_dirty()
+
+    assert text.tag_lines(6)['comment'] == []
+    assert text.tags == expected_tags(text.lines)
+
+
+def test_random_edits_match_full_relex():
+    fragments = ['int x = 1;', '/* start', 'end */', 'x /* a */ y', '"unterminated', 'R"(raw',
+                 ')"', '// note', '#define A \\', '  int y;', 'return 0;', 'still raw']
+    rng = random.Random(2)
+    for _ in range(3000):
+        text = FakeText([rng.choice(fragments) for _ in range(rng.randint(1, 12))])
+        highlighter = SyntaxHighlighter(text, KEYWORDS)
+        highlighter.highlight_dirty()
+        for _ in range(rng.randint(1, 4)):
+            first = rng.randint(1, len(text.lines))
+            last = rng.randint(first, len(text.lines))
+            replace_lines(text, highlighter, first, last,
+                          [rng.choice(fragments) for _ in range(rng.randint(1, 3))])
+            action = rng.random()
+            if action < 0.4:
+                highlighter.highlight_dirty(limit=rng.randint(1, 4))
+            elif action < 0.8:
+                start = rng.randint(1, len(text.lines))
+                highlighter.highlight_visible(start, start + rng.randint(0, 4))
+        highlighter.highlight_dirty()
+        assert text.tags == expected_tags(text.lines)